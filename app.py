@@ -1,35 +1,93 @@
+import io
 import os
+import time
+import csv
 import json
 import tempfile
 import datetime
-from flask import Flask, render_template, request, jsonify, send_file, session, redirect
+import uuid
+import shutil
+import threading
+import zipfile
+import click
+from flask import (
+    Flask, Request, Response, render_template, request, jsonify, send_file, session, redirect, url_for,
+    g, stream_with_context
+)
 from werkzeug.utils import secure_filename
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+
+from utils.extract_text import extract_text_from_file, extract_texts, extraction_cache, extraction_pool_stats
+from utils.ats_score import (
+    calculate_ats_score, analyze_skills_match, analyze_document, analyze_job_description, jd_feature_cache,
+    normalize_job_description
+)
+from utils.optimizer import generate_suggestions, create_optimized_resume, optimized_resume_cache
+from utils.batch import rank_resumes
+from utils.jobs import JobQueue, JobWorkers
+from utils.cache import LRUCache, TTLCache
+from utils.stats import record_analysis, refresh_daily_stats, rescore_analysis, load_dashboard_totals
+from utils.vectorizer import TFIDF_MODEL_PATH, fit_corpus_vectorizer, save_vectorizer
+from utils.db import get_db_connection, db_pool, is_transient_error
+from utils.write_behind import WriteBehindQueue
+from utils.search_index import CandidateIndex, IndexUpdater
+from utils.fingerprint import DuplicateIndex, simhash, to_signed
+from utils.skill_masks import SkillAnalytics, encode_skills, skill_layout
+from utils.postings import CatalogCache
+from utils.rescore import RESCORE_UPDATE_SQL, Checkpoint, rescore_row, score_fields
+from utils.changes import id_condition, pending_changes, record_change
+from utils.text_store import (
+    JOB_DESCRIPTION_SQL, RESUME_TEXT_SQL, TEXT_JOINS, compress_text, job_description_hash, store_job_description,
+    store_resume_text, stored_resume_text
+)
+from utils.warmup import process_stats, record_first_request, rss_mb, warmup
+from utils.metrics import (
+    REQUEST_SECONDS, TEXT_CHARS, db_span, end_trace, render_metrics, save_snapshot, span, start_trace
+)
+
+
+class UploadRequest(Request):
+    # Batch uploads carry many resumes, so they get their own size limit
+    @property
+    def max_content_length(self):
+        if self.path == '/analyze-batch':
+            return app.config['MAX_BATCH_CONTENT_LENGTH']
+        return super().max_content_length
 
-from utils.extract_text import extract_text_from_file
-from utils.ats_score import calculate_ats_score, analyze_skills_match
-from utils.optimizer import generate_suggestions, create_optimized_resume
-import mysql.connector
 
 app = Flask(__name__)
+app.request_class = UploadRequest
 app.secret_key = os.environ.get("FLASK_SECRET_KEY", "admin_secret_key_123")
 
 # Upload limits & config
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024
+app.config['MAX_BATCH_CONTENT_LENGTH'] = int(os.environ.get("MAX_BATCH_UPLOAD_MB", 512)) * 1024 * 1024
+app.config['MAX_BATCH_FILES'] = int(os.environ.get("MAX_BATCH_FILES", 5000))
 app.config['UPLOAD_FOLDER'] = 'temp_uploads'
 ALLOWED_EXTENSIONS = {'pdf', 'docx', 'doc', 'txt'}
 
-os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+# Asynchronous analysis queue (embedded SQLite broker)
+app.config['JOB_QUEUE_PATH'] = os.environ.get("JOB_QUEUE_PATH", os.path.join('jobs', 'queue.sqlite3'))
+app.config['JOB_SPOOL_FOLDER'] = os.environ.get("JOB_SPOOL_FOLDER", os.path.join('jobs', 'uploads'))
+app.config['JOB_WORKERS'] = int(os.environ.get("JOB_WORKERS", 2))
+app.config['JOB_LEASE_SECONDS'] = int(os.environ.get("JOB_LEASE_SECONDS", 600))
+app.config['JOB_RETENTION_HOURS'] = int(os.environ.get("JOB_RETENTION_HOURS", 24))
 
+# Write-behind batching of database inserts (off by default)
+app.config['DB_WRITE_BEHIND'] = os.environ.get("DB_WRITE_BEHIND", "0") == "1"
+app.config['WRITE_BEHIND_DIR'] = os.environ.get("WRITE_BEHIND_DIR", "spill")
+app.config['WRITE_BEHIND_FSYNC'] = os.environ.get("WRITE_BEHIND_FSYNC", "0") == "1"
+app.config['WRITE_BEHIND_WAIT_SECONDS'] = float(os.environ.get("WRITE_BEHIND_WAIT_SECONDS", 10))
 
-def get_db_connection():
-    return mysql.connector.connect(
-        host="127.0.0.1",
-        user="manish",
-        password="1234",
-        database="manish0832"
-    )
+# Near-duplicate uploads: reuse the earlier analysis when the job description is the same
+app.config['DUPLICATE_REUSE'] = os.environ.get("DUPLICATE_REUSE", "1") == "1"
 
+# /download-optimized needs the signed token handed out with the analysis (admins excepted)
+app.config['DOWNLOAD_TOKEN_MAX_AGE'] = int(os.environ.get("DOWNLOAD_TOKEN_HOURS", 24)) * 3600
+download_tokens = URLSafeTimedSerializer(app.secret_key, salt='download-optimized')
 
+os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+os.makedirs(app.config['JOB_SPOOL_FOLDER'], exist_ok=True)
 
 
 def allowed_file(filename: str) -> bool:
@@ -42,123 +100,753 @@ def index():
     return render_template('index.html')
 
 
+def now_timestamp():
+    return datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+
+def insert_analysis_row(cursor, row, write_key=None):
+    # The JD is stored once per distinct text, the resume text compressed in resume_texts
+    jd_hash = store_job_description(cursor, row['job_description'])
+    cursor.execute("""
+        INSERT INTO resume_analysis
+        (filename, jd_hash, ats_score, matched_skills,
+         missing_skills, skill_match_percentage, suggestions, simhash, duplicate_of,
+         matched_skill_mask, missing_skill_mask, skill_taxonomy, write_key, created_at)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, COALESCE(%s, NOW()))
+    """, (
+        row['filename'],
+        jd_hash,
+        row['ats_score'],
+        row['matched_skills'],
+        row['missing_skills'],
+        row['skill_match_percentage'],
+        row['suggestions'],
+        row.get('simhash'),
+        row.get('duplicate_of'),
+        # Hex in the row so it survives the write-behind spill file
+        bytes.fromhex(row['matched_skill_mask']) if row.get('matched_skill_mask') is not None else None,
+        bytes.fromhex(row['missing_skill_mask']) if row.get('missing_skill_mask') is not None else None,
+        row.get('skill_taxonomy'),
+        write_key,
+        row['created_at']
+    ))
+    resume_id = cursor.lastrowid
+    store_resume_text(cursor, resume_id, row['resume_text'])
+
+    record_analysis(cursor, row['ats_score'], row['skill_match_percentage'], row['created_at'])
+    return resume_id
+
+
+def write_analysis_rows(rows, keys=None):
+    """Insert analysis rows in one transaction; returns their ids.
+
+    keys are write-behind record keys: a row whose key is already stored (a
+    spill file replayed after its batch was committed) is not inserted again.
+    """
+    keys = keys or [None] * len(rows)
+    with db_span('insert_analysis'):
+        db = get_db_connection()
+        cursor = db.cursor()
+        try:
+            stored = {}
+            if any(keys):
+                placeholders = ", ".join(["%s"] * len(keys))
+                cursor.execute(f"SELECT write_key, id FROM resume_analysis WHERE write_key IN ({placeholders})",
+                               tuple(keys))
+                stored = dict(cursor.fetchall())
+            ids = [stored[key] if key in stored else insert_analysis_row(cursor, row, key)
+                   for row, key in zip(rows, keys)]
+            db.commit()
+            return ids
+        finally:
+            cursor.close()
+            db.close()
+
+
+def write_download_logs(rows, keys=None):
+    keys = keys or [None] * len(rows)
+    with db_span('insert_download_logs'):
+        db = get_db_connection()
+        cursor = db.cursor()
+        try:
+            # A replayed spill file may hold logs already written; the unique write_key skips them
+            cursor.executemany(
+                "INSERT IGNORE INTO download_logs (resume_id, write_key, download_time) "
+                "VALUES (%s, %s, COALESCE(%s, NOW()))",
+                [(row['resume_id'], key, row['download_time']) for row, key in zip(rows, keys)]
+            )
+            db.commit()
+            return [None] * len(rows)
+        finally:
+            cursor.close()
+            db.close()
+
+
+WRITE_BEHIND_QUEUES = {
+    # name: (flush function, batch size, flush interval in seconds)
+    'analysis': (write_analysis_rows, 20, 0.05),
+    'download_logs': (write_download_logs, 200, 2.0),
+}
+_writers = {}
+_writers_lock = threading.Lock()
+
+
+def get_writer(name):
+    """Per-process write-behind queue (created after fork, never inherited)"""
+    key = (name, os.getpid())
+    writer = _writers.get(key)
+    if writer is None:
+        with _writers_lock:
+            writer = _writers.get(key)
+            if writer is None:
+                flush, batch_size, interval = WRITE_BEHIND_QUEUES[name]
+                writer = WriteBehindQueue(
+                    name, flush, app.config['WRITE_BEHIND_DIR'],
+                    batch_size=batch_size,
+                    flush_interval=interval,
+                    fsync=app.config['WRITE_BEHIND_FSYNC'],
+                    is_transient=is_transient_error
+                )
+                _writers[key] = writer
+    return writer
+
+
+def validate_analysis_request():
+    """Return (job_description, file, None) or (None, None, error_response)"""
+    job_description = request.form.get('job_description', '').strip()
+    if not job_description:
+        return None, None, (jsonify({'error': 'Job description is required'}), 400)
+
+    if 'resume_file' not in request.files:
+        return None, None, (jsonify({'error': 'No resume file uploaded'}), 400)
+
+    file = request.files['resume_file']
+    if file.filename == '':
+        return None, None, (jsonify({'error': 'No file selected'}), 400)
+
+    if not allowed_file(file.filename):
+        return None, None, (jsonify({'error': 'Invalid file type'}), 400)
+
+    return job_description, file, None
+
+
+# CHANGED ROWS (history edits and re-scores, see utils/changes.py)
+def fetch_analysis_changes(after_id):
+    """[(change id, resume_id)] logged after after_id"""
+    db = get_db_connection()
+    cursor = db.cursor()
+    try:
+        cursor.execute("SELECT id, resume_id FROM analysis_changes WHERE id > %s ORDER BY id", (after_id,))
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+        db.close()
+
+
+# CANDIDATE SEARCH INDEX
+app.config['SEARCH_INDEX_AUTO_SYNC'] = os.environ.get("SEARCH_INDEX_AUTO_SYNC", "1") == "1"
+
+
+def fetch_resume_rows(after_id, limit, ids=None):
+    """Rows for the search index: [(id, resume_text)] with id > after_id, or with these ids"""
+    condition, params = id_condition(after_id, ids, column="resume_analysis.id")
+    db = get_db_connection()
+    cursor = db.cursor()
+    try:
+        cursor.execute(f"""
+            SELECT resume_analysis.id, {RESUME_TEXT_SQL}
+            FROM resume_analysis {TEXT_JOINS}
+            WHERE {condition} ORDER BY resume_analysis.id LIMIT %s
+        """, params + (limit,))
+        return [(resume_id, stored_resume_text(compressed, inline)) for resume_id, compressed, inline in cursor.fetchall()]
+    finally:
+        cursor.close()
+        db.close()
+
+
+candidate_index = CandidateIndex()
+index_updater = IndexUpdater(
+    candidate_index,
+    fetch_resume_rows,
+    delay=float(os.environ.get("SEARCH_INDEX_SYNC_SECONDS", 5)),
+    changes=fetch_analysis_changes
+)
+
+
+# Text and suggestions of recent analyses, so downloads need only the id
+recent_analyses = LRUCache(int(os.environ.get("RECENT_ANALYSIS_CACHE_SIZE", 256)))
+# Entries edited or re-scored in another process are dropped within this many seconds
+RECENT_ANALYSIS_SYNC_SECONDS = float(os.environ.get("RECENT_ANALYSIS_SYNC_SECONDS", 2))
+_recent_sync = {'changes_seen': 0, 'last_sync': 0.0}
+_recent_sync_lock = threading.Lock()
+
+
+def sync_recent_analyses(force=False):
+    """Drop cached analyses logged in analysis_changes since the last sync"""
+    if not force and time.monotonic() - _recent_sync['last_sync'] < RECENT_ANALYSIS_SYNC_SECONDS:
+        return
+    if not _recent_sync_lock.acquire(blocking=False):
+        return  # another thread is already syncing
+    try:
+        changes_seen, changed, rescored = pending_changes(fetch_analysis_changes, _recent_sync['changes_seen'])
+        if rescored:
+            recent_analyses.clear()
+        for resume_id in changed:
+            recent_analyses.pop(resume_id)
+        _recent_sync.update(changes_seen=changes_seen, last_sync=time.monotonic())
+    finally:
+        _recent_sync_lock.release()
+
+
+# NEAR-DUPLICATE DETECTION
+def fetch_fingerprints(after_id, limit, ids=None):
+    """Rows for the duplicate index: [(id, simhash, duplicate_of)] with id > after_id, or with these ids"""
+    condition, params = id_condition(after_id, ids)
+    db = get_db_connection()
+    cursor = db.cursor()
+    try:
+        cursor.execute(
+            f"SELECT id, simhash, duplicate_of FROM resume_analysis WHERE {condition} ORDER BY id LIMIT %s",
+            params + (limit,)
+        )
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+        db.close()
+
+
+duplicate_index = DuplicateIndex(sync_interval=float(os.environ.get("DUPLICATE_SYNC_SECONDS", 2)))
+
+
+def find_duplicates(fingerprint):
+    with db_span('duplicate_sync'):
+        duplicate_index.sync(fetch_fingerprints, changes=fetch_analysis_changes)
+    with span('duplicate_lookup'):
+        return duplicate_index.find(fingerprint)
+
+
+def load_reusable_analysis(duplicates, job_description):
+    """Newest near-duplicate analysed against the same job description, or None"""
+    ids = [resume_id for resume_id, _, _ in duplicates[:20]]
+    with db_span('load_duplicate'):
+        db = get_db_connection()
+        cursor = db.cursor(dictionary=True)
+        try:
+            # job_description is only set on rows not yet moved to job_descriptions
+            cursor.execute(f"""
+                SELECT id, jd_hash, job_description, ats_score, matched_skills, missing_skills,
+                       skill_match_percentage, suggestions
+                FROM resume_analysis WHERE id IN ({', '.join(['%s'] * len(ids))})
+                ORDER BY id DESC
+            """, ids)
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+            db.close()
+
+    jd_hash = job_description_hash(job_description)
+    normalized = normalize_job_description(job_description)
+    for row in rows:
+        if row['jd_hash'] == jd_hash or (
+                row['jd_hash'] is None and normalize_job_description(row['job_description']) == normalized):
+            return row
+    return None
+
+
+def run_analysis(filepath, filename, job_description):
+    """Extract, score and store one resume; returns the results for result.html"""
+    resume_text = extract_text_from_file(filepath)
+
+    if not resume_text or not resume_text.strip():
+        raise ValueError('Could not extract text')
+    TEXT_CHARS.observe(len(resume_text))
+
+    with span('fingerprint'):
+        fingerprint = simhash(resume_text)
+    duplicates = find_duplicates(fingerprint)
+
+    earlier = None
+    if duplicates and app.config['DUPLICATE_REUSE']:
+        earlier = load_reusable_analysis(duplicates, job_description)
+
+    if earlier is not None:
+        # Same job description and a near-identical resume: reuse the scores, but
+        # still store this upload (its own text, id and download token)
+        ats_score = earlier['ats_score']
+        skills_analysis = {
+            'matched_skills': json.loads(earlier['matched_skills'] or '[]'),
+            'missing_skills': json.loads(earlier['missing_skills'] or '[]'),
+            'match_percentage': earlier['skill_match_percentage']
+        }
+        suggestions = json.loads(earlier['suggestions'] or '[]')
+    else:
+        # Tokenize each text once; scoring and suggestions share the features
+        resume_doc = analyze_document(resume_text)
+        job_doc = analyze_job_description(job_description)
+
+        ats_score = calculate_ats_score(resume_doc, job_doc)
+        skills_analysis = analyze_skills_match(resume_doc, job_doc)
+        suggestions = generate_suggestions(resume_doc, job_doc, skills_analysis)
+
+    row = {
+        'filename': filename,
+        'job_description': job_description,
+        'resume_text': resume_text,
+        'ats_score': ats_score,
+        'matched_skills': json.dumps(skills_analysis.get('matched_skills', [])),
+        'missing_skills': json.dumps(skills_analysis.get('missing_skills', [])),
+        'skill_match_percentage': skills_analysis.get('match_percentage', 0),
+        'suggestions': json.dumps(suggestions),
+        'simhash': to_signed(fingerprint),
+        # Cluster id: the first upload of this resume
+        'duplicate_of': duplicates[0][2] if duplicates else None,
+        'matched_skill_mask': encode_skills(skills_analysis.get('matched_skills', [])).hex(),
+        'missing_skill_mask': encode_skills(skills_analysis.get('missing_skills', [])).hex(),
+        'skill_taxonomy': skill_layout()[2],
+        'created_at': None
+    }
+
+    # Save to DB
+    if app.config['DB_WRITE_BEHIND']:
+        row['created_at'] = now_timestamp()
+        future = get_writer('analysis').submit(row)
+        try:
+            with span('db.write_behind_wait'):
+                resume_id = future.result(timeout=app.config['WRITE_BEHIND_WAIT_SECONDS'])
+        except Exception:
+            # Still safe in the spill file; it will be written once MySQL is back
+            resume_id = None
+    else:
+        resume_id = write_analysis_rows([row])[0]
+
+    if resume_id is not None:
+        recent_analyses.put(resume_id, (resume_text, suggestions))
+        duplicate_index.add(resume_id, fingerprint, row['duplicate_of'])
+        if app.config['SEARCH_INDEX_AUTO_SYNC']:
+            index_updater.notify()
+
+    return {
+        'id': resume_id,
+        'download_token': download_token(resume_id),
+        'duplicate_of': earlier['id'] if earlier is not None else None,
+        'ats_score': ats_score,
+        'skill_match_percentage': skills_analysis.get('match_percentage', 0),
+        'matched_skills': skills_analysis.get('matched_skills', []),
+        'missing_skills': skills_analysis.get('missing_skills', []),
+        'suggestions': suggestions,
+        'resume_text': (resume_text[:500] + '...') if len(resume_text) > 500 else resume_text
+    }
+
+
 # RESUME ANALYSIS
 @app.route('/analyze', methods=['POST'])
 def analyze_resume():
+    try:
+        job_description, file, error = validate_analysis_request()
+        if error:
+            return error
+
+        filename = secure_filename(file.filename)
+        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+        file.save(filepath)
+
+        try:
+            try:
+                results = run_analysis(filepath, filename, job_description)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+
+            return render_template('result.html', results=results, job_description=job_description)
+
+        finally:
+            # cleanup uploaded file
+            if os.path.exists(filepath):
+                try:
+                    os.remove(filepath)
+                except Exception:
+                    pass
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+# ASYNCHRONOUS ANALYSIS (submit + poll)
+def run_analysis_job(payload):
+    """Job handler: the spooled upload is removed once the job has run"""
+    start_trace()
+    start = time.perf_counter()
+    try:
+        return run_analysis(payload['filepath'], payload['filename'], payload['job_description'])
+    finally:
+        log_if_slow(f"job {payload['filename']}", time.perf_counter() - start, end_trace())
+        if os.path.exists(payload['filepath']):
+            try:
+                os.remove(payload['filepath'])
+            except Exception:
+                pass
+
+
+analysis_queue = JobQueue(app.config['JOB_QUEUE_PATH'], lease_seconds=app.config['JOB_LEASE_SECONDS'])
+analysis_workers = JobWorkers(
+    analysis_queue,
+    run_analysis_job,
+    size=app.config['JOB_WORKERS'],
+    retention_seconds=app.config['JOB_RETENTION_HOURS'] * 3600
+)
+
+
+def start_background_workers():
+    """Start this process's job worker threads (gunicorn calls it in each worker after fork)"""
+    analysis_workers.ensure_started()
+
+
+@app.before_request
+def start_analysis_workers():
+    # Covers servers without the gunicorn hook (e.g. flask run)
+    analysis_workers.ensure_started()
+
+
+# METRICS
+app.config['SLOW_REQUEST_SECONDS'] = float(os.environ.get("SLOW_REQUEST_SECONDS", 0))
+
+
+def log_if_slow(what, elapsed, spans):
+    """Log the stage breakdown of requests/jobs slower than SLOW_REQUEST_SECONDS (0 = off)"""
+    threshold = app.config['SLOW_REQUEST_SECONDS']
+    if not threshold or elapsed < threshold:
+        return
+    breakdown = ", ".join(f"{stage}={seconds * 1000:.1f}ms" for stage, seconds in spans)
+    app.logger.warning("Slow %s: %.1fms [%s]", what, elapsed * 1000, breakdown)
+
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+    start_trace()
+
+    first_request = record_first_request()
+    if first_request is not None:
+        app.logger.info("Worker %s: first request %.2fs after start, RSS %s MB", os.getpid(), first_request, rss_mb())
+
+
+@app.after_request
+def record_request_metrics(response):
+    elapsed = time.perf_counter() - g.get('request_start', time.perf_counter())
+    spans = end_trace()
+    REQUEST_SECONDS.observe(elapsed, request.endpoint or 'unknown', request.method, response.status_code)
+    log_if_slow(f"{request.method} {request.path}", elapsed, spans)
+    save_snapshot()
+    return response
+
+
+@app.route('/metrics')
+def metrics():
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
+
+
+@app.route('/analyze/submit', methods=['POST'])
+def submit_analysis():
+    try:
+        job_description, file, error = validate_analysis_request()
+        if error:
+            return error
+
+        # Uploads are spooled to a durable directory so queued jobs survive restarts
+        filename = secure_filename(file.filename)
+        filepath = os.path.join(app.config['JOB_SPOOL_FOLDER'], f"{uuid.uuid4().hex}_{filename}")
+        file.save(filepath)
+
+        job_id = analysis_queue.submit({
+            'filepath': filepath,
+            'filename': filename,
+            'job_description': job_description
+        })
+        analysis_workers.notify()
+
+        return jsonify({
+            'job_id': job_id,
+            'status': 'queued',
+            'status_url': f"/analyze/status/{job_id}",
+            'result_url': f"/analyze/result/{job_id}"
+        }), 202
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/analyze/status/<job_id>')
+def analysis_status(job_id):
+    job = analysis_queue.get(job_id)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+
+    response = {'job_id': job_id, 'status': job['status']}
+    if job['status'] == 'done':
+        response['results'] = job['result']
+    elif job['status'] == 'failed':
+        response['error'] = job['error']
+    return jsonify(response)
+
+
+@app.route('/analyze/result/<job_id>')
+def analysis_result(job_id):
+    job = analysis_queue.get(job_id)
+    if not job:
+        return "Job not found", 404
+
+    if job['status'] == 'failed':
+        return jsonify({'error': job['error']}), 500
+
+    job_description = job['payload']['job_description']
+    if job['status'] != 'done':
+        # result.html polls the status endpoint and reloads when the job finishes
+        return render_template('result.html', results=None, pending_job_id=job_id,
+                               job_description=job_description)
+
+    return render_template('result.html', results=job['result'], job_description=job_description)
+
+
+# BATCH RANKING (one job description, many resumes)
+@app.route('/analyze-batch', methods=['POST'])
+def analyze_batch():
     try:
         job_description = request.form.get('job_description', '').strip()
         if not job_description:
             return jsonify({'error': 'Job description is required'}), 400
 
-        if 'resume_file' not in request.files:
-            return jsonify({'error': 'No resume file uploaded'}), 400
+        uploads = request.files.getlist('resume_files')
+        archive = request.files.get('resume_zip')
+        if not any(f.filename for f in uploads) and not (archive and archive.filename):
+            return jsonify({'error': 'No resume files uploaded'}), 400
+
+        resumes = []
+        errors = []
+
+        with tempfile.TemporaryDirectory(dir=app.config['UPLOAD_FOLDER']) as batch_dir:
+            paths = []
+
+            for i, file in enumerate(uploads):
+                if not file.filename:
+                    continue
+                if not allowed_file(file.filename):
+                    errors.append({'filename': file.filename, 'error': 'Invalid file type'})
+                    continue
+                filename = secure_filename(file.filename)
+                filepath = os.path.join(batch_dir, f"{i}_{filename}")
+                file.save(filepath)
+                paths.append((filename, filepath))
+
+            if archive and archive.filename:
+                if not archive.filename.lower().endswith('.zip'):
+                    return jsonify({'error': 'Batch archive must be a .zip file'}), 400
+                try:
+                    with zipfile.ZipFile(archive.stream) as zf:
+                        for i, member in enumerate(zf.infolist()):
+                            name = os.path.basename(member.filename)
+                            if member.is_dir() or not name or not allowed_file(name):
+                                continue
+                            if member.file_size > app.config['MAX_CONTENT_LENGTH']:
+                                errors.append({'filename': name, 'error': 'File too large'})
+                                continue
+                            filename = secure_filename(name)
+                            filepath = os.path.join(batch_dir, f"z{i}_{filename}")
+                            with zf.open(member) as src, open(filepath, 'wb') as dst:
+                                shutil.copyfileobj(src, dst)
+                            paths.append((filename, filepath))
+                except zipfile.BadZipFile:
+                    return jsonify({'error': 'Invalid zip archive'}), 400
+
+            if len(paths) > app.config['MAX_BATCH_FILES']:
+                return jsonify({'error': f"Too many files (max {app.config['MAX_BATCH_FILES']})"}), 400
+
+            # PDF and DOCX files go through the extraction pool, several at a time
+            extracted = extract_texts([filepath for _, filepath in paths])
+            for (filename, _), (text, error) in zip(paths, extracted):
+                if error is not None:
+                    errors.append({'filename': filename, 'error': error})
+                elif not text or not text.strip():
+                    errors.append({'filename': filename, 'error': 'Could not extract text'})
+                else:
+                    resumes.append((filename, text))
+
+        ranked = rank_resumes(job_description, resumes)
+
+        return jsonify({
+            'total_resumes': len(ranked),
+            'results': ranked,
+            'errors': errors
+        })
 
-        file = request.files['resume_file']
-        if file.filename == '':
-            return jsonify({'error': 'No file selected'}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
 
-        if not allowed_file(file.filename):
-            return jsonify({'error': 'Invalid file type'}), 400
 
-        filename = secure_filename(file.filename)
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(filepath)
+# JOB POSTING CATALOG (one resume against every open posting)
+POSTING_MATCH_DEFAULT = 10
+POSTING_MATCH_MAX = 50
+
 
+def load_posting_signature():
+    """Changes whenever a posting is added, edited, closed or reopened"""
+    db = get_db_connection()
+    cursor = db.cursor()
+    try:
+        cursor.execute("SELECT COUNT(*), MAX(id), MAX(updated_at) FROM job_postings WHERE is_open = 1")
+        return tuple(str(value) for value in cursor.fetchone())
+    finally:
+        cursor.close()
+        db.close()
+
+
+def load_open_postings():
+    with db_span('load_postings'):
+        db = get_db_connection()
+        cursor = db.cursor()
         try:
-            resume_text = extract_text_from_file(filepath)
+            cursor.execute("SELECT id, title, description FROM job_postings WHERE is_open = 1 ORDER BY id")
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+            db.close()
 
-            if not resume_text or not resume_text.strip():
-                return jsonify({'error': 'Could not extract text'}), 400
 
-            ats_score = calculate_ats_score(resume_text, job_description)
-            skills_analysis = analyze_skills_match(resume_text, job_description)
-            suggestions = generate_suggestions(resume_text, job_description, skills_analysis)
+posting_catalog = CatalogCache(check_interval=float(os.environ.get("POSTING_CATALOG_CHECK_SECONDS", 30)))
 
-            # Save to DB
-            db = get_db_connection()
-            cursor = db.cursor()
-            try:
-                cursor.execute("""
-                    INSERT INTO resume_analysis
-                    (filename, job_description, resume_text, ats_score, matched_skills,
-                     missing_skills, skill_match_percentage, suggestions, created_at)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, NOW())
-                """, (
-                    filename,
-                    job_description,
-                    resume_text,
-                    ats_score,
-                    json.dumps(skills_analysis.get('matched_skills', [])),
-                    json.dumps(skills_analysis.get('missing_skills', [])),
-                    skills_analysis.get('match_percentage', 0),
-                    json.dumps(suggestions)
-                ))
 
-                db.commit()
-                resume_id = cursor.lastrowid
-            finally:
-                cursor.close()
-                db.close()
-
-            results = {
-                'id': resume_id,
-                'ats_score': ats_score,
-                'skill_match_percentage': skills_analysis.get('match_percentage', 0),
-                'matched_skills': skills_analysis.get('matched_skills', []),
-                'missing_skills': skills_analysis.get('missing_skills', []),
-                'suggestions': suggestions,
-                'resume_text': (resume_text[:500] + '...') if len(resume_text) > 500 else resume_text
-            }
+@app.route('/match-postings', methods=['POST'])
+def match_postings():
+    """Score one uploaded resume against every open job posting"""
+    try:
+        file = request.files.get('resume_file')
+        if file is None or not file.filename:
+            return jsonify({'error': 'No resume file uploaded'}), 400
+        if not allowed_file(file.filename):
+            return jsonify({'error': 'Invalid file type'}), 400
 
-            return render_template('result.html', results=results, job_description=job_description)
+        try:
+            k = max(1, min(int(request.form.get('k', POSTING_MATCH_DEFAULT)), POSTING_MATCH_MAX))
+        except ValueError:
+            return jsonify({'error': 'Invalid k'}), 400
 
+        filename = secure_filename(file.filename)
+        filepath = os.path.join(app.config['UPLOAD_FOLDER'], f"{uuid.uuid4().hex}_{filename}")
+        file.save(filepath)
+        try:
+            resume_text = extract_text_from_file(filepath)
         finally:
-            # cleanup uploaded file
             if os.path.exists(filepath):
                 try:
                     os.remove(filepath)
                 except Exception:
                     pass
 
+        if not resume_text or not resume_text.strip():
+            return jsonify({'error': 'Could not extract text'}), 400
+
+        with span('posting_catalog'):
+            catalog = posting_catalog.get(load_posting_signature, load_open_postings)
+        start = time.perf_counter()
+        with span('posting_match'):
+            matches = catalog.match(resume_text, k=k)
+
+        return jsonify({
+            'filename': filename,
+            'total_postings': len(catalog),
+            'results': matches,
+            'took_ms': round((time.perf_counter() - start) * 1000, 2)
+        })
+
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+def download_token(resume_id):
+    return download_tokens.dumps(resume_id) if resume_id is not None else None
+
+
+def download_allowed(resume_id, token):
+    """Only the uploader (holding the token from their results) or an admin may read a stored resume"""
+    if 'admin' in session:
+        return True
+    try:
+        return download_tokens.loads(token or '', max_age=app.config['DOWNLOAD_TOKEN_MAX_AGE']) == resume_id
+    except BadSignature:
+        return False
+
+
+def load_stored_analysis(resume_id):
+    """(resume_text, suggestions) of an analysis, from the hot cache or the DB"""
+    with db_span('recent_analyses_sync'):
+        sync_recent_analyses()
+    stored = recent_analyses.get(resume_id)
+    if stored is not None:
+        return stored
+    changes_seen = _recent_sync['changes_seen']
+
+    with db_span('load_analysis'):
+        db = get_db_connection()
+        cursor = db.cursor()
+        try:
+            cursor.execute(f"""
+                SELECT {RESUME_TEXT_SQL}, resume_analysis.suggestions
+                FROM resume_analysis {TEXT_JOINS}
+                WHERE resume_analysis.id=%s
+            """, (resume_id,))
+            row = cursor.fetchone()
+        finally:
+            cursor.close()
+            db.close()
+
+    if not row:
+        return None
+
+    compressed, inline, suggestions = row
+    stored = (stored_resume_text(compressed, inline) or '', json.loads(suggestions) if suggestions else [])
+    with _recent_sync_lock:
+        # A sync since the read may already have dropped an edit of this row; do not cache the old version
+        if _recent_sync['changes_seen'] == changes_seen:
+            recent_analyses.put(resume_id, stored)
+    return stored
+
+
 # DOWNLOAD OPTIMIZED RESUME
 @app.route('/download-optimized', methods=['POST'])
 def download_optimized_resume():
     try:
         data = request.get_json(force=True)
-        resume_text = data.get('resume_text')
-        suggestions = data.get('suggestions', [])
         resume_id = data.get('resume_id')
 
-        if not resume_text:
-            return jsonify({'error': 'Resume text missing'}), 400
-
         if not resume_id:
             return jsonify({'error': 'Resume ID missing'}), 400
 
-        # create_optimized_resume should return a path to a .docx file (existing on disk)
-        optimized_file_path = create_optimized_resume(resume_text, suggestions)
-        if not optimized_file_path or not os.path.exists(optimized_file_path):
-            return jsonify({'error': 'Could not generate optimized resume'}), 500
+        try:
+            resume_id = int(resume_id)
+        except (TypeError, ValueError):
+            return jsonify({'error': 'Invalid resume ID'}), 400
+
+        # Older clients still post the text themselves
+        resume_text = data.get('resume_text')
+        if resume_text:
+            suggestions = data.get('suggestions', [])
+        else:
+            if not download_allowed(resume_id, data.get('token')):
+                return jsonify({'error': 'Download link is invalid or has expired'}), 403
+            stored = load_stored_analysis(resume_id)
+            if stored is None:
+                return jsonify({'error': 'Resume not found'}), 404
+            resume_text, suggestions = stored
+
+        # Built in memory (and cached), nothing is written to disk
+        optimized_docx = create_optimized_resume(resume_text, suggestions)
 
         # Log download
-        db = get_db_connection()
-        cursor = db.cursor()
-        try:
-            cursor.execute(
-                "INSERT INTO download_logs (resume_id, download_time) VALUES (%s, NOW())",
-                (resume_id,)
-            )
-            db.commit()
-        finally:
-            cursor.close()
-            db.close()
+        if app.config['DB_WRITE_BEHIND']:
+            get_writer('download_logs').submit({'resume_id': resume_id, 'download_time': now_timestamp()})
+        else:
+            write_download_logs([{'resume_id': resume_id, 'download_time': None}])
 
         return send_file(
-            optimized_file_path,
+            io.BytesIO(optimized_docx),
             as_attachment=True,
             download_name="optimized_resume.docx",
             mimetype="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
@@ -198,22 +886,19 @@ def admin_login():
     return render_template("admin_login.html")
 
 
-@app.route("/admin/dashboard")
-def admin_dashboard():
-    if 'admin' not in session:
-        return redirect("/admin/login")
+# Dashboard numbers come from the rollup tables and are cached briefly per process
+dashboard_cache = TTLCache(int(os.environ.get("DASHBOARD_CACHE_SECONDS", 10)))
+
+
+def load_dashboard_stats():
+    stats = dashboard_cache.get('dashboard')
+    if stats is not None:
+        return stats
 
     db = get_db_connection()
     cursor = db.cursor()
     try:
-        cursor.execute("SELECT COUNT(*) FROM resume_analysis")
-        total_resumes = cursor.fetchone()[0] or 0
-
-        cursor.execute("SELECT AVG(ats_score) FROM resume_analysis")
-        avg_ats_score = cursor.fetchone()[0] or 0
-
-        cursor.execute("SELECT AVG(skill_match_percentage) FROM resume_analysis")
-        avg_skill_match = cursor.fetchone()[0] or 0
+        totals = load_dashboard_totals(cursor)
 
         cursor.execute("""
             SELECT DATE(created_at), ats_score, skill_match_percentage
@@ -232,15 +917,202 @@ def admin_dashboard():
     skill_matches = [row[2] for row in rows][::-1]
 
     stats = {
-        "total_resumes": total_resumes,
-        "avg_ats_score": round(float(avg_ats_score or 0), 2),
-        "avg_skill_match": round(float(avg_skill_match or 0), 2),
+        "total_resumes": totals['total_resumes'],
+        "avg_ats_score": round(float(totals['avg_ats_score'] or 0), 2),
+        "avg_skill_match": round(float(totals['avg_skill_match'] or 0), 2),
+        "score_histogram": totals['score_histogram'],
         "dates": dates,
         "ats_scores": ats_scores,
         "skill_matches": skill_matches
     }
+    dashboard_cache.put('dashboard', stats)
+    return stats
+
+
+def fetch_skill_masks(after_id, taxonomy, limit, ids=None):
+    """Rows for skill analytics: [(id, created_at, matched mask, missing mask)] with id > after_id, or with these ids"""
+    condition, params = id_condition(after_id, ids)
+    db = get_db_connection()
+    cursor = db.cursor()
+    try:
+        cursor.execute(f"""
+            SELECT id, created_at, matched_skill_mask, missing_skill_mask
+            FROM resume_analysis
+            WHERE {condition} AND skill_taxonomy = %s
+            ORDER BY id LIMIT %s
+        """, params + (taxonomy, limit))
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+        db.close()
+
+
+skill_analytics = SkillAnalytics(sync_interval=float(os.environ.get("SKILL_STATS_SYNC_SECONDS", 10)))
+SKILL_STATS_DAYS = 30
+
+
+def load_skill_stats(days):
+    """Skill frequency and gaps over the last `days` days (0 = all time)"""
+    key = f"skills:{days}"
+    stats = dashboard_cache.get(key)
+    if stats is not None:
+        return stats
+
+    with db_span('skill_masks_sync'):
+        skill_analytics.sync(fetch_skill_masks, changes=fetch_analysis_changes)
+    since = datetime.date.today() - datetime.timedelta(days=days - 1) if days > 0 else None
+    with span('skill_stats'):
+        stats = skill_analytics.summary(since=since)
+    dashboard_cache.put(key, stats)
+    return stats
+
+
+@app.route("/admin/dashboard")
+def admin_dashboard():
+    if 'admin' not in session:
+        return redirect("/admin/login")
+
+    days = _int_arg(request.args, 'skill_days')
+    days = SKILL_STATS_DAYS if days is None else max(0, days)
+    return render_template("admin_dashboard.html", stats=load_dashboard_stats(),
+                           skill_stats=load_skill_stats(days), skill_days=days)
+
+
+@app.route("/admin/skill-stats")
+def admin_skill_stats():
+    if 'admin' not in session:
+        return redirect("/admin/login")
+
+    days = _int_arg(request.args, 'days')
+    return jsonify(load_skill_stats(SKILL_STATS_DAYS if days is None else max(0, days)))
+
+
+@app.route("/admin/cache-stats")
+def admin_cache_stats():
+    if 'admin' not in session:
+        return redirect("/admin/login")
+
+    return jsonify({
+        'jd_features': jd_feature_cache.stats(),
+        'extraction': extraction_cache.stats(),
+        'extraction_pool': extraction_pool_stats(),
+        'analysis_jobs': analysis_queue.stats(),
+        'db_pool': db_pool.stats(),
+        'dashboard': dashboard_cache.stats(),
+        'optimized_resume': optimized_resume_cache.stats(),
+        'recent_analyses': recent_analyses.stats(),
+        'process': process_stats(),
+        'search_index': candidate_index.stats(),
+        'duplicates': duplicate_index.stats(),
+        'skill_analytics': skill_analytics.stats(),
+        'posting_catalog': posting_catalog.stats(),
+        'write_behind': {name: writer.stats() for (name, pid), writer in _writers.items() if pid == os.getpid()}
+    })
+
+
+@app.route("/admin/search", methods=["POST"])
+def admin_candidate_search():
+    """Top-k stored resumes for a pasted job description"""
+    if 'admin' not in session:
+        return redirect("/admin/login")
+
+    data = request.get_json(silent=True) or request.form
+    job_description = (data.get('job_description') or '').strip()
+    if not job_description:
+        return jsonify({'error': 'Job description is required'}), 400
+
+    try:
+        k = max(1, min(int(data.get('k', 20)), 200))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Invalid k'}), 400
+
+    start = time.perf_counter()
+    with span('candidate_search'):
+        matches = candidate_index.search(job_description, k=k)
+    took_ms = (time.perf_counter() - start) * 1000
+
+    rows = {}
+    if matches:
+        ids = [match[0] for match in matches]
+        db = get_db_connection()
+        cursor = db.cursor(dictionary=True)
+        try:
+            cursor.execute(
+                f"SELECT {HISTORY_SUMMARY_COLUMNS} FROM resume_analysis WHERE id IN ({', '.join(['%s'] * len(ids))})",
+                ids
+            )
+            rows = {row['id']: row for row in cursor.fetchall()}
+        finally:
+            cursor.close()
+            db.close()
+
+    results = []
+    for resume_id, score, similarity, skill_overlap in matches:
+        row = rows.get(resume_id)
+        if row is None:
+            continue  # deleted since it was indexed
+        results.append({
+            'id': resume_id,
+            'filename': row['filename'],
+            'ats_score': row['ats_score'],
+            'created_at': str(row['created_at']),
+            'score': round(score * 100, 2),
+            'text_similarity': round(similarity * 100, 2),
+            'skill_overlap': round(skill_overlap * 100, 2)
+        })
+
+    return jsonify({'results': results, 'took_ms': round(took_ms, 2), 'indexed': candidate_index.stats()['documents']})
+
+
+@app.route("/admin/postings", methods=["GET", "POST"])
+def admin_postings():
+    """List open job postings (GET) or add one (POST title + description)"""
+    if 'admin' not in session:
+        return redirect("/admin/login")
+
+    db = get_db_connection()
+    cursor = db.cursor(dictionary=True)
+    try:
+        if request.method == "POST":
+            data = request.get_json(silent=True) or request.form
+            title = (data.get('title') or '').strip()
+            description = (data.get('description') or '').strip()
+            if not title or not description:
+                return jsonify({'error': 'Title and description are required'}), 400
+
+            cursor.execute("INSERT INTO job_postings (title, description) VALUES (%s, %s)", (title, description))
+            db.commit()
+            posting_catalog.invalidate()
+            return jsonify({'id': cursor.lastrowid}), 201
+
+        cursor.execute("SELECT id, title, created_at FROM job_postings WHERE is_open = 1 ORDER BY id DESC")
+        postings = [dict(row, created_at=str(row['created_at'])) for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+        db.close()
+
+    return jsonify({'postings': postings})
+
+
+@app.route("/admin/postings/<int:posting_id>/close", methods=["POST"])
+def admin_close_posting(posting_id):
+    if 'admin' not in session:
+        return redirect("/admin/login")
 
-    return render_template("admin_dashboard.html", stats=stats)
+    db = get_db_connection()
+    cursor = db.cursor()
+    try:
+        cursor.execute("UPDATE job_postings SET is_open = 0 WHERE id = %s", (posting_id,))
+        db.commit()
+        closed = cursor.rowcount
+    finally:
+        cursor.close()
+        db.close()
+
+    if not closed:
+        return jsonify({'error': 'Posting not found'}), 404
+    posting_catalog.invalidate()
+    return jsonify({'closed': posting_id})
 
 
 @app.route("/admin/logout")
@@ -254,34 +1126,227 @@ def admin_home():
     return redirect("/admin/login")
 
 
+HISTORY_PAGE_SIZE = 50
+HISTORY_MAX_PAGE_SIZE = 200
+HISTORY_SUMMARY_COLUMNS = "id, filename, ats_score, skill_match_percentage, duplicate_of, created_at"
+
+
+def _int_arg(args, name):
+    try:
+        return int(args.get(name, ''))
+    except ValueError:
+        return None
+
+
+def _date_arg(args, name):
+    try:
+        return datetime.date.fromisoformat(args.get(name, ''))
+    except ValueError:
+        return None
+
+
+def history_filters(args):
+    """Parse score/date/cluster filters into SQL conditions (score uses idx_ats_score,
+    dates idx_created_at, clusters idx_duplicate_of)"""
+    filters = {
+        'min_score': _int_arg(args, 'min_score'),
+        'max_score': _int_arg(args, 'max_score'),
+        'date_from': _date_arg(args, 'date_from'),
+        'date_to': _date_arg(args, 'date_to'),
+        'cluster': _int_arg(args, 'cluster'),
+    }
+
+    conditions = []
+    params = []
+    if filters['min_score'] is not None:
+        conditions.append("ats_score >= %s")
+        params.append(filters['min_score'])
+    if filters['max_score'] is not None:
+        conditions.append("ats_score <= %s")
+        params.append(filters['max_score'])
+    if filters['date_from'] is not None:
+        conditions.append("created_at >= %s")
+        params.append(filters['date_from'])
+    if filters['date_to'] is not None:
+        conditions.append("created_at < %s")
+        params.append(filters['date_to'] + datetime.timedelta(days=1))
+    if filters['cluster'] is not None:
+        # The first upload and every near-duplicate stored after it
+        conditions.append("(id = %s OR duplicate_of = %s)")
+        params.extend([filters['cluster'], filters['cluster']])
+
+    return filters, conditions, params
+
+
 @app.route("/admin/history")
 def admin_history():
     if 'admin' not in session:
         return redirect("/admin/login")
 
+    filters, conditions, params = history_filters(request.args)
+
+    limit = _int_arg(request.args, 'limit') or HISTORY_PAGE_SIZE
+    limit = max(1, min(limit, HISTORY_MAX_PAGE_SIZE))
+
+    # Keyset pagination: continue after the last (created_at, id) of the previous page
+    before_created = request.args.get('before_created')
+    before_id = _int_arg(request.args, 'before_id')
+    if before_created and before_id is not None:
+        conditions.append("(created_at < %s OR (created_at = %s AND id < %s))")
+        params.extend([before_created, before_created, before_id])
+
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
     db = get_db_connection()
     cursor = db.cursor(dictionary=True)
     try:
-        cursor.execute("SELECT * FROM resume_analysis ORDER BY created_at DESC")
+        cursor.execute(f"""
+            SELECT {HISTORY_SUMMARY_COLUMNS}
+            FROM resume_analysis
+            {where}
+            ORDER BY created_at DESC, id DESC
+            LIMIT %s
+        """, (*params, limit + 1))
         history = cursor.fetchall()
     finally:
         cursor.close()
         db.close()
 
-    return render_template("admin_history.html", history=history)
+    next_page = None
+    if len(history) > limit:
+        history = history[:limit]
+        last = history[-1]
+        next_args = {k: v for k, v in request.args.items() if k not in ('before_created', 'before_id')}
+        next_args.update(before_created=str(last['created_at']), before_id=last['id'])
+        next_page = url_for('admin_history', **next_args)
+
+    active_filters = {k: v for k, v in filters.items() if v is not None}
+    first_page = None
+    if before_id is not None:
+        first_page = url_for('admin_history', **active_filters)
+
+    export_links = {fmt: url_for('admin_history_export', format=fmt, **active_filters) for fmt in EXPORT_FORMATS}
+
+    return render_template("admin_history.html", history=history, filters=filters,
+                           next_page=next_page, first_page=first_page, export_links=export_links)
+
+
+EXPORT_COLUMNS = [
+    'id', 'filename', 'ats_score', 'skill_match_percentage', 'matched_skills', 'missing_skills',
+    'suggestions', 'job_description', 'resume_text', 'created_at'
+]
+EXPORT_JSON_COLUMNS = ('matched_skills', 'missing_skills', 'suggestions')
+EXPORT_FORMATS = {'jsonl': 'application/x-ndjson', 'csv': 'text/csv'}
+EXPORT_BATCH_SIZE = 500
+# Text columns come from the side tables; resume text is decompressed per batch
+EXPORT_SELECT = ", ".join(
+    JOB_DESCRIPTION_SQL if column == 'job_description'
+    else RESUME_TEXT_SQL if column == 'resume_text'
+    else f"resume_analysis.{column}"
+    for column in EXPORT_COLUMNS
+)
+EXPORT_TEXT_INDEX = EXPORT_COLUMNS.index('resume_text')
+
+
+def _export_rows(rows):
+    i = EXPORT_TEXT_INDEX
+    return [tuple(row[:i]) + (stored_resume_text(row[i], row[i + 1]),) + tuple(row[i + 2:]) for row in rows]
+
+
+def _export_jsonl(rows):
+    lines = []
+    for row in rows:
+        record = dict(zip(EXPORT_COLUMNS, row))
+        for column in EXPORT_JSON_COLUMNS:
+            try:
+                record[column] = json.loads(record[column]) if record[column] else []
+            except ValueError:
+                pass
+        lines.append(json.dumps(record, default=str) + "\n")
+    return "".join(lines)
 
 
-@app.route("/admin/history/view/<int:record_id>")
-def admin_history_view(record_id):
+def _export_csv(rows, header=False):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(EXPORT_COLUMNS)
+    writer.writerows(rows)
+    return buffer.getvalue()
+
+
+@app.route("/admin/history/export")
+def admin_history_export():
+    """Stream the (filtered) history as JSONL or CSV without buffering it"""
+    if 'admin' not in session:
+        return redirect("/admin/login")
+
+    fmt = request.args.get('format', 'jsonl')
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({'error': 'Unsupported export format'}), 400
+
+    filters, conditions, params = history_filters(request.args)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    def generate():
+        db = get_db_connection()
+        # Unbuffered cursor: rows are read from the socket as they are sent
+        cursor = db.cursor()
+        try:
+            cursor.execute(f"""
+                SELECT {EXPORT_SELECT}
+                FROM resume_analysis {TEXT_JOINS}
+                {where}
+                ORDER BY resume_analysis.id
+            """, params)
+
+            if fmt == 'csv':
+                yield _export_csv([], header=True)
+            while True:
+                rows = cursor.fetchmany(EXPORT_BATCH_SIZE)
+                if not rows:
+                    break
+                rows = _export_rows(rows)
+                yield _export_jsonl(rows) if fmt == 'jsonl' else _export_csv(rows)
+        finally:
+            cursor.close()
+            db.close()
+
+    filename = f"resume_history_{datetime.date.today().isoformat()}.{fmt}"
+    return Response(
+        stream_with_context(generate()),
+        mimetype=EXPORT_FORMATS[fmt],
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    )
+
+
+def load_analysis_record(record_id):
+    """One full resume_analysis row with its JD and resume text filled in, or None"""
     db = get_db_connection()
     cursor = db.cursor(dictionary=True)
     try:
-        cursor.execute("SELECT * FROM resume_analysis WHERE id=%s", (record_id,))
+        cursor.execute(f"""
+            SELECT resume_analysis.*, jd.job_description AS stored_job_description, rt.text_zlib
+            FROM resume_analysis {TEXT_JOINS}
+            WHERE resume_analysis.id=%s
+        """, (record_id,))
         data = cursor.fetchone()
     finally:
         cursor.close()
         db.close()
 
+    if data:
+        data['job_description'] = data.pop('stored_job_description') or data['job_description']
+        data['resume_text'] = stored_resume_text(data.pop('text_zlib'), data['resume_text'])
+    return data
+
+
+@app.route("/admin/history/view/<int:record_id>")
+def admin_history_view(record_id):
+    if 'admin' not in session:
+        return redirect("/admin/login")
+
+    data = load_analysis_record(record_id)
     if not data:
         return "Record not found", 404
 
@@ -290,10 +1355,17 @@ def admin_history_view(record_id):
 
 @app.route("/admin/history/download/<int:record_id>")
 def admin_history_download(record_id):
+    if 'admin' not in session:
+        return redirect("/admin/login")
+
     db = get_db_connection()
     cursor = db.cursor()
     try:
-        cursor.execute("SELECT resume_text, filename FROM resume_analysis WHERE id=%s", (record_id,))
+        cursor.execute(f"""
+            SELECT {RESUME_TEXT_SQL}, resume_analysis.filename
+            FROM resume_analysis {TEXT_JOINS}
+            WHERE resume_analysis.id=%s
+        """, (record_id,))
         row = cursor.fetchone()
     finally:
         cursor.close()
@@ -302,54 +1374,458 @@ def admin_history_download(record_id):
     if not row:
         return "Record not found", 404
 
-    text, filename = row
-    # create a safe temporary file and return it
-    tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".txt", prefix=f"download_{record_id}_", dir=".")
-    try:
-        tmp.write(text.encode('utf-8'))
-        tmp.flush()
-        tmp.close()
-        return send_file(tmp.name, as_attachment=True, download_name=f"{filename}.txt", mimetype="text/plain")
-    finally:
-        # schedule removal (do not remove immediately; returned file must be read by client)
-        # optionally: use a background cleaner or remove after some time.
-        pass
+    compressed, inline, filename = row
+    text = stored_resume_text(compressed, inline)
+    return send_file(
+        io.BytesIO((text or '').encode('utf-8')),
+        as_attachment=True,
+        download_name=f"{filename}.txt",
+        mimetype="text/plain"
+    )
 
 
 @app.route("/admin/history/update/<int:record_id>", methods=["GET", "POST"])
 def admin_history_update(record_id):
-    db = get_db_connection()
-    cursor = db.cursor(dictionary=True)
+    if 'admin' not in session:
+        return redirect("/admin/login")
 
     if request.method == "POST":
         new_job = request.form.get("job_description", "")
         new_text = request.form.get("resume_text", "")
 
+        db = get_db_connection()
+        cursor = db.cursor()
         try:
+            cursor.execute(
+                "SELECT ats_score, skill_match_percentage, created_at FROM resume_analysis WHERE id=%s", (record_id,)
+            )
+            current = cursor.fetchone()
+            if not current:
+                return "Record not found", 404
+
+            # Edited text gets the same scoring as a new upload
+            fields = score_fields(new_text, new_job)
+
+            jd_hash = store_job_description(cursor, new_job)
             cursor.execute("""
                 UPDATE resume_analysis
-                SET job_description=%s, resume_text=%s
+                SET jd_hash=%s, job_description=NULL, resume_text=NULL, simhash=%s
                 WHERE id=%s
-            """, (new_job, new_text, record_id))
+            """, (jd_hash, to_signed(simhash(new_text)), record_id))
+            cursor.execute(RESCORE_UPDATE_SQL, fields + (record_id,))
+            store_resume_text(cursor, record_id, new_text)
+            rescore_analysis(cursor, current[:2], fields[:2], current[2])
+            # Every worker's duplicate index, skill analytics and the search index reload this row
+            record_change(cursor, record_id)
             db.commit()
         finally:
             cursor.close()
             db.close()
 
+        recent_analyses.pop(record_id)
+        dashboard_cache.invalidate()
+        if app.config['SEARCH_INDEX_AUTO_SYNC']:
+            index_updater.notify()
+
         return redirect("/admin/history")
 
+    data = load_analysis_record(record_id)
+    if not data:
+        return "Record not found", 404
+
+    return render_template("admin_update.html", data=data)
+
+
+# -----------------------
+# CLI COMMANDS
+# -----------------------
+def iter_history_texts(batch_size=500):
+    """Stream resume texts and distinct job descriptions from the history"""
+    queries = (
+        f"SELECT {RESUME_TEXT_SQL} FROM resume_analysis {TEXT_JOINS}",
+        "SELECT NULL, job_description FROM job_descriptions",
+        # rows not yet moved by migrate-text-storage
+        "SELECT DISTINCT NULL, job_description FROM resume_analysis WHERE job_description IS NOT NULL",
+    )
+    db = get_db_connection()
+    cursor = db.cursor()
+    try:
+        for query in queries:
+            cursor.execute(query)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for compressed, inline in rows:
+                    text = stored_resume_text(compressed, inline)
+                    if text:
+                        yield text
+    finally:
+        cursor.close()
+        db.close()
+
+
+@app.cli.command("fit-tfidf")
+@click.option("--output", default=TFIDF_MODEL_PATH, show_default=True, help="Where to write the model")
+@click.option("--max-features", default=50000, show_default=True)
+@click.option("--min-df", default=2, show_default=True)
+def fit_tfidf_command(output, max_features, min_df):
+    """Fit the corpus TF-IDF model on the resume_analysis history.
+
+    Run periodically (e.g. from cron); workers pick up the new file on their
+    next reload check (TFIDF_RELOAD_SECONDS).
+    """
+    vectorizer = fit_corpus_vectorizer(iter_history_texts(), max_features=max_features, min_df=min_df)
+    save_vectorizer(vectorizer, output)
+    click.echo(f"Saved TF-IDF model with {len(vectorizer.vocabulary_)} terms to {output}")
+
+
+@app.cli.command("build-search-index")
+@click.option("--rebuild", is_flag=True, help="Drop the index and re-index every stored resume")
+def build_search_index_command(rebuild):
+    """Add stored resumes that are not indexed yet to the candidate search index"""
+    start = time.perf_counter()
+    if rebuild:
+        added = candidate_index.rebuild(fetch_resume_rows, changes=fetch_analysis_changes)
+    else:
+        added = candidate_index.sync(fetch_resume_rows, changes=fetch_analysis_changes)
+    stats = candidate_index.stats()
+    click.echo(f"Indexed {added} resumes in {time.perf_counter() - start:.1f}s "
+               f"({stats['documents']} total, {stats['segments']} segments)")
+
+
+def log_full_change(db, cursor):
+    """Log that a batch command changed rows in place, so every worker reloads its caches"""
     try:
-        cursor.execute("SELECT * FROM resume_analysis WHERE id=%s", (record_id,))
-        data = cursor.fetchone()
+        record_change(cursor)
+        db.commit()
+    except Exception as e:
+        click.echo(f"Could not log the change in analysis_changes: {e}", err=True)
+
+
+@app.cli.command("fingerprint-history")
+@click.option("--batch-size", default=500, show_default=True)
+def fingerprint_history_command(batch_size):
+    """Compute near-duplicate fingerprints and clusters for rows stored without one"""
+    index = DuplicateIndex()
+    index.sync(fetch_fingerprints, force=True)
+
+    db = get_db_connection()
+    cursor = db.cursor()
+    updated = duplicates = 0
+    last_id = 0
+    try:
+        while True:
+            cursor.execute(f"""
+                SELECT resume_analysis.id, {RESUME_TEXT_SQL}
+                FROM resume_analysis {TEXT_JOINS}
+                WHERE resume_analysis.id > %s AND resume_analysis.simhash IS NULL
+                ORDER BY resume_analysis.id LIMIT %s
+            """, (last_id, batch_size))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+
+            updates = []
+            for resume_id, compressed, inline in rows:
+                fingerprint = simhash(stored_resume_text(compressed, inline))
+                if fingerprint is None:
+                    continue
+                matches = [m for m in index.find(fingerprint) if m[0] != resume_id]
+                cluster = matches[0][2] if matches else None
+                index.add(resume_id, fingerprint, cluster)
+                updates.append((to_signed(fingerprint), cluster, resume_id))
+                duplicates += cluster is not None
+
+            if updates:
+                cursor.executemany("UPDATE resume_analysis SET simhash=%s, duplicate_of=%s WHERE id=%s", updates)
+                db.commit()
+            updated += len(updates)
+            last_id = rows[-1][0]
     finally:
+        if updated:
+            # Workers' duplicate indexes have already passed these ids; make them reload
+            log_full_change(db, cursor)
         cursor.close()
         db.close()
 
-    if not data:
-        return "Record not found", 404
+    click.echo(f"Fingerprinted {updated} resumes, {duplicates} near-duplicates of earlier uploads")
 
-    return render_template("admin_update.html", data=data)
+
+@app.cli.command("skill-masks")
+@click.option("--batch-size", default=1000, show_default=True)
+def skill_masks_command(batch_size):
+    """Encode skill bitmasks for rows stored without them or under another skill taxonomy"""
+    taxonomy = skill_layout()[2]
+
+    db = get_db_connection()
+    cursor = db.cursor()
+    updated = 0
+    last_id = 0
+    try:
+        while True:
+            cursor.execute("""
+                SELECT id, matched_skills, missing_skills FROM resume_analysis
+                WHERE id > %s AND (skill_taxonomy IS NULL OR skill_taxonomy <> %s)
+                ORDER BY id LIMIT %s
+            """, (last_id, taxonomy, batch_size))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+
+            cursor.executemany(
+                "UPDATE resume_analysis SET matched_skill_mask=%s, missing_skill_mask=%s, skill_taxonomy=%s WHERE id=%s",
+                [(encode_skills(json.loads(matched or '[]')), encode_skills(json.loads(missing or '[]')), taxonomy, resume_id)
+                 for resume_id, matched, missing in rows]
+            )
+            db.commit()
+            updated += len(rows)
+            last_id = rows[-1][0]
+    finally:
+        if updated:
+            # Workers' skill analytics have already passed these ids; make them reload
+            log_full_change(db, cursor)
+        cursor.close()
+        db.close()
+
+    click.echo(f"Encoded skill masks for {updated} analyses (taxonomy {taxonomy})")
+
+
+@app.cli.command("import-postings")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+def import_postings_command(path):
+    """Add job postings from a .jsonl or .csv file with title and description fields"""
+    with open(path, encoding='utf-8', newline='') as f:
+        if path.lower().endswith('.csv'):
+            records = list(csv.DictReader(f))
+        else:
+            records = [json.loads(line) for line in f if line.strip()]
+
+    postings = [((r.get('title') or '').strip(), (r.get('description') or '').strip()) for r in records]
+    postings = [p for p in postings if p[0] and p[1]]
+
+    db = get_db_connection()
+    cursor = db.cursor()
+    try:
+        for i in range(0, len(postings), 500):
+            cursor.executemany("INSERT INTO job_postings (title, description) VALUES (%s, %s)", postings[i:i + 500])
+        db.commit()
+    finally:
+        cursor.close()
+        db.close()
+
+    click.echo(f"Imported {len(postings)} job postings ({len(records) - len(postings)} skipped)")
+
+
+@app.cli.command("migrate-text-storage")
+@click.option("--batch-size", default=500, show_default=True)
+def migrate_text_storage_command(batch_size):
+    """Move inline job descriptions and resume texts into job_descriptions / resume_texts.
+
+    Works in id order, one transaction per batch, so it can be stopped and
+    re-run at any time; migrated rows have both inline columns set to NULL.
+    """
+    db = get_db_connection()
+    cursor = db.cursor()
+    seen_jds = set()
+    migrated = 0
+    resume_bytes = compressed_bytes = jd_bytes = distinct_jd_bytes = 0
+    last_id = 0
+    start = time.perf_counter()
+    try:
+        while True:
+            cursor.execute("""
+                SELECT id, job_description, resume_text FROM resume_analysis
+                WHERE id > %s AND (job_description IS NOT NULL OR resume_text IS NOT NULL)
+                ORDER BY id LIMIT %s
+            """, (last_id, batch_size))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+
+            new_jds = {}
+            updates = []
+            texts = []
+            for resume_id, job_description, resume_text in rows:
+                jd_hash = None
+                if job_description is not None:
+                    jd_hash = job_description_hash(job_description)
+                    if jd_hash not in seen_jds:
+                        new_jds[jd_hash] = job_description
+                    jd_bytes += len(job_description.encode('utf-8'))
+                updates.append((jd_hash, resume_id))
+                if resume_text is not None:
+                    compressed = compress_text(resume_text)
+                    texts.append((resume_id, compressed, len(resume_text)))
+                    resume_bytes += len(resume_text.encode('utf-8'))
+                    compressed_bytes += len(compressed)
+
+            if new_jds:
+                cursor.executemany("""
+                    INSERT INTO job_descriptions (jd_hash, job_description) VALUES (%s, %s)
+                    ON DUPLICATE KEY UPDATE jd_hash = jd_hash
+                """, list(new_jds.items()))
+                seen_jds.update(new_jds)
+                distinct_jd_bytes += sum(len(text.encode('utf-8')) for text in new_jds.values())
+            if texts:
+                cursor.executemany(
+                    "REPLACE INTO resume_texts (resume_id, text_zlib, text_length) VALUES (%s, %s, %s)", texts
+                )
+            cursor.executemany("""
+                UPDATE resume_analysis
+                SET jd_hash = COALESCE(%s, jd_hash), job_description = NULL, resume_text = NULL
+                WHERE id = %s
+            """, updates)
+            db.commit()
+
+            migrated += len(rows)
+            last_id = rows[-1][0]
+            click.echo(f"  {migrated} rows (up to id {last_id}), "
+                       f"{migrated / (time.perf_counter() - start):.0f} rows/s", err=True)
+    finally:
+        cursor.close()
+        db.close()
+
+    # Resume text is compressed, job descriptions are deduplicated (stored uncompressed)
+    click.echo(f"Migrated {migrated} rows")
+    click.echo(f"  resume text: {resume_bytes / 1e6:.1f} MB inline -> {compressed_bytes / 1e6:.1f} MB compressed "
+               f"({compressed_bytes / resume_bytes if resume_bytes else 1:.0%})")
+    click.echo(f"  job descriptions: {jd_bytes / 1e6:.1f} MB inline -> {distinct_jd_bytes / 1e6:.1f} MB in "
+               f"{len(seen_jds)} distinct texts ({distinct_jd_bytes / jd_bytes if jd_bytes else 1:.0%})")
+
+
+@app.cli.command("rescore-history")
+@click.option("--workers", default=os.cpu_count() or 1, show_default=True, help="Scoring processes (1 scores inline)")
+@click.option("--batch-size", default=500, show_default=True)
+@click.option("--checkpoint", default=os.path.join('jobs', 'rescore.json'), show_default=True,
+              help="Progress file; an interrupted run resumes from it")
+@click.option("--restart", is_flag=True, help="Ignore the checkpoint and re-score from the first row")
+@click.option("--refresh-stats/--no-refresh-stats", default=True, show_default=True,
+              help="Rebuild the dashboard rollups when done")
+def rescore_history_command(workers, batch_size, checkpoint, restart, refresh_stats):
+    """Re-score every stored analysis after a change to the scoring weights or skill taxonomy.
+
+    Rows are streamed in id order through an unbuffered cursor on one
+    connection and scored in a process pool; each scored batch is written on a
+    second connection in one transaction, then recorded in the checkpoint.
+    """
+    import multiprocessing
+
+    progress = Checkpoint(checkpoint)
+    state = None if restart else progress.load()
+    if state and state.get('taxonomy') != skill_layout()[2]:
+        click.echo("Skill taxonomy changed since the checkpoint was written, starting over", err=True)
+        state = None
+    last_id = state['last_id'] if state else 0
+    done = state['rescored'] if state else 0
+    failed = state['failed'] if state else 0
+    if last_id:
+        click.echo(f"Resuming after id {last_id} ({done} rows already re-scored)", err=True)
+
+    read_db = get_db_connection()
+    write_db = get_db_connection()
+    read_cursor = read_db.cursor()
+    write_cursor = write_db.cursor()
+    pool = multiprocessing.get_context('spawn').Pool(workers) if workers > 1 else None
+    start = time.perf_counter()
+    run_rows = 0  # rows scored by this run (the checkpoint counts earlier runs too)
+
+    def write(results):
+        nonlocal done, failed, last_id, run_rows
+        updates = [fields + (resume_id,) for resume_id, fields, _ in results if fields is not None]
+        for resume_id, _, error in results:
+            if error:
+                click.echo(f"  id {resume_id}: {error}", err=True)
+        if updates:
+            write_cursor.executemany(RESCORE_UPDATE_SQL, updates)
+        write_db.commit()
+
+        done += len(updates)
+        failed += len(results) - len(updates)
+        run_rows += len(results)
+        last_id = results[-1][0]
+        progress.save(last_id=last_id, rescored=done, failed=failed, taxonomy=skill_layout()[2])
+        elapsed = time.perf_counter() - start
+        click.echo(f"  {run_rows}/{total} rows (up to id {last_id}), {run_rows / elapsed:.0f} rows/s", err=True)
+
+    try:
+        read_cursor.execute("SELECT COUNT(*) FROM resume_analysis WHERE id > %s", (last_id,))
+        total = read_cursor.fetchone()[0]
+
+        # Unbuffered cursor: rows are read from the socket batch by batch
+        read_cursor.execute(f"""
+            SELECT resume_analysis.id, {RESUME_TEXT_SQL}, {JOB_DESCRIPTION_SQL}
+            FROM resume_analysis {TEXT_JOINS}
+            WHERE resume_analysis.id > %s
+            ORDER BY resume_analysis.id
+        """, (last_id,))
+
+        # The pool scores batch n + 1 while batch n is written
+        pending = None
+        while True:
+            rows = read_cursor.fetchmany(batch_size)
+            if pool is None:
+                scored = list(map(rescore_row, rows))
+            else:
+                scored = pool.map_async(rescore_row, rows, chunksize=max(1, len(rows) // (workers * 4)))
+            if pending is not None:
+                write(pending if pool is None else pending.get())
+            if not rows:
+                break
+            pending = scored
+    finally:
+        if pool is not None:
+            pool.terminate()
+        if run_rows:
+            # Workers reload the scores they cache, even if the run stopped part-way
+            log_full_change(write_db, write_cursor)
+        read_cursor.close()
+        write_cursor.close()
+        read_db.close()
+        write_db.close()
+
+    progress.clear()
+    elapsed = time.perf_counter() - start
+    click.echo(f"Re-scored {done} analyses ({failed} failed) in {elapsed:.1f}s, "
+               f"{run_rows / elapsed if elapsed else 0:.0f} rows/s with {workers} worker(s)")
+
+    if refresh_stats:
+        db = get_db_connection()
+        cursor = db.cursor()
+        try:
+            refresh_daily_stats(cursor)
+            db.commit()
+        finally:
+            cursor.close()
+            db.close()
+        dashboard_cache.invalidate()
+        click.echo("Rebuilt dashboard rollups for all days")
+
+
+@app.cli.command("refresh-stats")
+@click.option("--days", default=2, show_default=True, help="Recompute this many most recent days")
+@click.option("--all", "rebuild_all", is_flag=True, help="Rebuild the rollups for the whole history")
+def refresh_stats_command(days, rebuild_all):
+    """Rebuild the dashboard rollup tables from resume_analysis.
+
+    Use --all once to backfill; with STATS_ROLLUP_MODE=compactor run it
+    periodically (e.g. every minute from cron) instead of updating inline.
+    """
+    since = None if rebuild_all else datetime.date.today() - datetime.timedelta(days=days - 1)
+
+    db = get_db_connection()
+    cursor = db.cursor()
+    try:
+        refresh_daily_stats(cursor, since)
+        db.commit()
+    finally:
+        cursor.close()
+        db.close()
+
+    click.echo("Rebuilt dashboard rollups" + (f" since {since}" if since else " for all days"))
 
 
 if __name__ == '__main__':
+    warmup()
+    start_background_workers()
     app.run(host='0.0.0.0', port=5002)
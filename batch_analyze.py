@@ -0,0 +1,135 @@
+"""Score a directory or .zip of resumes against job descriptions, without the web app or MySQL.
+
+    python batch_analyze.py RESUMES --jd backend.txt [--jd data_engineer.pdf ...]
+                            [--output results.jsonl] [--workers N] [--timeout 60]
+                            [--max-file-mb 16] [--max-memory-mb 1024]
+
+RESUMES is a directory (searched recursively) or a .zip archive of PDF, DOCX
+and TXT files. Each resume is extracted once and scored against every job
+description with the same functions as /analyze. One JSON line per resume is
+appended to the output as soon as it is ready:
+
+    {"file": "...", "chars": 5120, "results": [{"job_description": "backend.txt", "ats_score": 72, ...}]}
+    {"file": "...", "error": "Could not extract text"}
+
+Re-running the same command skips resumes already in the output, so an
+interrupted run picks up where it stopped. Memory stays flat however large
+the archive: only a small window of resumes is in flight at any time, and
+nothing but the output line is kept once a resume is written.
+"""
+import argparse
+import collections
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+# Every resume is read once; caching extracted text would only grow the workers
+os.environ.setdefault("EXTRACTION_CACHE_SIZE", "0")
+
+from utils.extract_text import configure_extraction_pool, extract_text_from_file
+from utils.offline import analyze_input, init_worker, list_inputs, open_results
+
+PROGRESS_SECONDS = 5
+# Results are written in input order, so allow a slow file this long past --timeout before giving up on it
+RESULT_GRACE_SECONDS = 30
+
+
+def load_job_descriptions(paths):
+    """[(name, text)] for the --jd files, named by file name (or path, if names repeat)"""
+    configure_extraction_pool(size=0)
+    names = [os.path.basename(path) for path in paths]
+    jobs = []
+    for path, name in zip(paths, names):
+        text = extract_text_from_file(path)
+        if not text or not text.strip():
+            raise SystemExit(f"Job description {path} is empty")
+        jobs.append((name if names.count(name) == 1 else path, text))
+    return jobs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('source', help="Directory or .zip of resumes")
+    parser.add_argument('--jd', action='append', required=True, help="Job description file (repeatable)")
+    parser.add_argument('--output', default='results.jsonl')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--timeout', type=float, default=60, help="Seconds per resume (0 for no limit)")
+    parser.add_argument('--max-file-mb', type=float, default=16)
+    parser.add_argument('--max-memory-mb', type=int, default=1024, help="Address-space limit per worker")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.source) and not os.path.isfile(args.source):
+        raise SystemExit(f"{args.source} does not exist")
+
+    jobs = load_job_descriptions(args.jd)
+    inputs = list_inputs(args.source)
+    output, done = open_results(args.output)
+    pending = [(key, size) for key, size in inputs if key not in done]
+    print(f"{len(inputs)} resumes, {len(inputs) - len(pending)} already in {args.output}, "
+          f"{len(jobs)} job description(s), {args.workers} worker(s)", file=sys.stderr)
+
+    max_file_bytes = args.max_file_mb * 1024 * 1024
+    result_timeout = args.timeout + RESULT_GRACE_SECONDS if args.timeout > 0 else None
+    written = failed = 0
+    start = last_report = time.perf_counter()
+
+    def write(record):
+        nonlocal written, failed, last_report
+        output.write(json.dumps(record) + "\n")
+        output.flush()
+        written += 1
+        failed += 'error' in record
+
+        now = time.perf_counter()
+        if now - last_report >= PROGRESS_SECONDS or written == len(pending):
+            last_report = now
+            rate = written / (now - start)
+            eta = (len(pending) - written) / rate if rate else 0
+            print(f"  {written}/{len(pending)} resumes, {failed} errors, {rate:.1f}/s, "
+                  f"ETA {eta / 60:.1f} min", file=sys.stderr)
+
+    with tempfile.TemporaryDirectory(prefix='batch-analyze-') as scratch:
+        ctx = multiprocessing.get_context('spawn')
+        # Workers are replaced now and then so a leak in a parser cannot build up over 100k files
+        pool = ctx.Pool(args.workers, initializer=init_worker,
+                        initargs=(args.source, jobs, scratch, args.timeout, args.max_memory_mb),
+                        maxtasksperchild=500)
+        in_flight = collections.deque()
+        try:
+            for key, size in pending:
+                if size > max_file_bytes:
+                    in_flight.append((key, {'file': key, 'error': 'File too large'}))
+                else:
+                    in_flight.append((key, pool.apply_async(analyze_input, (key,))))
+
+                # A few tasks per worker keep every core busy without queueing the whole archive
+                while len(in_flight) > args.workers * 4 or (in_flight and isinstance(in_flight[0][1], dict)):
+                    write(_result(*in_flight.popleft(), result_timeout))
+            while in_flight:
+                write(_result(*in_flight.popleft(), result_timeout))
+        except KeyboardInterrupt:
+            raise SystemExit(f"Interrupted after {written} resumes; run the same command again to continue")
+        finally:
+            pool.terminate()
+            output.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"Analyzed {written} resumes ({failed} errors) in {elapsed:.1f}s"
+          f"{f', {written / elapsed:.1f}/s' if elapsed else ''} -> {args.output}", file=sys.stderr)
+
+
+def _result(key, task, timeout):
+    if isinstance(task, dict):
+        return task
+    try:
+        return task.get(timeout)
+    except multiprocessing.TimeoutError:
+        # The worker died or hung past its own time limit
+        return {'file': key, 'error': 'Analysis did not finish'}
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""Benchmark batch ranking against one /analyze-style call per resume.
+
+    python benchmarks/bench_batch.py [--sizes 1,10,100,1000]
+
+Prints the per-resume cost of rank_resumes() for growing batch sizes next to
+the cost of scoring the same resumes one at a time with calculate_ats_score().
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.ats_score import TECHNICAL_SKILLS, analyze_skills_match, calculate_ats_score
+from utils.batch import rank_resumes
+from utils.warmup import warmup
+
+WORDS = (
+    "developed managed designed implemented improved reduced led built team project "
+    "production service platform customer pipeline performance latency data feature "
+    "release testing deployment architecture migration monitoring analytics backend"
+).split()
+
+ALL_SKILLS = [skill for skills in TECHNICAL_SKILLS.values() for skill in skills]
+
+
+def synthetic_resume(rng, words=400):
+    skills = rng.sample(ALL_SKILLS, 8)
+    body = " ".join(rng.choice(WORDS) for _ in range(words))
+    return (
+        f"Jane Candidate jane{rng.randint(1, 9999)}@example.com +1 555{rng.randint(1000000, 9999999)}\n"
+        f"Summary\n{body[:300]}\n"
+        f"Skills\n{', '.join(skills)}\n"
+        f"Experience\n{body}\n"
+        f"Education\nB.Sc. Computer Science"
+    )
+
+
+def synthetic_job(rng):
+    skills = rng.sample(ALL_SKILLS, 10)
+    body = " ".join(rng.choice(WORDS) for _ in range(150))
+    return f"Software Engineer\nRequirements: {', '.join(skills)}\n{body}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='1,10,100,1000')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    job = synthetic_job(rng)
+    sizes = [int(n) for n in args.sizes.split(',')]
+    corpus = [(f"resume_{i}.txt", synthetic_resume(rng)) for i in range(max(sizes))]
+
+    # Heavy libraries are imported on first use; keep that out of the timings
+    warmup()
+
+    rows = []
+    for n in sizes:
+        batch = corpus[:n]
+
+        start = time.perf_counter()
+        rank_resumes(job, batch)
+        batch_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _, text in batch:
+            calculate_ats_score(text, job)
+            analyze_skills_match(text, job)
+        single_time = time.perf_counter() - start
+
+        rows.append({
+            'batch_size': n,
+            'batch_ms_per_resume': round(batch_time / n * 1000, 3),
+            'single_ms_per_resume': round(single_time / n * 1000, 3),
+            'speedup': round(single_time / batch_time, 2) if batch_time else None,
+        })
+
+    for row in rows:
+        print(json.dumps(row))
+
+
+if __name__ == '__main__':
+    main()
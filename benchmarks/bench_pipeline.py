@@ -0,0 +1,368 @@
+"""Time every stage of the /analyze pipeline on a synthetic corpus.
+
+    python benchmarks/bench_pipeline.py [--tiers small,medium,large] [--formats pdf,docx,txt]
+                                        [--repeat 5] [--output results.json]
+                                        [--baseline baseline.json --tolerance 0.25]
+
+Generates resumes as PDF, DOCX and TXT in several size tiers, then times
+each stage on its own (extraction, clean_text, the ATS sub-scores, skills,
+suggestions, DOCX export) and the full /analyze route through the Flask test
+client backed by an SQLite stand-in for MySQL. Prints one JSON line per
+measurement; with --baseline, p50 times are compared against a previous
+--output file and the exit code is 1 when any stage got slower than the
+tolerance allows.
+
+Caches that would hide the work being measured (extraction, optimized
+resume) are disabled; the job description feature cache stays on, as in
+production where one posting is scored against many resumes.
+"""
+import argparse
+import datetime
+import io
+import json
+import os
+import platform
+import random
+import re
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+# Must be set before the app modules read their configuration
+os.environ.setdefault("EXTRACTION_CACHE_SIZE", "0")
+os.environ.setdefault("OPTIMIZED_RESUME_CACHE_SIZE", "0")
+os.environ.setdefault("STATS_ROLLUP_MODE", "compactor")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from docx import Document
+
+from bench_batch import synthetic_job, synthetic_resume
+from utils.ats_score import (
+    analyze_document, analyze_skills_match, calculate_ats_score, calculate_format_score,
+    calculate_keyword_match, calculate_skills_match, calculate_text_similarity
+)
+from utils.extract_text import clean_text, configure_extraction_pool, extract_text_from_file
+from utils.optimizer import create_optimized_resume, generate_suggestions
+
+TIERS = {'small': 300, 'medium': 1500, 'large': 6000}
+FORMATS = ('pdf', 'docx', 'txt')
+
+
+# ✅ Synthetic corpus
+def wrap(text, width=90):
+    lines = []
+    for paragraph in text.split("\n"):
+        line = ""
+        for word in paragraph.split():
+            if line and len(line) + len(word) + 1 > width:
+                lines.append(line)
+                line = word
+            else:
+                line = f"{line} {word}" if line else word
+        lines.append(line)
+    return lines
+
+
+def write_txt(path, text):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+
+def write_docx(path, text):
+    doc = Document()
+    for paragraph in text.split("\n"):
+        doc.add_paragraph(paragraph)
+    doc.save(path)
+
+
+def write_pdf(path, text, lines_per_page=60):
+    """Minimal single-font PDF (no extra dependency needed)"""
+    lines = wrap(text)
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+
+    objects = [None, None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for page in pages:
+        escaped = [line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") for line in page]
+        stream = "BT /F1 10 Tf 12 TL 50 790 Td " + " ".join(f"({line}) '" for line in escaped) + " ET"
+        stream = stream.encode('latin-1', 'replace')
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        page_ids.append(len(objects))
+
+    objects[0] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    kids = b" ".join(b"%d 0 R" % i for i in page_ids)
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_ids))
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b"%010d 00000 n \n" % offset)
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+
+    with open(path, 'wb') as f:
+        f.write(out.getvalue())
+
+
+WRITERS = {'pdf': write_pdf, 'docx': write_docx, 'txt': write_txt}
+
+
+def build_corpus(directory, tiers, formats, rng):
+    """{tier: {'text': str, 'files': {format: path}}}"""
+    corpus = {}
+    for tier in tiers:
+        text = synthetic_resume(rng, words=TIERS[tier])
+        files = {}
+        for fmt in formats:
+            path = os.path.join(directory, f"resume_{tier}.{fmt}")
+            WRITERS[fmt](path, text)
+            files[fmt] = path
+        corpus[tier] = {'text': text, 'files': files}
+    return corpus
+
+
+# ✅ SQLite stand-in for MySQL
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS resume_analysis (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, filename TEXT, jd_hash TEXT, job_description TEXT, resume_text TEXT,
+    ats_score INT, matched_skills TEXT, missing_skills TEXT, skill_match_percentage REAL,
+    suggestions TEXT, simhash INT, duplicate_of INT, matched_skill_mask BLOB, missing_skill_mask BLOB,
+    skill_taxonomy TEXT, write_key TEXT UNIQUE, created_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS job_descriptions (jd_hash TEXT PRIMARY KEY, job_description TEXT);
+CREATE TABLE IF NOT EXISTS resume_texts (resume_id INTEGER PRIMARY KEY, text_zlib BLOB, text_length INT);
+CREATE TABLE IF NOT EXISTS download_logs (id INTEGER PRIMARY KEY AUTOINCREMENT, resume_id INT, write_key TEXT UNIQUE, download_time TEXT);
+CREATE TABLE IF NOT EXISTS analysis_changes (id INTEGER PRIMARY KEY AUTOINCREMENT, resume_id INT, changed_at TEXT);
+"""
+
+
+class SQLiteCursor:
+    def __init__(self, cursor, dictionary=False):
+        self._cursor = cursor
+        self._dictionary = dictionary
+
+    @staticmethod
+    def _sql(query):
+        query = re.sub(r"ON DUPLICATE KEY UPDATE (\w+) = \1", "ON CONFLICT DO NOTHING", query).replace("INSERT IGNORE", "INSERT OR IGNORE")
+        return re.sub(r"NOW\(\)", "CURRENT_TIMESTAMP", query.replace("%s", "?"))
+
+    def execute(self, query, params=()):
+        self._cursor.execute(self._sql(query), params)
+
+    def executemany(self, query, seq):
+        self._cursor.executemany(self._sql(query), seq)
+
+    def _row(self, row):
+        if row is None or not self._dictionary:
+            return row
+        return {column[0]: value for column, value in zip(self._cursor.description, row)}
+
+    def fetchone(self):
+        return self._row(self._cursor.fetchone())
+
+    def fetchall(self):
+        return [self._row(row) for row in self._cursor.fetchall()]
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class SQLiteConnection:
+    """Just enough of the mysql-connector API for the /analyze route"""
+
+    def __init__(self, path):
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(SQLITE_SCHEMA)
+
+    def cursor(self, dictionary=False, **kwargs):
+        return SQLiteCursor(self._db.cursor(), dictionary)
+
+    def commit(self):
+        self._db.commit()
+
+    def rollback(self):
+        self._db.rollback()
+
+    def close(self):
+        self._db.close()
+
+
+def load_app(workdir, use_mysql):
+    # app.py creates its upload and job folders relative to the working directory
+    os.environ.setdefault("JOB_QUEUE_PATH", os.path.join(workdir, 'jobs', 'queue.sqlite3'))
+    os.environ.setdefault("JOB_SPOOL_FOLDER", os.path.join(workdir, 'jobs', 'uploads'))
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        import app as app_module
+    finally:
+        os.chdir(cwd)
+
+    app_module.app.config['UPLOAD_FOLDER'] = os.path.join(workdir, 'temp_uploads')
+    # The same files are posted repeatedly; time the full pipeline, not duplicate reuse
+    app_module.app.config['DUPLICATE_REUSE'] = False
+    if not use_mysql:
+        db_path = os.path.join(workdir, 'bench.sqlite3')
+        app_module.get_db_connection = lambda: SQLiteConnection(db_path)
+    return app_module
+
+
+# ✅ Timing
+def measure(fn, repeat):
+    fn()  # warm-up (imports, lazy models)
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        'mean_ms': round(statistics.fmean(samples), 3),
+        'p50_ms': round(statistics.median(samples), 3),
+        'p95_ms': round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+        'min_ms': round(samples[0], 3),
+        'n': repeat,
+    }
+
+
+def text_stages(resume_text, job):
+    skills = analyze_skills_match(resume_text, job)
+    suggestions = generate_suggestions(resume_text, job, skills)
+    return {
+        'clean_text': lambda: clean_text(resume_text),
+        'analyze_document': lambda: analyze_document(resume_text),
+        'calculate_ats_score': lambda: calculate_ats_score(resume_text, job),
+        'calculate_keyword_match': lambda: calculate_keyword_match(resume_text, job),
+        'calculate_skills_match': lambda: calculate_skills_match(resume_text, job),
+        'calculate_text_similarity': lambda: calculate_text_similarity(resume_text, job),
+        'calculate_format_score': lambda: calculate_format_score(resume_text),
+        'analyze_skills_match': lambda: analyze_skills_match(resume_text, job),
+        'generate_suggestions': lambda: generate_suggestions(resume_text, job, skills),
+        'create_optimized_resume': lambda: create_optimized_resume(resume_text, suggestions),
+    }
+
+
+def route_stage(client, path, job):
+    with open(path, 'rb') as f:
+        data = f.read()
+    filename = os.path.basename(path)
+
+    def post():
+        response = client.post('/analyze', data={
+            'job_description': job,
+            'resume_file': (io.BytesIO(data), filename),
+        })
+        if response.status_code != 200:
+            raise RuntimeError(f"/analyze returned {response.status_code} for {filename}: "
+                               f"{response.get_data(as_text=True)[:200]}")
+
+    return post
+
+
+def run(args):
+    rng = random.Random(args.seed)
+    job = synthetic_job(rng)
+    tiers = args.tiers.split(',')
+    formats = args.formats.split(',')
+    configure_extraction_pool(size=args.pool)
+
+    results = []
+
+    def record(stage, fmt, tier, timing):
+        row = {'stage': stage, 'format': fmt, 'tier': tier, **timing}
+        results.append(row)
+        print(json.dumps(row), flush=True)
+
+    with tempfile.TemporaryDirectory(prefix='bench_pipeline_') as workdir:
+        corpus = build_corpus(workdir, tiers, formats, rng)
+
+        for tier in tiers:
+            for fmt, path in corpus[tier]['files'].items():
+                record('extract_text_from_file', fmt, tier, measure(lambda: extract_text_from_file(path), args.repeat))
+
+            resume_text = clean_text(corpus[tier]['text'])  # what extraction returns
+            for stage, fn in text_stages(resume_text, job).items():
+                record(stage, '-', tier, measure(fn, args.repeat))
+
+        if not args.skip_route:
+            app_module = load_app(workdir, args.mysql)
+            client = app_module.app.test_client()
+            for tier in tiers:
+                for fmt, path in corpus[tier]['files'].items():
+                    record('route:/analyze', fmt, tier, measure(route_stage(client, path, job), args.repeat))
+
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Stages whose p50 grew by more than tolerance (0.25 = 25%)"""
+    previous = {(r['stage'], r['format'], r['tier']): r['p50_ms'] for r in baseline['results']}
+    regressions = []
+    for row in results:
+        before = previous.get((row['stage'], row['format'], row['tier']))
+        if not before:
+            continue
+        ratio = row['p50_ms'] / before
+        if ratio > 1 + tolerance:
+            regressions.append({
+                'stage': row['stage'], 'format': row['format'], 'tier': row['tier'],
+                'baseline_p50_ms': before, 'p50_ms': row['p50_ms'], 'ratio': round(ratio, 3),
+            })
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tiers', default='small,medium,large')
+    parser.add_argument('--formats', default=','.join(FORMATS))
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--pool', type=int, default=0,
+                        help='extraction pool size (0 = extract in-process, as timed per stage)')
+    parser.add_argument('--mysql', action='store_true', help='time the route against the configured MySQL')
+    parser.add_argument('--skip-route', action='store_true')
+    parser.add_argument('--output', help='write all results (usable as a later --baseline)')
+    parser.add_argument('--baseline', help='results file from an earlier --output run')
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    args = parser.parse_args()
+
+    results = run(args)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({
+                'meta': {
+                    'created_at': datetime.datetime.now().isoformat(timespec='seconds'),
+                    'python': platform.python_version(),
+                    'platform': platform.platform(),
+                    'repeat': args.repeat,
+                    'seed': args.seed,
+                },
+                'results': results,
+            }, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(json.dumps({'regression': regression}))
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
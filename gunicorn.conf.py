@@ -0,0 +1,53 @@
+"""gunicorn settings: gunicorn -c gunicorn.conf.py app:app"""
+import gc
+import os
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:5002")
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 120))
+
+# Import the app once in the master; workers are forked from the warmed-up process
+preload_app = True
+
+
+def on_starting(server):
+    from utils.metrics import METRICS_DIR
+
+    # Snapshots left by a previous run could carry a reused pid
+    if METRICS_DIR:
+        os.makedirs(METRICS_DIR, exist_ok=True)
+        for filename in os.listdir(METRICS_DIR):
+            if filename.startswith('metrics-'):
+                os.remove(os.path.join(METRICS_DIR, filename))
+
+
+def when_ready(server):
+    from utils.warmup import rss_mb, warmup
+
+    timings = warmup()
+    # Keep the garbage collector from touching (and so copying) preloaded objects
+    gc.freeze()
+    server.log.info("Warmup %s, master RSS %s MB", timings, rss_mb())
+
+
+def post_fork(server, worker):
+    from utils.warmup import mark_worker_start
+
+    mark_worker_start()
+
+
+def post_worker_init(worker):
+    from utils.warmup import rss_mb
+
+    # Queued jobs run without waiting for the worker's first request
+    from app import start_background_workers
+
+    start_background_workers()
+    worker.log.info("Worker %s ready, RSS %s MB", worker.pid, rss_mb())
+
+
+def child_exit(server, worker):
+    from utils.metrics import remove_snapshot
+
+    remove_snapshot(worker.pid)
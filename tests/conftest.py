@@ -0,0 +1,36 @@
+import os
+import sys
+
+import pytest
+
+# Tests import the app modules the way app.py does (utils.*), from the repository root
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture(scope='session')
+def app_module(tmp_path_factory):
+    """app.py backed by the benchmark's SQLite stand-in for MySQL"""
+    workdir = tmp_path_factory.mktemp('app')
+    os.environ.update(
+        WRITE_BEHIND_DIR=str(workdir / 'spill'),
+        SEARCH_INDEX_DIR=str(workdir / 'index'),
+        SEARCH_INDEX_AUTO_SYNC='0',
+        DUPLICATE_SYNC_SECONDS='0',
+        SKILL_STATS_SYNC_SECONDS='0',
+    )
+    # The benchmark scripts import each other as top-level modules
+    sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+    from bench_pipeline import load_app
+
+    return load_app(str(workdir), use_mysql=False)
+
+
+@pytest.fixture
+def db_path(app_module, tmp_path, monkeypatch):
+    """A fresh SQLite database for this test"""
+    from bench_pipeline import SQLiteConnection
+
+    path = str(tmp_path / 'db.sqlite3')
+    monkeypatch.setattr(app_module, 'get_db_connection', lambda: SQLiteConnection(path))
+    return path
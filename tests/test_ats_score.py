@@ -0,0 +1,75 @@
+import pytest
+
+from utils.ats_score import (
+    analyze_document, analyze_job_description, analyze_skills_match, calculate_ats_score,
+    calculate_format_score, calculate_keyword_match, calculate_skills_match
+)
+from utils.optimizer import generate_suggestions
+
+RESUME = """Jane Candidate jane@example.com +1 5551234567
+Summary
+Backend developer building APIs with Python, Django and PostgreSQL on AWS.
+Experience
+Developed services, managed deployments with Docker, improved latency by 30%.
+Education
+B.Sc. Computer Science
+Skills
+python, django, postgres, docker, aws, git"""
+
+JOB = """Senior Python developer. We need Django, AWS, Docker, Kubernetes and SQL.
+Build APIs and design databases."""
+
+
+@pytest.fixture(autouse=True)
+def pairwise_similarity(monkeypatch):
+    # Scores must not depend on a model file that happens to exist locally
+    monkeypatch.setattr('utils.vectorizer.TFIDF_MODE', 'pairwise')
+
+
+def test_features_from_one_pass():
+    doc = analyze_document(RESUME)
+    assert doc.has_email and doc.has_phone
+    assert doc.sections >= {'summary', 'experience', 'education', 'skills'}
+    assert doc.skills >= {'python', 'django', 'postgresql', 'docker', 'aws', 'git'}
+    assert 'developer' in doc.keywords
+    assert doc.word_count == len(RESUME.split())
+
+
+def test_documents_pass_through():
+    doc = analyze_document(RESUME)
+    assert analyze_document(doc) is doc
+    job = analyze_job_description(JOB)
+    assert analyze_job_description(job) is job
+
+
+def test_job_description_features_are_cached_by_normalized_text():
+    assert analyze_job_description(JOB) is analyze_job_description("  " + JOB.replace(" ", "\n"))
+
+
+def test_scores_match_for_text_and_documents():
+    resume, job = analyze_document(RESUME), analyze_job_description(JOB)
+    assert calculate_ats_score(resume, job) == calculate_ats_score(RESUME, JOB)
+    assert calculate_keyword_match(resume, job) == calculate_keyword_match(RESUME, JOB)
+    assert calculate_skills_match(resume, job) == calculate_skills_match(RESUME, JOB)
+    assert calculate_format_score(resume) == calculate_format_score(RESUME)
+    assert 0 <= calculate_ats_score(RESUME, JOB) <= 100
+
+
+def test_skills_analysis():
+    analysis = analyze_skills_match(RESUME, JOB)
+    assert set(analysis['matched_skills']) == {'python', 'django', 'aws', 'docker'}
+    assert set(analysis['missing_skills']) == {'kubernetes', 'sql'}
+    assert analysis['match_percentage'] == pytest.approx(4 / 6 * 100, abs=0.1)
+
+
+def test_suggestions_use_the_shared_features():
+    analysis = analyze_skills_match(RESUME, JOB)
+    suggestions = generate_suggestions(analyze_document(RESUME), JOB, analysis)
+    assert suggestions == generate_suggestions(RESUME, JOB, analysis)
+    missing = next(s for s in suggestions if s['type'] == 'skills')
+    assert 'kubernetes' in missing['description']
+
+
+def test_empty_inputs():
+    assert calculate_ats_score("", "") >= 0
+    assert calculate_skills_match("python", "no skills here") == 50
@@ -0,0 +1,52 @@
+import pytest
+
+from utils import batch, vectorizer
+from utils.ats_score import calculate_ats_score
+from utils.batch import rank_resumes
+
+JOB = "Senior Python developer: Flask, PostgreSQL, Docker and AWS. Experience with REST APIs and testing."
+RESUMES = [
+    ('python.txt', "Python developer building Flask REST APIs on PostgreSQL, deployed with Docker on AWS."),
+    ('java.txt', "Java engineer working with Spring, Oracle and Jenkins pipelines."),
+    ('nurse.txt', "Registered nurse with ten years of patient care in hospital wards."),
+]
+
+
+@pytest.fixture
+def fits(monkeypatch):
+    """Counts the TF-IDF models fitted on a batch"""
+    calls = []
+    original = batch.corpus_vectorizer
+
+    def counting(*args, **kwargs):
+        calls.append(kwargs)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(batch, 'corpus_vectorizer', counting)
+    return calls
+
+
+def test_batch_without_a_model_fits_once(monkeypatch, fits):
+    monkeypatch.setattr(vectorizer, 'TFIDF_MODE', 'pairwise')
+    results = rank_resumes(JOB, RESUMES * 10)
+
+    assert len(fits) == 1
+    assert [r['filename'] for r in results[:10]] == ['python.txt'] * 10
+    assert all(0 <= r['text_similarity'] <= 100 for r in results)
+    assert results[0]['text_similarity'] > results[-1]['text_similarity']
+
+
+def test_batch_scores_match_analyze_under_hashing(monkeypatch, fits):
+    monkeypatch.setattr(vectorizer, 'TFIDF_MODE', 'hashing')
+    monkeypatch.setattr(vectorizer, '_state', {'vectorizer': None, 'mtime': None, 'checked': 0.0})
+    results = {r['filename']: r['ats_score'] for r in rank_resumes(JOB, RESUMES)}
+
+    assert fits == []
+    assert results == {name: calculate_ats_score(text, JOB) for name, text in RESUMES}
+
+
+def test_batch_without_terms_scores_zero_similarity(monkeypatch):
+    monkeypatch.setattr(vectorizer, 'TFIDF_MODE', 'pairwise')
+    results = rank_resumes("the and of", [('empty.txt', "a an the")])
+
+    assert results[0]['text_similarity'] == 0
@@ -0,0 +1,172 @@
+import threading
+import time
+
+import pytest
+
+from utils.db import ConnectionPool
+
+
+class FakeConnection:
+    """Records what the pool does to a raw MySQL connection"""
+
+    def __init__(self, number):
+        self.number = number
+        self.unread_result = False
+        self.broken = False
+        self.closed = False
+        self.rollbacks = 0
+        self.consumed = 0
+
+    def ping(self, reconnect=False):
+        if self.broken:
+            raise OSError("MySQL server has gone away")
+
+    def rollback(self):
+        if self.broken:
+            raise OSError("MySQL server has gone away")
+        self.rollbacks += 1
+
+    def consume_results(self):
+        self.consumed += 1
+        self.unread_result = False
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def opened():
+    return []
+
+
+@pytest.fixture
+def make_pool(opened):
+    def connect():
+        connection = FakeConnection(len(opened) + 1)
+        opened.append(connection)
+        return connection
+
+    def make(**options):
+        return ConnectionPool(connect, **dict({'size': 2, 'max_overflow': 1, 'timeout': 0.2}, **options))
+    return make
+
+
+# ---------------------------------------------
+# ✅ CHECKOUT AND RETURN
+# ---------------------------------------------
+
+def test_returned_connection_is_reused(make_pool, opened):
+    pool = make_pool()
+    with pool.connection() as conn:
+        assert conn.number == 1  # attributes come from the raw connection
+        assert pool.stats()['in_use'] == 1
+
+    with pool.connection() as conn:
+        assert conn.number == 1
+    assert len(opened) == 1
+    stats = pool.stats()
+    assert (stats['open'], stats['in_use'], stats['idle'], stats['checkouts'], stats['created']) == (1, 0, 1, 2, 1)
+
+
+def test_return_rolls_back_and_drops_unread_results(make_pool, opened):
+    pool = make_pool()
+    conn = pool.connection()
+    opened[0].unread_result = True
+    conn.close()
+    conn.close()  # a second close is ignored
+
+    assert opened[0].consumed == 1 and opened[0].rollbacks == 1
+    assert pool.stats()['idle'] == 1
+
+
+def test_overflow_connections_are_closed_on_return(make_pool, opened):
+    pool = make_pool()
+    conns = [pool.connection() for _ in range(3)]
+    assert pool.stats()['open'] == 3
+    for conn in conns:
+        conn.close()
+
+    assert pool.stats()['idle'] == 2 and pool.stats()['open'] == 2
+    assert [c.closed for c in opened] == [False, False, True]
+
+
+def test_exhausted_pool_times_out_then_hands_out_a_returned_connection(make_pool):
+    pool = make_pool()
+    conns = [pool.connection() for _ in range(3)]
+    with pytest.raises(Exception, match="exhausted"):
+        pool.connection()
+    assert pool.stats()['timeouts'] == 1
+
+    # A waiting request gets the next connection returned
+    threading.Timer(0.05, conns[0].close).start()
+    with pool.connection() as conn:
+        assert conn.number == 1
+    for conn in conns[1:]:
+        conn.close()
+
+
+# ---------------------------------------------
+# ✅ BROKEN CONNECTIONS
+# ---------------------------------------------
+
+def test_connection_broken_in_use_is_discarded(make_pool, opened):
+    pool = make_pool()
+    conn = pool.connection()
+    opened[0].broken = True
+    conn.close()
+
+    assert opened[0].closed
+    assert pool.stats()['open'] == 0 and pool.stats()['idle'] == 0
+    with pool.connection() as conn:
+        assert conn.number == 2
+
+
+def test_failed_ping_replaces_an_idle_connection(make_pool, opened):
+    pool = make_pool(ping_after=0)
+    pool.connection().close()
+    opened[0].broken = True
+
+    with pool.connection() as conn:
+        assert conn.number == 2
+    assert opened[0].closed
+    assert pool.stats()['failed_pings'] == 1 and pool.stats()['open'] == 1
+
+
+def test_old_connection_is_recycled(make_pool, opened):
+    pool = make_pool(recycle=0.01)
+    pool.connection().close()
+    time.sleep(0.02)
+
+    with pool.connection() as conn:
+        assert conn.number == 2
+    assert opened[0].closed and pool.stats()['recycled'] == 1
+
+
+def test_failed_connect_frees_its_slot():
+    attempts = []
+
+    def connect():
+        attempts.append(None)
+        raise OSError("Can't connect to MySQL server")
+
+    pool = ConnectionPool(connect, size=1, max_overflow=0, timeout=0.1)
+    for _ in range(3):
+        with pytest.raises(OSError):
+            pool.connection()
+    assert len(attempts) == 3 and pool.stats()['open'] == 0
+
+
+def test_forked_process_starts_with_an_empty_pool(make_pool, opened, monkeypatch):
+    pool = make_pool()
+    inherited = pool.connection()
+    pool.connection().close()
+
+    # As seen from a forked child: the pool and the open connection belong to the parent
+    monkeypatch.setattr(pool, '_pid', -1)
+    inherited.pid = -1
+    with pool.connection() as conn:
+        assert conn.number == 3
+    inherited.close()  # the parent's socket is left alone
+
+    assert pool.stats()['open'] == 1 and pool.stats()['idle'] == 1
+    assert not opened[0].rollbacks and not opened[0].closed
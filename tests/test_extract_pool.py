@@ -0,0 +1,109 @@
+import os
+import threading
+import time
+
+import pytest
+
+from utils import extract_pool
+from utils.extract_pool import ExtractionPool
+
+
+# Pool targets: module-level so spawned workers can import them
+def work(action, value=None):
+    if action == 'pid':
+        return os.getpid()
+    if action == 'sleep':
+        time.sleep(value)
+        return value
+    if action == 'allocate':
+        return len(bytearray(value * 1024 * 1024))
+    if action == 'exit':
+        os._exit(1)
+    raise ValueError(f"cannot read {value}")
+
+
+@pytest.fixture
+def make_pool():
+    pools = []
+
+    def make(**options):
+        pool = ExtractionPool(work, **dict({'size': 1, 'timeout': 10, 'max_memory_mb': 0}, **options))
+        pools.append(pool)
+        return pool
+
+    yield make
+    for pool in pools:
+        pool.close()
+
+
+def test_worker_is_reused_between_jobs(make_pool):
+    pool = make_pool()
+    pid = pool.run('pid')
+
+    assert pid != os.getpid()
+    assert pool.run('pid') == pid
+    assert pool.stats()['completed'] == 2 and pool.stats()['idle_workers'] == 1
+
+
+def test_target_error_is_raised_and_worker_kept(make_pool):
+    pool = make_pool()
+    pid = pool.run('pid')
+    with pytest.raises(Exception, match="cannot read broken.pdf"):
+        pool.run('fail', 'broken.pdf')
+
+    assert pool.run('pid') == pid
+    assert pool.stats()['failed'] == 1
+
+
+def test_timeout_kills_and_replaces_the_worker(make_pool):
+    pool = make_pool(timeout=0.5)
+    pid = pool.run('pid')
+    with pytest.raises(TimeoutError):
+        pool.run('sleep', 30)
+
+    assert pool.run('pid') != pid
+    assert pool.stats()['timeouts'] == 1
+
+
+def test_crashed_worker_is_replaced(make_pool):
+    pool = make_pool()
+    pid = pool.run('pid')
+    with pytest.raises(Exception, match="crashed"):
+        pool.run('exit')
+
+    assert pool.run('pid') != pid
+    assert pool.stats()['crashes'] == 1
+
+
+@pytest.mark.skipif(extract_pool.resource is None, reason="memory limits need the resource module")
+def test_memory_limit_retires_the_worker(make_pool):
+    pool = make_pool(max_memory_mb=512)
+    pid = pool.run('pid')
+    assert pool.run('allocate', 16) == 16 * 1024 * 1024
+    with pytest.raises(Exception, match="needs more memory"):
+        pool.run('allocate', 2048)
+
+    assert pool.run('pid') != pid
+    assert pool.stats()['recycled'] == 1
+
+
+def test_worker_is_recycled_after_max_jobs(make_pool):
+    pool = make_pool(max_jobs_per_worker=2)
+    first = pool.run('pid')
+    assert pool.run('pid') == first
+    assert pool.run('pid') != first
+    assert pool.stats()['recycled'] == 1
+
+
+def test_full_pool_rejects_after_queue_timeout(make_pool):
+    pool = make_pool(queue_timeout=0.2)
+    pool.run('pid')  # start the worker
+    busy = threading.Thread(target=pool.run, args=('sleep', 1))
+    busy.start()
+    time.sleep(0.1)
+    try:
+        with pytest.raises(Exception, match="busy"):
+            pool.run('pid')
+        assert pool.stats()['busy_rejections'] == 1
+    finally:
+        busy.join()
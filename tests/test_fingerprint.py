@@ -0,0 +1,189 @@
+from utils.fingerprint import (SIMHASH_BITS, DuplicateIndex, from_signed, hamming, simhash,
+                               to_signed)
+
+RESUME = (
+    "Jane Doe Senior Python developer with eight years of experience building Flask "
+    "services, data pipelines on AWS and PostgreSQL databases. Led a team of five "
+    "engineers and introduced continuous integration with Jenkins and Docker. "
+    "Phone 9876543210, graduated 2015."
+)
+
+
+def _flip(fingerprint, *bits):
+    for bit in bits:
+        fingerprint ^= 1 << bit
+    return fingerprint
+
+
+# ---------------------------------------------
+# ✅ SIMHASH
+# ---------------------------------------------
+
+def test_simhash_ignores_digits_and_case():
+    changed = RESUME.replace("9876543210", "9123456780").replace("2015", "2016")
+    assert simhash(changed) == simhash(RESUME)
+    assert simhash(RESUME.upper()) == simhash(RESUME)
+
+
+def test_small_edit_moves_few_bits():
+    edited = RESUME.replace("team of five", "team of six")
+    assert hamming(simhash(edited), simhash(RESUME)) < hamming(simhash("Completely unrelated text " * 5),
+                                                               simhash(RESUME))
+
+
+def test_short_text_has_no_fingerprint():
+    assert simhash("Python developer") is None
+    assert simhash("") is None
+
+
+def test_signed_round_trip():
+    for fingerprint in (0, 1, (1 << 63) - 1, 1 << 63, (1 << SIMHASH_BITS) - 1, simhash(RESUME)):
+        stored = to_signed(fingerprint)
+        assert -(1 << 63) <= stored < 1 << 63
+        assert from_signed(stored) == fingerprint
+    assert to_signed(None) is None and from_signed(None) is None
+
+
+# ---------------------------------------------
+# ✅ LSH INDEX
+# ---------------------------------------------
+
+def test_find_returns_rows_within_max_distance():
+    index = DuplicateIndex(max_distance=3)
+    fingerprint = simhash(RESUME)
+    index.add(1, fingerprint)
+    # 3 bits apart leaves one of the 4 bands intact; 4 bits, one per band, leaves none
+    index.add(2, _flip(fingerprint, 0, 20, 40))
+    index.add(3, _flip(fingerprint, 0, 16, 32, 48))
+
+    assert index.find(fingerprint) == [(1, 0, 1), (2, 3, 2)]
+    assert index.find(None) == []
+    assert index.stats()['hits'] == 1
+
+
+def test_duplicates_share_the_first_cluster():
+    index = DuplicateIndex()
+    fingerprint = simhash(RESUME)
+    index.add(1, fingerprint)
+    index.add(2, _flip(fingerprint, 5), cluster=1)
+
+    assert [cluster for _, _, cluster in index.find(fingerprint)] == [1, 1]
+
+
+def test_remove_drops_band_entries():
+    index = DuplicateIndex()
+    fingerprint = simhash(RESUME)
+    index.add(1, fingerprint)
+    index.remove(1)
+    index.remove(1)  # already gone
+
+    assert index.find(fingerprint) == []
+    assert all(not band for band in index.bands)
+
+
+def _rows(fingerprints):
+    """fetch() over {id: (fingerprint, duplicate_of)}"""
+    def fetch(after_id, limit, ids=None):
+        selected = sorted(ids) if ids is not None else [i for i in sorted(fingerprints) if i > after_id]
+        return [(i, to_signed(fingerprints[i][0]), fingerprints[i][1]) for i in selected[:limit]]
+    return fetch
+
+
+def test_sync_adds_new_rows_and_replaces_edited_ones():
+    fingerprint = simhash(RESUME)
+    other = simhash("A completely different resume about nursing, patient care and hospital work shifts")
+    stored = {1: (fingerprint, None), 2: (None, None)}
+
+    index = DuplicateIndex()
+    assert index.sync(_rows(stored), force=True, changes=lambda after_id: []) == 1
+    assert index.max_id == 2
+
+    # Resume 1 edited to another text, resume 3 uploaded since
+    stored[1] = (other, None)
+    stored[3] = (fingerprint, None)
+    changes = [(1, 1)]  # analysis_changes rows: (change id, resume id)
+    index.sync(_rows(stored), force=True,
+               changes=lambda after_id: [change for change in changes if change[0] > after_id])
+
+    assert index.changes_seen == 1
+    assert [resume_id for resume_id, _, _ in index.find(fingerprint)] == [3]
+    assert [resume_id for resume_id, _, _ in index.find(other)] == [1]
+
+
+def test_sync_is_rate_limited():
+    index = DuplicateIndex(sync_interval=60)
+    fetch = _rows({1: (simhash(RESUME), None)})
+    assert index.sync(fetch, force=True) == 1
+    assert index.sync(fetch) == 0
+
+
+# ---------------------------------------------
+# ✅ DUPLICATE REUSE (/analyze)
+# ---------------------------------------------
+
+def test_near_duplicate_upload_is_stored_with_reused_scores(app_module, db_path, tmp_path, monkeypatch):
+    import sqlite3
+
+    monkeypatch.setitem(app_module.app.config, 'DUPLICATE_REUSE', True)
+    monkeypatch.setitem(app_module.app.config, 'SEARCH_INDEX_AUTO_SYNC', False)
+    monkeypatch.setattr(app_module, 'duplicate_index', DuplicateIndex(sync_interval=0))
+    monkeypatch.setattr(app_module, 'recent_analyses', app_module.LRUCache(0))
+    job = "Senior Python developer with Flask, AWS and PostgreSQL"
+
+    first_path = tmp_path / 'first.txt'
+    first_path.write_text(RESUME)
+    second_path = tmp_path / 'second.txt'
+    second_text = RESUME.replace("9876543210", "9123456780")
+    second_path.write_text(second_text)
+
+    first = app_module.run_analysis(str(first_path), 'first.txt', job)
+    second = app_module.run_analysis(str(second_path), 'second.txt', job)
+
+    assert second['duplicate_of'] == first['id']
+    assert second['id'] != first['id']
+    assert second['ats_score'] == first['ats_score']
+    assert second['download_token'] == app_module.download_token(second['id'])
+    # The new upload keeps its own text and joins the first upload's cluster
+    assert app_module.load_stored_analysis(second['id'])[0] == second_text
+    with sqlite3.connect(db_path) as db:
+        assert db.execute("SELECT id, duplicate_of FROM resume_analysis ORDER BY id").fetchall() == [
+            (first['id'], None), (second['id'], first['id'])]
+
+
+def test_sync_reloads_everything_after_a_backfill():
+    fingerprint = simhash(RESUME)
+    stored = {1: (None, None), 2: (None, None)}
+    changes = []
+
+    def fetch_changes(after_id):
+        return [change for change in changes if change[0] > after_id]
+
+    index = DuplicateIndex()
+    index.sync(_rows(stored), force=True, changes=fetch_changes)
+    assert index.max_id == 2 and index.find(fingerprint) == []
+
+    # fingerprint-history filled in rows the index had already passed
+    stored[1] = (fingerprint, None)
+    stored[2] = (fingerprint, 1)
+    changes.append((1, None))
+    index.sync(_rows(stored), force=True, changes=fetch_changes)
+
+    assert [(resume_id, cluster) for resume_id, _, cluster in index.find(fingerprint)] == [(1, 1), (2, 1)]
+
+
+def test_fingerprint_history_logs_the_backfill(app_module, db_path):
+    import sqlite3
+
+    ids = app_module.write_analysis_rows([
+        {'filename': f'{n}.txt', 'resume_text': RESUME, 'job_description': "Python developer",
+         'ats_score': 50, 'matched_skills': '[]', 'missing_skills': '[]', 'skill_match_percentage': 0,
+         'suggestions': '[]', 'created_at': '2026-01-05 10:00:00'}
+        for n in range(2)
+    ])
+
+    result = app_module.app.test_cli_runner().invoke(args=['fingerprint-history'])
+    assert result.exit_code == 0, result.output
+    assert "Fingerprinted 2 resumes, 1 near-duplicates" in result.output
+    with sqlite3.connect(db_path) as db:
+        assert db.execute("SELECT resume_id FROM analysis_changes").fetchall() == [(None,)]
+        assert db.execute("SELECT duplicate_of FROM resume_analysis ORDER BY id").fetchall() == [(None,), (ids[0],)]
@@ -0,0 +1,156 @@
+import time
+
+import pytest
+
+from utils import jobs
+from utils.jobs import DONE, FAILED, QUEUED, RUNNING, JobQueue, JobWorkers
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return JobQueue(str(tmp_path / 'jobs.sqlite3'), lease_seconds=60, max_attempts=2)
+
+
+def _expire_lease(queue, job_id):
+    with queue._connect() as db:
+        db.execute("UPDATE jobs SET lease_expires = ? WHERE id = ?", (time.time() - 1, job_id))
+
+
+# ---------------------------------------------
+# ✅ QUEUE STATES
+# ---------------------------------------------
+
+def test_job_runs_from_queued_to_done(queue):
+    job_id = queue.submit({'filename': 'a.pdf'})
+    assert queue.get(job_id)['status'] == QUEUED
+
+    assert queue.claim() == (job_id, {'filename': 'a.pdf'})
+    assert queue.get(job_id)['status'] == RUNNING
+    assert queue.claim() is None  # leased to the first worker
+
+    queue.complete(job_id, {'ats_score': 70})
+    job = queue.get(job_id)
+    assert job['status'] == DONE
+    assert job['result'] == {'ats_score': 70}
+    assert queue.stats() == {QUEUED: 0, RUNNING: 0, DONE: 1, FAILED: 0}
+
+
+def test_failed_job_keeps_its_error(queue):
+    job_id = queue.submit({})
+    queue.claim()
+    queue.fail(job_id, "Unsupported file format")
+
+    job = queue.get(job_id)
+    assert job['status'] == FAILED
+    assert job['error'] == "Unsupported file format"
+    assert job['result'] is None
+
+
+def test_jobs_are_claimed_oldest_first(queue):
+    first = queue.submit({'n': 1})
+    second = queue.submit({'n': 2})
+
+    assert queue.claim()[0] == first
+    assert queue.claim()[0] == second
+
+
+def test_expired_lease_is_claimed_again(queue):
+    job_id = queue.submit({})
+    queue.claim()
+    _expire_lease(queue, job_id)  # the worker died mid-job
+
+    assert queue.claim() == (job_id, {})
+    assert queue.get(job_id)['status'] == RUNNING
+
+
+def test_job_is_abandoned_after_max_attempts(queue):
+    job_id = queue.submit({})
+    for _ in range(queue.max_attempts):
+        assert queue.claim()[0] == job_id
+        _expire_lease(queue, job_id)
+
+    assert queue.claim() is None
+    job = queue.get(job_id)
+    assert job['status'] == FAILED
+    assert 'abandoned' in job['error']
+
+
+def test_purge_keeps_unfinished_jobs(queue):
+    done = queue.submit({})
+    queue.claim()
+    queue.complete(done, {})
+    queued = queue.submit({})
+
+    queue.purge(older_than_seconds=-1)
+    assert queue.get(done) is None
+    assert queue.get(queued)['status'] == QUEUED
+
+
+# ---------------------------------------------
+# ✅ WORKERS
+# ---------------------------------------------
+
+@pytest.fixture
+def no_sleep(monkeypatch):
+    monkeypatch.setattr(jobs.time, 'sleep', lambda seconds: None)
+
+
+def test_worker_records_handler_result_and_error(queue):
+    workers = JobWorkers(queue, lambda payload: {'n': payload['n'] * 2}, poll_interval=0)
+    job_id = queue.submit({'n': 21})
+    workers._step(time.time())
+    assert queue.get(job_id)['result'] == {'n': 42}
+
+    workers.handler = lambda payload: 1 / 0
+    job_id = queue.submit({'n': 1})
+    workers._step(time.time())
+    assert queue.get(job_id)['status'] == FAILED
+    assert queue.get(job_id)['error'] == "division by zero"
+
+
+def test_worker_retries_recording_the_outcome(queue, monkeypatch, no_sleep):
+    complete = queue.complete
+    calls = []
+
+    def flaky_complete(job_id, result):
+        calls.append(job_id)
+        if len(calls) < 3:
+            raise jobs.sqlite3.OperationalError("database is locked")
+        complete(job_id, result)
+
+    monkeypatch.setattr(queue, 'complete', flaky_complete)
+    workers = JobWorkers(queue, lambda payload: {'ok': True}, poll_interval=0)
+    job_id = queue.submit({})
+    workers._step(time.time())
+
+    assert len(calls) == 3
+    assert queue.get(job_id)['status'] == DONE
+
+
+def test_unstorable_result_fails_the_job(queue, no_sleep):
+    workers = JobWorkers(queue, lambda payload: {'value': object()}, poll_interval=0)
+    job_id = queue.submit({})
+    workers._step(time.time())
+
+    job = queue.get(job_id)
+    assert job['status'] == FAILED
+    assert job['error'] == "Could not store the job result"
+    assert queue.claim() is None  # not left to run again
+
+
+def test_worker_thread_survives_queue_errors(queue, monkeypatch):
+    claims = []
+
+    def broken_claim():
+        claims.append(None)
+        raise RuntimeError("unexpected")
+
+    monkeypatch.setattr(queue, 'claim', broken_claim)
+    workers = JobWorkers(queue, lambda payload: None, size=1, poll_interval=0.01)
+    workers.ensure_started()
+    deadline = time.time() + 5
+    while len(claims) < 3 and time.time() < deadline:
+        time.sleep(0.01)
+
+    assert len(claims) >= 3
+    assert workers._threads[0].is_alive()
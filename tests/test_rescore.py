@@ -0,0 +1,152 @@
+import json
+import sqlite3
+
+import pytest
+
+from utils.rescore import Checkpoint, rescore_row
+
+
+def _row(n):
+    return {
+        'filename': f'resume-{n}.pdf',
+        'resume_text': f"Python developer number {n} with Flask, SQL and Docker experience",
+        'job_description': "Looking for a Python developer with Flask and AWS",
+        'ats_score': 0,
+        'matched_skills': json.dumps([]),
+        'missing_skills': json.dumps([]),
+        'skill_match_percentage': 0,
+        'suggestions': json.dumps([]),
+        'created_at': '2026-01-05 10:00:00',
+    }
+
+
+def _query(db_path, sql):
+    with sqlite3.connect(db_path) as db:
+        return db.execute(sql).fetchall()
+
+
+# ---------------------------------------------
+# ✅ CHECKPOINT FILE
+# ---------------------------------------------
+
+def test_checkpoint_round_trip(tmp_path):
+    progress = Checkpoint(str(tmp_path / 'jobs' / 'rescore.json'))
+    assert progress.load() is None
+
+    progress.save(last_id=40, rescored=39, failed=1, taxonomy='abc')
+    progress.save(last_id=80, rescored=78, failed=2, taxonomy='abc')
+    assert progress.load() == {'last_id': 80, 'rescored': 78, 'failed': 2, 'taxonomy': 'abc'}
+    assert sorted(p.name for p in (tmp_path / 'jobs').iterdir()) == ['rescore.json']
+
+    progress.clear()
+    progress.clear()  # already gone
+    assert progress.load() is None
+
+
+# ---------------------------------------------
+# ✅ RESCORE-HISTORY RESUME
+# ---------------------------------------------
+
+@pytest.fixture
+def stored(app_module, db_path):
+    """Five stored analyses with stale scores"""
+    ids = app_module.write_analysis_rows([_row(n) for n in range(1, 6)])
+    # Like MySQL, let the write connection commit while the read cursor streams rows
+    _query(db_path, "PRAGMA journal_mode=WAL")
+    return ids
+
+
+def _rescore(app_module, checkpoint, *args):
+    return app_module.app.test_cli_runner().invoke(args=[
+        'rescore-history', '--workers', '1', '--batch-size', '1',
+        '--checkpoint', checkpoint, '--no-refresh-stats', *args
+    ])
+
+
+def test_interrupted_rescore_resumes_after_the_checkpoint(app_module, db_path, stored, tmp_path, monkeypatch):
+    checkpoint = str(tmp_path / 'rescore.json')
+    scored = []
+
+    def crash_on_third(row):
+        if row[0] == stored[2]:
+            raise KeyboardInterrupt
+        scored.append(row[0])
+        return rescore_row(row)
+
+    monkeypatch.setattr(app_module, 'rescore_row', crash_on_third)
+    result = _rescore(app_module, checkpoint)
+    assert result.exit_code != 0
+
+    # Each batch is scored while the previous one is written: id 2 was scored, not stored
+    state = Checkpoint(checkpoint).load()
+    assert state['last_id'] == stored[0] and state['rescored'] == 1
+    # The partial run is still logged, so workers reload what it changed
+    assert _query(db_path, "SELECT resume_id FROM analysis_changes") == [(None,)]
+
+    scored.clear()
+    monkeypatch.setattr(app_module, 'rescore_row', lambda row: scored.append(row[0]) or rescore_row(row))
+    result = _rescore(app_module, checkpoint)
+
+    assert result.exit_code == 0, result.output
+    assert f"Resuming after id {stored[0]}" in result.output
+    assert scored == stored[1:]
+    assert "Re-scored 5 analyses (0 failed)" in result.output
+    assert Checkpoint(checkpoint).load() is None
+    assert all(score > 0 for score, in _query(db_path, "SELECT ats_score FROM resume_analysis"))
+
+
+def test_restart_ignores_the_checkpoint(app_module, db_path, stored, tmp_path):
+    checkpoint = str(tmp_path / 'rescore.json')
+    Checkpoint(checkpoint).save(last_id=stored[-1], rescored=5, failed=0, taxonomy=None)
+
+    result = _rescore(app_module, checkpoint, '--restart')
+    assert result.exit_code == 0, result.output
+    assert "Re-scored 5 analyses" in result.output
+
+
+def test_taxonomy_change_starts_over(app_module, db_path, stored, tmp_path):
+    checkpoint = str(tmp_path / 'rescore.json')
+    Checkpoint(checkpoint).save(last_id=stored[-1], rescored=5, failed=0, taxonomy='old-taxonomy')
+
+    result = _rescore(app_module, checkpoint)
+    assert result.exit_code == 0, result.output
+    assert "Skill taxonomy changed" in result.output
+    assert "Re-scored 5 analyses" in result.output
+
+
+# ---------------------------------------------
+# ✅ RECENT ANALYSES CACHE
+# ---------------------------------------------
+
+@pytest.fixture
+def recent(app_module, monkeypatch):
+    monkeypatch.setattr(app_module, 'recent_analyses', app_module.LRUCache(16))
+    monkeypatch.setattr(app_module, '_recent_sync', {'changes_seen': 0, 'last_sync': 0.0})
+    monkeypatch.setattr(app_module, 'RECENT_ANALYSIS_SYNC_SECONDS', 0)
+    return app_module.recent_analyses
+
+
+def _log_change(db_path, resume_id):
+    # As another worker or a CLI command would
+    with sqlite3.connect(db_path) as db:
+        db.execute("INSERT INTO analysis_changes (resume_id) VALUES (?)", (resume_id,))
+
+
+def test_edit_in_another_process_drops_the_cached_analysis(app_module, db_path, stored, recent):
+    first, second = stored[:2]
+    assert app_module.load_stored_analysis(first)[0].startswith("Python developer number 1")
+    app_module.load_stored_analysis(second)
+    recent.put(first, ("stale text", []))
+
+    _log_change(db_path, first)
+    assert app_module.load_stored_analysis(first)[0].startswith("Python developer number 1")
+    assert second in recent
+
+
+def test_rescore_drops_every_cached_analysis(app_module, db_path, stored, recent):
+    for resume_id in stored:
+        recent.put(resume_id, ("stale text", []))
+
+    _log_change(db_path, None)
+    app_module.load_stored_analysis(stored[0])
+    assert len(recent) == 1 and recent.get(stored[0])[0] != "stale text"
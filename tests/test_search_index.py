@@ -0,0 +1,179 @@
+import time
+
+import numpy as np
+import pytest
+
+from utils import search_index
+from utils.search_index import CandidateIndex, IndexUpdater
+
+TEXTS = {
+    1: "Python developer building Flask APIs with PostgreSQL and Docker",
+    2: "Java engineer working on Spring services and Oracle databases",
+    3: "Registered nurse with years of patient care in hospital wards",
+    4: "Data scientist using pandas, numpy and scikit-learn for forecasting",
+    5: "Frontend developer writing React and TypeScript user interfaces",
+}
+
+
+class Table:
+    """resume_analysis rows and the analysis_changes log for fetch()/changes()"""
+
+    def __init__(self, texts):
+        self.texts = dict(texts)
+        self.changes = []
+
+    def fetch(self, after_id, limit, ids=None):
+        selected = sorted(ids) if ids is not None else [i for i in sorted(self.texts) if i > after_id]
+        return [(i, self.texts[i]) for i in selected[:limit]]
+
+    def fetch_changes(self, after_id):
+        return [change for change in self.changes if change[0] > after_id]
+
+    def edit(self, resume_id, text):
+        self.texts[resume_id] = text
+        self.changes.append((len(self.changes) + 1, resume_id))
+
+
+@pytest.fixture
+def table():
+    return Table(TEXTS)
+
+
+def _ids(index, query, k=5):
+    return [resume_id for resume_id, _, _, _ in index.search(query, k=k)]
+
+
+def _wait(condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def _segment_ids(index):
+    return sorted(int(i) for segment in index._segments for i in segment.ids[segment.live()])
+
+
+# ---------------------------------------------
+# ✅ SYNC AND SEARCH
+# ---------------------------------------------
+
+def test_sync_indexes_new_rows_once(tmp_path, table):
+    index = CandidateIndex(str(tmp_path))
+    assert index.search("Python developer") == []
+    assert index.sync(table.fetch) == 5
+    assert index.sync(table.fetch) == 0
+
+    assert _ids(index, "Python Flask developer with PostgreSQL")[0] == 1
+    assert _ids(index, "Nurse for patient care on hospital wards")[0] == 3
+    assert index.stats()['documents'] == 5
+
+
+def test_small_segments_are_merged(tmp_path, table, monkeypatch):
+    monkeypatch.setattr(search_index, 'SEARCH_INDEX_BATCH', 1)
+    index = CandidateIndex(str(tmp_path))
+    index.sync(table.fetch)
+
+    # One segment per row before merging; MERGE_FACTOR keeps O(log n) of them
+    assert index.stats()['segments'] <= 2
+    assert _segment_ids(index) == [1, 2, 3, 4, 5]
+    assert _ids(index, "Python Flask developer with PostgreSQL")[0] == 1
+
+    # Files of merged segments are removed
+    names = {entry['name'] for entry in index.manifest['segments']}
+    assert {f.name.split('.')[0] for f in tmp_path.glob('seg-*')} == names
+
+
+# ---------------------------------------------
+# ✅ EDITED ROWS
+# ---------------------------------------------
+
+def test_edited_row_is_indexed_again(tmp_path, table):
+    index = CandidateIndex(str(tmp_path))
+    index.sync(table.fetch, changes=table.fetch_changes)
+
+    table.edit(1, "Kubernetes platform engineer running Terraform on AWS")
+    assert index.sync(table.fetch, changes=table.fetch_changes) == 1
+
+    assert index.stats()['documents'] == 5
+    assert index.stats()['changes_seen'] == 1
+    assert 1 not in _ids(index, "Python Flask developer with PostgreSQL", k=1)
+    assert _ids(index, "Kubernetes and Terraform engineer on AWS")[0] == 1
+    # Each id is found once, however many segments it was indexed in
+    assert sorted(_ids(index, "developer engineer nurse scientist", k=10)) == [1, 2, 3, 4, 5]
+
+
+def test_incremental_df_matches_a_rebuild(tmp_path, table):
+    index = CandidateIndex(str(tmp_path / 'incremental'))
+    index.sync(table.fetch, changes=table.fetch_changes)
+    table.edit(2, "Go developer writing gRPC services")
+    table.edit(4, "Python data engineer with Airflow and Spark")
+    index.sync(table.fetch, changes=table.fetch_changes)
+
+    rebuilt = CandidateIndex(str(tmp_path / 'rebuilt'))
+    rebuilt.rebuild(table.fetch, changes=table.fetch_changes)
+
+    assert np.array_equal(index._df, rebuilt._df)
+    assert index.stats()['documents'] == rebuilt.stats()['documents'] == 5
+
+
+def test_merge_drops_deleted_rows(tmp_path, table, monkeypatch):
+    index = CandidateIndex(str(tmp_path))
+    index.sync(table.fetch, changes=table.fetch_changes)
+    table.edit(3, "Nurse practitioner in pediatric care")
+    index.sync(table.fetch, changes=table.fetch_changes)
+    assert any(entry.get('deleted') for entry in index.manifest['segments'])
+
+    # Enough new rows for the merge to reach the segment holding the old version
+    monkeypatch.setattr(search_index, 'MERGE_FACTOR', 100)
+    table.texts[6] = "Accountant preparing tax returns"
+    index.sync(table.fetch, changes=table.fetch_changes)
+
+    assert index.stats()['segments'] == 1
+    assert not index.manifest['segments'][0].get('deleted')
+    assert sorted(int(i) for i in index._segments[0].ids) == [1, 2, 3, 4, 5, 6]
+
+
+def test_rescore_of_every_row_leaves_the_index_alone(tmp_path, table):
+    index = CandidateIndex(str(tmp_path))
+    index.sync(table.fetch, changes=table.fetch_changes)
+    table.changes.append((1, None))
+
+    assert index.sync(table.fetch, changes=table.fetch_changes) == 0
+    assert index.stats()['changes_seen'] == 1
+
+
+# ---------------------------------------------
+# ✅ SEVERAL PROCESSES
+# ---------------------------------------------
+
+def test_reader_reloads_the_manifest_written_by_another_index(tmp_path, table):
+    writer = CandidateIndex(str(tmp_path))
+    reader = CandidateIndex(str(tmp_path))
+    writer.sync(table.fetch, changes=table.fetch_changes)
+    assert _ids(reader, "Python Flask developer with PostgreSQL")[0] == 1
+
+    table.texts[6] = "Rust systems programmer writing embedded firmware"
+    table.edit(1, "Marketing manager running brand campaigns")
+    writer.sync(table.fetch, changes=table.fetch_changes)
+
+    assert _ids(reader, "Rust embedded firmware programmer")[0] == 6
+    assert _ids(reader, "Marketing manager for brand campaigns")[0] == 1
+    assert reader.stats() == dict(writer.stats(), last_sync=None)
+
+
+def test_updater_survives_a_failing_sync(tmp_path, table, caplog):
+    index = CandidateIndex(str(tmp_path))
+    calls = []
+
+    def fetch(after_id, limit, ids=None):
+        calls.append(after_id)
+        if len(calls) == 1:
+            raise RuntimeError("database down")
+        return table.fetch(after_id, limit, ids)
+
+    updater = IndexUpdater(index, fetch, delay=0)
+    updater.notify()
+    _wait(lambda: "Could not update the search index" in caplog.text)
+    updater.notify()
+    _wait(lambda: index.stats()['documents'] == 5)
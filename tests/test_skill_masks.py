@@ -0,0 +1,106 @@
+import datetime
+import json
+
+import pytest
+
+from utils import skill_masks
+from utils.skill_masks import SkillAnalytics, decode_skills, encode_skills, skill_layout
+
+
+def test_round_trip():
+    names, _, _ = skill_layout()
+    skills = ['python', 'kubernetes', 'power bi', names[-1]]
+    mask = encode_skills(skills)
+    assert len(mask) == (len(names) + 7) // 8
+    assert decode_skills(mask) == [name for name in names if name in skills]
+
+
+def test_unknown_and_empty():
+    assert decode_skills(encode_skills(['not a skill'])) == []
+    assert decode_skills(encode_skills([])) == []
+    assert decode_skills(None) == []
+    assert decode_skills(b'') == []
+
+
+def test_bit_order_is_taxonomy_order():
+    names, bits, _ = skill_layout()
+    mask = encode_skills([names[0], names[9]])
+    assert mask[0] == 0b1 and mask[1] == 0b10
+    assert bits[names[9]] == 9
+
+
+def test_masks_wider_than_the_column_are_rejected(monkeypatch):
+    monkeypatch.setattr(skill_masks, 'MAX_MASK_BYTES', 2)
+    with pytest.raises(ValueError, match="needs"):
+        encode_skills(['python'])
+
+
+def _rows(masks, day=datetime.date(2026, 1, 15)):
+    return [(i, day, encode_skills(matched), encode_skills(missing))
+            for i, (matched, missing) in enumerate(masks, 1)]
+
+
+def _fetch(rows):
+    def fetch(after_id, taxonomy, limit, ids=None):
+        selected = [row for row in rows if (row[0] in ids if ids else row[0] > after_id)]
+        return selected[:limit]
+    return fetch
+
+
+def test_summary_counts_and_pairs():
+    rows = _rows([
+        (['python'], ['docker', 'kubernetes']),
+        (['python', 'docker'], ['kubernetes']),
+        ([], ['docker', 'kubernetes', 'aws']),
+    ])
+    analytics = SkillAnalytics()
+    assert analytics.sync(_fetch(rows), force=True) == 3
+
+    summary = analytics.summary(top=3)
+    assert summary['analyses'] == 3
+    gaps = {entry['skill']: entry for entry in summary['missing_skills']}
+    assert gaps['kubernetes'] == {'skill': 'kubernetes', 'demanded': 3, 'matched': 0, 'missing': 3,
+                                  'gap_percentage': 100.0}
+    assert gaps['docker']['demanded'] == 3 and gaps['docker']['missing'] == 2
+    assert summary['missing_together'][0] == {'skills': sorted(['docker', 'kubernetes'],
+                                                               key=skill_layout()[1].get), 'missing': 2}
+    # Cached until rows change
+    assert analytics.summary(top=3) is summary
+
+
+def test_summary_since():
+    rows = _rows([([], ['aws'])], day=datetime.date(2025, 1, 1)) + [
+        (2, datetime.date(2026, 1, 1), encode_skills([]), encode_skills(['sql']))
+    ]
+    analytics = SkillAnalytics()
+    analytics.sync(_fetch(rows), force=True)
+    summary = analytics.summary(since=datetime.date(2025, 6, 1))
+    assert summary['analyses'] == 1
+    assert [entry['skill'] for entry in summary['missing_skills']] == ['sql']
+
+
+def test_skill_masks_backfill_reaches_running_analytics(app_module, db_path):
+    def row(n, masks):
+        skills = {'matched_skills': ['python'], 'missing_skills': ['docker']}
+        return dict(
+            {key: json.dumps(value) for key, value in skills.items()},
+            filename=f'{n}.txt', resume_text="Python developer", job_description="Python and Docker",
+            ats_score=50, skill_match_percentage=50, suggestions='[]', created_at='2026-01-05 10:00:00',
+            **({'matched_skill_mask': encode_skills(skills['matched_skills']).hex(),
+                'missing_skill_mask': encode_skills(skills['missing_skills']).hex(),
+                'skill_taxonomy': skill_layout()[2]} if masks else {})
+        )
+
+    # Row 1 predates the mask columns, row 2 was encoded on insert
+    app_module.write_analysis_rows([row(1, masks=False), row(2, masks=True)])
+    analytics = SkillAnalytics(sync_interval=0)
+    analytics.sync(app_module.fetch_skill_masks, changes=app_module.fetch_analysis_changes)
+    assert analytics.stats()['rows'] == 1 and analytics.max_id == 2
+
+    result = app_module.app.test_cli_runner().invoke(args=['skill-masks'])
+    assert result.exit_code == 0, result.output
+    assert "Encoded skill masks for 1 analyses" in result.output
+
+    analytics.sync(app_module.fetch_skill_masks, changes=app_module.fetch_analysis_changes)
+    assert analytics.stats()['rows'] == 2
+    assert analytics.summary()['missing_skills'][0]['missing'] == 2
@@ -0,0 +1,74 @@
+import pytest
+
+from utils.ats_score import build_default_taxonomy, get_skill_matcher
+from utils.skill_matcher import SkillMatcher, load_skill_matcher, tokenize
+
+
+@pytest.fixture(scope='module')
+def matcher():
+    return SkillMatcher(build_default_taxonomy())
+
+
+def test_tokens_keep_skill_punctuation():
+    assert tokenize("C++, C# and Node.js.") == ['c++', 'c#', 'and', 'node.js']
+
+
+@pytest.mark.parametrize('text', [
+    "A good team player",             # go
+    "Expert in JavaScript",           # java
+    "Rusty on trellis design",        # rust, trello
+    "Reactive programming, gitlab",   # react, git
+    "Gopher",
+])
+def test_no_matches_inside_words(matcher, text):
+    found = matcher.find(text)
+    assert not found & {'go', 'java', 'rust', 'trello', 'react', 'git'}
+
+
+def test_finds_whole_words_at_any_position(matcher):
+    text = "go, Java; python/flask (Docker) and SQL."
+    assert matcher.find(text) >= {'go', 'java', 'python', 'flask', 'docker', 'sql'}
+
+
+def test_multi_word_skills_and_aliases(matcher):
+    found = matcher.find("Dashboards in Power BI, Amazon Web Services, k8s, golang and NodeJS")
+    assert found >= {'power bi', 'aws', 'kubernetes', 'go', 'node.js'}
+    # Aliases are reported under the canonical name only
+    assert not found & {'k8s', 'golang', 'nodejs'}
+
+
+def test_overlapping_patterns(matcher):
+    # "google cloud platform" contains the alias "google cloud"; both map to gcp
+    assert matcher.find("Google Cloud Platform") == {'gcp'}
+    assert matcher.find("javascript java") == {'javascript', 'java'}
+
+
+def test_punctuated_skills(matcher):
+    assert matcher.find("C++ and C# with node.js") == {'c++', 'c#', 'node.js'}
+    assert 'c' not in matcher.find("C++")
+
+
+def test_suffix_patterns_found_after_failed_prefix():
+    # After "power" fails to continue with "bi", the automaton must still see "point bi"
+    taxonomy = {'tools': [{'name': 'power bi'}, {'name': 'point bi'}, 'bi']}
+    assert SkillMatcher(taxonomy).find("power point bi") == {'point bi', 'bi'}
+
+
+def test_compiled_matcher_round_trip(tmp_path, matcher):
+    path = tmp_path / 'skills.pkl'
+    matcher.save(path)
+    loaded = load_skill_matcher(str(path))
+    assert loaded.skills == matcher.skills
+    assert loaded.find("python and k8s") == {'python', 'kubernetes'}
+
+
+def test_json_taxonomy(tmp_path):
+    path = tmp_path / 'skills.json'
+    path.write_text('{"ml": [{"name": "LangChain", "aliases": ["lang chain"]}, "dbt"]}', encoding='utf-8')
+    matcher = load_skill_matcher(str(path))
+    assert matcher.skills == ['langchain', 'dbt']
+    assert matcher.find("Built RAG apps with Lang Chain and dbt") == {'langchain', 'dbt'}
+
+
+def test_default_matcher_is_shared():
+    assert get_skill_matcher() is get_skill_matcher()
@@ -0,0 +1,126 @@
+import json
+import threading
+
+from utils.write_behind import SpillFile, WriteBehindQueue
+
+
+def _row(filename='resume.pdf'):
+    return {
+        'filename': filename,
+        'resume_text': "Python developer with Flask and SQL experience",
+        'job_description': "Looking for a Python developer",
+        'ats_score': 70,
+        'matched_skills': json.dumps(['python']),
+        'missing_skills': json.dumps([]),
+        'skill_match_percentage': 100.0,
+        'suggestions': json.dumps([]),
+        'created_at': '2026-01-05 10:00:00',
+    }
+
+
+def _count(db_path, table):
+    import sqlite3
+
+    with sqlite3.connect(db_path) as db:
+        return db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def _wait(queue, written, timeout=10):
+    with queue._cond:
+        assert queue._cond.wait_for(lambda: queue.written >= written and not queue._pending, timeout)
+
+
+# ---------------------------------------------
+# ✅ REPLAY IDEMPOTENCY
+# ---------------------------------------------
+
+def test_replayed_analysis_keys_are_not_inserted_again(app_module, db_path):
+    first = app_module.write_analysis_rows([_row('a.pdf'), _row('b.pdf')], ['k1', 'k2'])
+    # The same batch again, as after a crash between commit and spill compaction
+    again = app_module.write_analysis_rows([_row('a.pdf'), _row('b.pdf'), _row('c.pdf')], ['k1', 'k2', 'k3'])
+
+    assert again[:2] == first
+    assert again[2] not in first
+    assert _count(db_path, 'resume_analysis') == 3
+    assert _count(db_path, 'resume_texts') == 3
+
+
+def test_replayed_download_logs_are_not_inserted_again(app_module, db_path):
+    rows = [{'resume_id': 1, 'download_time': '2026-01-05 10:00:00'}]
+    app_module.write_download_logs(rows, ['d1'])
+    app_module.write_download_logs(rows * 2, ['d1', 'd2'])
+
+    assert _count(db_path, 'download_logs') == 2
+
+
+def test_orphaned_spill_file_is_replayed_once(app_module, db_path, tmp_path):
+    app_module.write_analysis_rows([_row('a.pdf')], ['k1'])
+
+    # Left behind by a dead process: k1 was committed, k2 was not
+    with open(tmp_path / 'analysis-999999.jsonl', 'w', encoding='utf-8') as f:
+        for key, filename in (('k1', 'a.pdf'), ('k2', 'b.pdf')):
+            f.write(json.dumps({'key': key, 'record': _row(filename)}) + "\n")
+
+    queue = WriteBehindQueue('analysis', app_module.write_analysis_rows, str(tmp_path), flush_interval=0.01)
+    try:
+        _wait(queue, 2)
+    finally:
+        queue.close()
+
+    assert not (tmp_path / 'analysis-999999.jsonl').exists()
+    assert _count(db_path, 'resume_analysis') == 2
+
+
+# ---------------------------------------------
+# ✅ SPILL FILE
+# ---------------------------------------------
+
+def test_spill_keeps_records_until_nothing_is_pending(tmp_path):
+    release = threading.Event()
+    flushed = []
+
+    def flush(records, keys):
+        release.wait(10)
+        flushed.extend(keys)
+        return list(keys)
+
+    queue = WriteBehindQueue('logs', flush, str(tmp_path), batch_size=2, flush_interval=0.01)
+    try:
+        futures = [queue.submit({'n': n}) for n in range(5)]
+        assert [record['n'] for _, record in queue.spill.read()] == [0, 1, 2, 3, 4]
+
+        release.set()
+        _wait(queue, 5)
+        assert [future.result(5) for future in futures] == flushed
+        assert queue.spill.read() == []
+    finally:
+        queue.close()
+
+
+def test_spill_survives_failed_flush(tmp_path, caplog):
+    def flush(records, keys):
+        raise Exception("database down")
+
+    queue = WriteBehindQueue('logs', flush, str(tmp_path), flush_interval=0.01)
+    queue.submit({'n': 1})
+    queue.close(timeout=5)
+    assert "Write-behind queue 'logs' could not write 1 records" in caplog.text
+
+    # Still on disk for the next process, which replays it (same pid here, so its own file)
+    spill = SpillFile(str(tmp_path), 'logs')
+    try:
+        assert [record for _, record in spill.read()] == [{'n': 1}]
+    finally:
+        spill.close()
+
+
+def test_torn_spill_line_is_skipped(tmp_path):
+    with open(tmp_path / 'logs-999999.jsonl', 'w', encoding='utf-8') as f:
+        f.write(json.dumps({'key': 'k1', 'record': {'n': 1}}) + "\n")
+        f.write('{"key": "k2", "rec')
+
+    spill = SpillFile(str(tmp_path), 'logs')
+    try:
+        assert list(spill.recover_orphans()) == [('k1', {'n': 1})]
+    finally:
+        spill.close()
@@ -1,7 +1,11 @@
+import os
 import re
 from collections import Counter
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+
+from utils.cache import LRUCache, content_hash
+from utils.metrics import span, timed
+from utils.skill_matcher import SkillMatcher, load_skill_matcher
+from utils.vectorizer import document_terms, document_vector, get_vectorizer
 
 # ---------------------------------------------
 # ✅ TECHNICAL SKILLS DICTIONARY
@@ -16,20 +20,164 @@ TECHNICAL_SKILLS = {
     'tools': ['git', 'jira', 'confluence', 'slack', 'trello', 'figma', 'photoshop', 'illustrator']
 }
 
+# Alternative spellings reported as the canonical skill name
+SKILL_ALIASES = {
+    'javascript': ['js', 'ecmascript'],
+    'go': ['golang'],
+    'c#': ['csharp'],
+    'node.js': ['nodejs', 'node js'],
+    'react': ['reactjs', 'react.js'],
+    'vue': ['vuejs', 'vue.js'],
+    'postgresql': ['postgres'],
+    'mongodb': ['mongo'],
+    'aws': ['amazon web services'],
+    'gcp': ['google cloud', 'google cloud platform'],
+    'kubernetes': ['k8s'],
+    'ci/cd': ['cicd'],
+    'scikit-learn': ['sklearn'],
+    'power bi': ['powerbi'],
+}
+
+# Set SKILL_TAXONOMY_PATH to a taxonomy .json or a compiled .pkl to replace
+# the built-in skill list.
+SKILL_TAXONOMY_PATH = os.environ.get("SKILL_TAXONOMY_PATH")
+
+_skill_matcher = None
+
+
+def build_default_taxonomy():
+    return {
+        category: [{'name': skill, 'aliases': SKILL_ALIASES.get(skill, [])} for skill in skill_list]
+        for category, skill_list in TECHNICAL_SKILLS.items()
+    }
+
+
+def get_skill_matcher():
+    """Return the process-wide skill matcher, compiling it on first use"""
+    global _skill_matcher
+    if _skill_matcher is None:
+        if SKILL_TAXONOMY_PATH:
+            _skill_matcher = load_skill_matcher(SKILL_TAXONOMY_PATH)
+        else:
+            _skill_matcher = SkillMatcher(build_default_taxonomy())
+    return _skill_matcher
+
+KEYWORD_STOP_WORDS = {
+    'the','and','for','are','but','not','you','all','can','had','her','was','one','our','out',
+    'day','get','has','him','his','how','man','new','now','old','see','two','way','who','boy',
+    'did','its','let','put','say','she','too','use'
+}
+
+IMPORTANT_KEYWORD_STOP_WORDS = {
+    'this','that','with','have','from','your','been','will','they','their','there',
+    'into','about','such','very','more','than','then','them','over','also','only'
+}
+
+RESUME_SECTIONS = ['experience', 'education', 'skills', 'summary', 'objective']
+
+WORD_RE = re.compile(r'\w+')
+UPPER_TOKEN_RE = re.compile(r'[A-Z0-9]{2,}')
+EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b')
+# ✅ Phone number (supports Indian + international)
+PHONE_RE = re.compile(r'(\+?\d{1,3}[- ]?)?\d{10}')
+
+
+# ---------------------------------------------
+# ✅ ANALYZED DOCUMENT (single pass features)
+# ---------------------------------------------
+
+class AnalyzedDocument:
+    """Features of a resume or job description, extracted once and shared
+    by the scoring and suggestion code."""
+
+    def __init__(self, text):
+        self.text = text or ""
+        self.lower = self.text.lower()
+
+        # One regex pass; every keyword flavour below is derived from these runs.
+        runs = WORD_RE.findall(self.text)
+
+        # Lowercase word tokens (TF-IDF style: 2+ word characters)
+        self.terms = [run.lower() for run in runs if len(run) >= 2]
+
+        # Alphabetic words of 3+ letters, as used by keyword matching
+        self.tokens = [run.lower() for run in runs
+                       if len(run) >= 3 and run.isascii() and run.isalpha()]
+        self.keyword_counts = Counter(w for w in self.tokens if w not in KEYWORD_STOP_WORDS)
+        self.keywords = [word for word, _ in self.keyword_counts.most_common(50)]
+
+        important = set()
+        for run in runs:
+            if ((len(run) >= 3 and run.isascii() and run.isalpha())
+                    or UPPER_TOKEN_RE.fullmatch(run)):
+                word = run.lower()
+                if len(word) > 3 and word not in IMPORTANT_KEYWORD_STOP_WORDS:
+                    important.add(word)
+        self.important_keywords = important
+
+        self.skills = get_skill_matcher().find(self.text)
+
+        self.has_email = EMAIL_RE.search(self.text) is not None
+        self.has_phone = PHONE_RE.search(self.text) is not None
+        self.sections = {section for section in RESUME_SECTIONS if section in self.lower}
+        self.word_count = len(self.text.split())
+
+        # TF-IDF vector, filled in lazily by utils.vectorizer.document_vector
+        self.vector = None
+
+
+def analyze_document(text):
+    """Return an AnalyzedDocument for text (documents are passed through)."""
+    if isinstance(text, AnalyzedDocument):
+        return text
+    with span('analyze_document'):
+        return AnalyzedDocument(text)
+
+
+# The same job description is scored once per applicant, so its features
+# (keywords, skills, TF-IDF vector) are kept in a per-process LRU cache.
+JD_CACHE_SIZE = int(os.environ.get("JD_CACHE_SIZE", 256))
+jd_feature_cache = LRUCache(JD_CACHE_SIZE)
+
+
+def normalize_job_description(text):
+    return " ".join((text or "").split())
+
+
+def analyze_job_description(text):
+    """Return the cached AnalyzedDocument for a job description"""
+    if isinstance(text, AnalyzedDocument):
+        return text
+
+    normalized = normalize_job_description(text)
+    key = content_hash(normalized)
+
+    doc = jd_feature_cache.get(key)
+    if doc is None:
+        with span('analyze_job_description'):
+            doc = AnalyzedDocument(normalized)
+        jd_feature_cache.put(key, doc)
+    return doc
+
+
 # ---------------------------------------------
 # ✅ MAIN ATS SCORE FUNCTION
 # ---------------------------------------------
 
 def calculate_ats_score(resume_text, job_description):
-    resume_lower = resume_text.lower()
-    job_lower = job_description.lower()
+    resume = analyze_document(resume_text)
+    job = analyze_job_description(job_description)
 
     scores = {}
 
-    scores['keyword_match'] = calculate_keyword_match(resume_lower, job_lower) * 0.4
-    scores['skills_match'] = calculate_skills_match(resume_lower, job_lower) * 0.3
-    scores['text_similarity'] = calculate_text_similarity(resume_text, job_description) * 0.2
-    scores['format_score'] = calculate_format_score(resume_text) * 0.1
+    with span('score.keyword_match'):
+        scores['keyword_match'] = calculate_keyword_match(resume, job) * 0.4
+    with span('score.skills_match'):
+        scores['skills_match'] = calculate_skills_match(resume, job) * 0.3
+    with span('score.text_similarity'):
+        scores['text_similarity'] = calculate_text_similarity(resume, job) * 0.2
+    with span('score.format'):
+        scores['format_score'] = calculate_format_score(resume) * 0.1
 
     total_score = sum(scores.values())
     return min(100, max(0, int(total_score)))
@@ -40,8 +188,8 @@ def calculate_ats_score(resume_text, job_description):
 # ---------------------------------------------
 
 def calculate_keyword_match(resume_text, job_description):
-    job_keywords = extract_keywords(job_description)
-    resume_keywords = extract_keywords(resume_text)
+    job_keywords = analyze_document(job_description).keywords
+    resume_keywords = analyze_document(resume_text).keywords
 
     if not job_keywords:
         return 0
@@ -55,13 +203,13 @@ def calculate_keyword_match(resume_text, job_description):
 # ---------------------------------------------
 
 def calculate_skills_match(resume_text, job_description):
-    job_skills = extract_technical_skills(job_description)
-    resume_skills = extract_technical_skills(resume_text)
+    job_skills = analyze_document(job_description).skills
+    resume_skills = analyze_document(resume_text).skills
 
     if not job_skills:
         return 50  # default
 
-    matched_skills = set(job_skills) & set(resume_skills)
+    matched_skills = job_skills & resume_skills
     return min(100, (len(matched_skills) / len(job_skills)) * 100)
 
 
@@ -70,13 +218,32 @@ def calculate_skills_match(resume_text, job_description):
 # ---------------------------------------------
 
 def calculate_text_similarity(resume_text, job_description):
+    resume = analyze_document(resume_text)
+    job = analyze_document(job_description)
+
+    # None without a usable corpus model (see TFIDF_MODE)
+    vectorizer = get_vectorizer()
+    if vectorizer is not None:
+        # Corpus model: transform only, vectors are cached on the documents
+        similarity = (document_vector(resume, vectorizer) @ document_vector(job, vectorizer).T)[0, 0]
+        return float(similarity) * 100
+
+    return pairwise_similarity(resume, job)
+
+
+def pairwise_similarity(resume, job):
+    """Cosine similarity (0-100) under a TF-IDF model fitted on just the two documents"""
+    # scikit-learn is imported on first use (see utils/warmup.py)
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.metrics.pairwise import cosine_similarity
+
+    vectorizer = TfidfVectorizer(analyzer=document_terms, max_features=1000)
     try:
-        vectorizer = TfidfVectorizer(stop_words='english', max_features=1000)
-        tfidf = vectorizer.fit_transform([resume_text, job_description])
-        similarity = cosine_similarity(tfidf[0:1], tfidf[1:2])[0][0]
-        return similarity * 100
-    except:
-        return 0
+        tfidf = vectorizer.fit_transform([resume, job])
+    except ValueError:
+        return 0  # no terms left after stop-word removal, so nothing in common
+    similarity = cosine_similarity(tfidf[0:1], tfidf[1:2])[0][0]
+    return similarity * 100
 
 
 # ---------------------------------------------
@@ -85,23 +252,20 @@ def calculate_text_similarity(resume_text, job_description):
 
 def calculate_format_score(resume_text):
     score = 0
-    lower = resume_text.lower()
+    doc = analyze_document(resume_text)
 
-    sections = ['experience', 'education', 'skills', 'summary', 'objective']
-    for section in sections:
-        if section in lower:
-            score += 10
+    score += 10 * len(doc.sections)
 
     # Email present?
-    if re.search(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b', resume_text):
+    if doc.has_email:
         score += 10
 
-    # ✅ Phone number (supports Indian + international)
-    if re.search(r'(\+?\d{1,3}[- ]?)?\d{10}', resume_text):
+    # Phone number present?
+    if doc.has_phone:
         score += 10
 
     # Resume length
-    words = len(resume_text.split())
+    words = doc.word_count
     if 200 <= words <= 1000:
         score += 20
 
@@ -113,18 +277,7 @@ def calculate_format_score(resume_text):
 # ---------------------------------------------
 
 def extract_keywords(text):
-    words = re.findall(r'\b[a-zA-Z]{3,}\b', text.lower())
-
-    stop_words = {
-        'the','and','for','are','but','not','you','all','can','had','her','was','one','our','out',
-        'day','get','has','him','his','how','man','new','now','old','see','two','way','who','boy',
-        'did','its','let','put','say','she','too','use'
-    }
-
-    keywords = [w for w in words if w not in stop_words]
-
-    counter = Counter(keywords)
-    return [word for word, _ in counter.most_common(50)]
+    return list(analyze_document(text).keywords)
 
 
 # ---------------------------------------------
@@ -132,27 +285,22 @@ def extract_keywords(text):
 # ---------------------------------------------
 
 def extract_technical_skills(text):
-    skills = []
-    lower = text.lower()
-
-    for category, skill_list in TECHNICAL_SKILLS.items():
-        for skill in skill_list:
-            if skill in lower:
-                skills.append(skill)
-
-    return list(set(skills))
+    if isinstance(text, AnalyzedDocument):
+        return list(text.skills)
+    return list(get_skill_matcher().find(text))
 
 
 # ---------------------------------------------
 # ✅ SKILL MATCH ANALYSIS (detailed)
 # ---------------------------------------------
 
+@timed('skills_analysis')
 def analyze_skills_match(resume_text, job_description):
-    job_skills = extract_technical_skills(job_description)
-    resume_skills = extract_technical_skills(resume_text)
+    job_skills = analyze_job_description(job_description).skills
+    resume_skills = analyze_document(resume_text).skills
 
-    matched = list(set(job_skills) & set(resume_skills))
-    missing = list(set(job_skills) - set(resume_skills))
+    matched = list(job_skills & resume_skills)
+    missing = list(job_skills - resume_skills)
 
     percent = 0
     if job_skills:
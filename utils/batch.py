@@ -0,0 +1,101 @@
+from utils.ats_score import analyze_document, analyze_job_description, calculate_format_score
+from utils.vectorizer import corpus_vectorizer, document_vector, get_vectorizer
+
+
+def presence_matrix(docs, attribute, vocabulary):
+    """Sparse 0/1 matrix of which vocabulary terms each document contains"""
+    import numpy as np
+    from scipy import sparse
+
+    indptr = [0]
+    indices = []
+
+    for doc in docs:
+        indices.extend(vocabulary[term] for term in getattr(doc, attribute) if term in vocabulary)
+        indptr.append(len(indices))
+
+    data = np.ones(len(indices), dtype=np.float32)
+    return sparse.csr_matrix((data, indices, indptr), shape=(len(docs), len(vocabulary)))
+
+
+def rank_resumes(job_description, resumes):
+    """Score many resumes against one job description in a single pass.
+
+    resumes is a list of (name, text) pairs. Every sub-score is computed with
+    sparse matrix-vector products over the whole batch, so the per-resume cost
+    falls as the batch grows. Scores match calculate_ats_score() under a corpus
+    or hashing model; without one, text similarity comes from a TF-IDF model
+    fitted on the batch. Returns the results sorted by ATS score, best first.
+    """
+    import numpy as np
+
+    if not resumes:
+        return []
+
+    job = analyze_job_description(job_description)
+    docs = [analyze_document(text) for _, text in resumes]
+
+    # ✅ Keyword match (40%)
+    keyword_vocab = {word: i for i, word in enumerate(job.keywords)}
+    if keyword_vocab:
+        keyword_hits = np.asarray(presence_matrix(docs, 'keywords', keyword_vocab).sum(axis=1)).ravel()
+        keyword_scores = np.minimum(100, keyword_hits / len(keyword_vocab) * 100)
+    else:
+        keyword_scores = np.zeros(len(docs))
+
+    # ✅ Skills match (30%)
+    job_skills = sorted(job.skills)
+    skill_vocab = {skill: i for i, skill in enumerate(job_skills)}
+    skill_matrix = presence_matrix(docs, 'skills', skill_vocab)
+    if job_skills:
+        skill_hits = np.asarray(skill_matrix.sum(axis=1)).ravel()
+        skill_percent = skill_hits / len(job_skills) * 100
+        skill_scores = np.minimum(100, skill_percent)
+    else:
+        skill_percent = np.zeros(len(docs))
+        skill_scores = np.full(len(docs), 50.0)
+
+    # ✅ Text similarity (20%): one matrix, one sparse matrix-vector product
+    vectorizer = get_vectorizer()
+    if vectorizer is not None:
+        # Corpus or hashing model, as calculate_text_similarity() uses
+        matrix = vectorizer.transform(docs)
+        query = document_vector(job, vectorizer)
+    else:
+        # No model: fit one on the batch and the job description, rather than
+        # one per resume as /analyze does
+        try:
+            tfidf = corpus_vectorizer(min_df=1).fit_transform(docs + [job])
+            matrix, query = tfidf[:-1], tfidf[-1]
+        except ValueError:
+            matrix = query = None  # no terms left after stop-word removal
+    if matrix is not None:
+        similarity = np.asarray((matrix @ query.T).todense()).ravel() * 100
+    else:
+        similarity = np.zeros(len(docs))
+
+    # ✅ Format score (10%)
+    format_scores = np.array([calculate_format_score(doc) for doc in docs], dtype=float)
+
+    totals = keyword_scores * 0.4 + skill_scores * 0.3 + similarity * 0.2 + format_scores * 0.1
+    ats_scores = np.clip(totals.astype(int), 0, 100)
+
+    skill_rows = skill_matrix.tolil().rows
+    results = []
+    for i, (name, _) in enumerate(resumes):
+        matched = [job_skills[j] for j in skill_rows[i]]
+        results.append({
+            'filename': name,
+            'ats_score': int(ats_scores[i]),
+            'skill_match_percentage': round(float(skill_percent[i]), 1),
+            'keyword_match': round(float(keyword_scores[i]), 1),
+            'text_similarity': round(float(similarity[i]), 1),
+            'matched_skills': matched,
+            'missing_skills': [skill for skill in job_skills if skill not in matched],
+        })
+
+    results.sort(key=lambda r: (r['ats_score'], r['skill_match_percentage']), reverse=True)
+    for rank, result in enumerate(results, 1):
+        result['rank'] = rank
+
+    return results
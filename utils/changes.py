@@ -0,0 +1,30 @@
+# Rows of resume_analysis changed in place (a history edit, or rescore-history
+# re-scoring every row) are logged in analysis_changes. Caches that load rows
+# by increasing id - the duplicate index, skill analytics and the search
+# index - read the log when they sync and reload the ids it names, so an edit
+# made in one process (or by a CLI command) reaches every worker.
+# resume_id NULL stands for "every row changed" (rescore-history, or the
+# fingerprint-history and skill-masks backfills).
+
+
+def record_change(cursor, resume_id=None):
+    cursor.execute("INSERT INTO analysis_changes (resume_id) VALUES (%s)", (resume_id,))
+
+
+def pending_changes(fetch_changes, after_id):
+    """(last change id, changed resume ids, whether every row was re-scored) after after_id.
+
+    fetch_changes(after_id) -> [(change id, resume_id)] in change id order.
+    """
+    rows = fetch_changes(after_id)
+    if not rows:
+        return after_id, set(), False
+    ids = {resume_id for _, resume_id in rows if resume_id is not None}
+    return rows[-1][0], ids, any(resume_id is None for _, resume_id in rows)
+
+
+def id_condition(after_id, ids=None, column="id"):
+    """WHERE condition and parameters for rows with id > after_id, or for exactly these ids"""
+    if ids:
+        return f"{column} IN ({', '.join(['%s'] * len(ids))})", tuple(ids)
+    return f"{column} > %s", (after_id,)
@@ -0,0 +1,231 @@
+import os
+import queue
+import threading
+import time
+
+import mysql.connector
+
+DB_CONFIG = {
+    'host': os.environ.get("DB_HOST", "127.0.0.1"),
+    'port': int(os.environ.get("DB_PORT", 3306)),
+    'user': os.environ.get("DB_USER", "manish"),
+    'password': os.environ.get("DB_PASSWORD", "1234"),
+    'database': os.environ.get("DB_NAME", "manish0832"),
+}
+
+DB_POOL_CONFIG = {
+    'size': int(os.environ.get("DB_POOL_SIZE", 5)),
+    'max_overflow': int(os.environ.get("DB_POOL_MAX_OVERFLOW", 10)),
+    'timeout': float(os.environ.get("DB_POOL_TIMEOUT", 30)),
+    # Connections older than this are closed and replaced on checkout
+    'recycle': float(os.environ.get("DB_POOL_RECYCLE", 1800)),
+    # Ping connections that sat idle longer than this before handing them out
+    'ping_after': float(os.environ.get("DB_POOL_PING_AFTER", 30)),
+}
+
+
+def connect():
+    return mysql.connector.connect(**DB_CONFIG)
+
+
+def is_transient_error(exc):
+    """False for errors caused by the data itself, which retrying cannot fix"""
+    return not isinstance(exc, (
+        mysql.connector.errors.DataError,
+        mysql.connector.errors.IntegrityError,
+        mysql.connector.errors.ProgrammingError
+    ))
+
+
+class PooledConnection:
+    """Proxy for a pooled connection; close() hands it back to the pool"""
+
+    def __init__(self, pool, raw, created_at):
+        self._pool = pool
+        self._raw = raw
+        self.created_at = created_at
+        self.pid = os.getpid()
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def close(self):
+        if self._pool is not None:
+            pool, self._pool = self._pool, None
+            pool._release(self)
+
+
+class ConnectionPool:
+    """Bounded MySQL connection pool with overflow, health checks and recycling"""
+
+    def __init__(self, connect, size=5, max_overflow=10, timeout=30, recycle=1800, ping_after=30):
+        self._connect = connect
+        self.size = size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.recycle = recycle
+        self.ping_after = ping_after
+
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        # Sockets inherited across fork are unusable, start from scratch
+        self._pid = os.getpid()
+        self._idle = queue.LifoQueue()
+        self._total = 0
+        self.in_use = 0
+        self.checkouts = 0
+        self.created = 0
+        self.recycled = 0
+        self.failed_pings = 0
+        self.timeouts = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+    def _new_connection(self):
+        return (self._connect(), time.monotonic())
+
+    def connection(self):
+        """Check out a healthy connection (call close() to return it)"""
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._reset()
+
+        start = time.monotonic()
+        deadline = start + self.timeout
+        entry = None
+        create = False
+
+        while True:
+            try:
+                entry = self._idle.get_nowait()
+                break
+            except queue.Empty:
+                pass
+
+            with self._lock:
+                if self._total < self.size + self.max_overflow:
+                    self._total += 1
+                    create = True
+                    break
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self.timeouts += 1
+                raise Exception(f"Database connection pool exhausted (waited {self.timeout}s)")
+
+            # Short waits so a slot freed by a discarded connection is noticed
+            try:
+                entry = self._idle.get(timeout=min(remaining, 0.5))
+                break
+            except queue.Empty:
+                continue
+
+        try:
+            if create:
+                raw, created_at = self._new_connection()
+                self.created += 1
+            else:
+                raw, created_at, last_used = entry
+                raw, created_at = self._check(raw, created_at, last_used)
+        except Exception:
+            with self._lock:
+                self._total -= 1
+            raise
+
+        waited = time.monotonic() - start
+        with self._lock:
+            self.in_use += 1
+            self.checkouts += 1
+            self.wait_time_total += waited
+            self.wait_time_max = max(self.wait_time_max, waited)
+
+        return PooledConnection(self, raw, created_at)
+
+    def _check(self, raw, created_at, last_used):
+        now = time.monotonic()
+
+        if self.recycle and now - created_at > self.recycle:
+            self.recycled += 1
+            self._close_quietly(raw)
+            return self._new_connection()
+
+        if now - last_used > self.ping_after:
+            try:
+                raw.ping(reconnect=False)
+            except Exception:
+                self.failed_pings += 1
+                self._close_quietly(raw)
+                return self._new_connection()
+
+        return raw, created_at
+
+    def _release(self, conn):
+        raw = conn._raw
+        if conn.pid != self._pid:
+            # checked out before a fork; the socket belongs to the parent
+            return
+
+        with self._lock:
+            self.in_use -= 1
+
+        try:
+            # Drop unread results and any open transaction before reuse
+            if raw.unread_result:
+                raw.consume_results()
+            raw.rollback()
+        except Exception:
+            self._discard(raw)
+            return
+
+        if self._idle.qsize() < self.size:
+            self._idle.put((raw, conn.created_at, time.monotonic()))
+        else:
+            # overflow connection: close instead of keeping it idle
+            self._discard(raw)
+
+    def _discard(self, raw):
+        self._close_quietly(raw)
+        with self._lock:
+            self._total -= 1
+
+    @staticmethod
+    def _close_quietly(raw):
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def stats(self):
+        return {
+            'size': self.size,
+            'max_overflow': self.max_overflow,
+            'open': self._total,
+            'in_use': self.in_use,
+            'idle': self._idle.qsize(),
+            'checkouts': self.checkouts,
+            'created': self.created,
+            'recycled': self.recycled,
+            'failed_pings': self.failed_pings,
+            'timeouts': self.timeouts,
+            'wait_time_total': round(self.wait_time_total, 4),
+            'wait_time_avg': round(self.wait_time_total / self.checkouts, 6) if self.checkouts else 0.0,
+            'wait_time_max': round(self.wait_time_max, 4)
+        }
+
+
+db_pool = ConnectionPool(connect, **DB_POOL_CONFIG)
+
+
+def get_db_connection():
+    """Pooled connection; close() returns it to the pool"""
+    return db_pool.connection()
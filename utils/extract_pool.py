@@ -0,0 +1,184 @@
+import atexit
+import multiprocessing
+import threading
+
+try:
+    import resource
+except ImportError:  # Windows: no per-process memory limits
+    resource = None
+
+
+def _worker_main(conn, target, max_memory_bytes):
+    """Worker loop: run target(*args) for every job received on conn"""
+    if resource is not None and max_memory_bytes:
+        resource.setrlimit(resource.RLIMIT_AS, (max_memory_bytes, max_memory_bytes))
+
+    while True:
+        try:
+            args = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            break
+        if args is None:
+            break
+
+        # Replies are (ok, result_or_error, retire_worker)
+        try:
+            conn.send((True, target(*args), False))
+        except MemoryError:
+            conn.send((False, "File needs more memory than the extraction limit allows", True))
+            break
+        except Exception as e:
+            conn.send((False, str(e), False))
+
+
+class _Worker:
+    def __init__(self, ctx, target, max_memory_bytes):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(
+            target=_worker_main,
+            args=(child_conn, target, max_memory_bytes),
+            daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.jobs = 0
+
+    def stop(self, kill=False):
+        if kill:
+            self.process.kill()
+        else:
+            try:
+                self.conn.send(None)
+            except (OSError, ValueError):
+                pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join(timeout=5)
+        self.conn.close()
+
+
+class ExtractionPool:
+    """Bounded pool of extraction processes.
+
+    Each job gets a wall-clock timeout (the worker is killed and replaced when
+    it expires), workers run under an address-space limit and are recycled
+    after max_jobs_per_worker jobs, so one pathological file cannot pin or
+    bloat a web worker.
+    """
+
+    def __init__(self, target, size=2, timeout=30, max_memory_mb=512,
+                 max_jobs_per_worker=100, queue_timeout=60, start_method='spawn'):
+        self.target = target
+        self.size = size
+        self.timeout = timeout
+        self.max_memory_bytes = max_memory_mb * 1024 * 1024 if max_memory_mb else 0
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.queue_timeout = queue_timeout
+
+        self._ctx = multiprocessing.get_context(start_method)
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+        self.waiting = 0
+        self.busy = 0
+        self.completed = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.crashes = 0
+        self.recycled = 0
+        self.busy_rejections = 0
+
+    def _checkout(self):
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return _Worker(self._ctx, self.target, self.max_memory_bytes)
+
+    def _checkin(self, worker, retire=False):
+        if retire or worker.jobs >= self.max_jobs_per_worker or not worker.process.is_alive():
+            self.recycled += 1
+            worker.stop()
+            return
+
+        with self._lock:
+            if self._closed:
+                worker.stop()
+            else:
+                self._idle.append(worker)
+
+    def run(self, *args):
+        """Run target(*args) in a worker process and return its result"""
+        with self._lock:
+            self.waiting += 1
+        acquired = self._slots.acquire(timeout=self.queue_timeout)
+        with self._lock:
+            self.waiting -= 1
+            if acquired:
+                self.busy += 1
+
+        if not acquired:
+            self.busy_rejections += 1
+            raise Exception("Extraction service is busy, please retry")
+
+        try:
+            worker = self._checkout()
+            try:
+                worker.conn.send(args)
+                ready = worker.conn.poll(self.timeout)
+                if ready:
+                    ok, value, retire = worker.conn.recv()
+            except (EOFError, OSError):
+                self.crashes += 1
+                self.failed += 1
+                worker.stop(kill=True)
+                raise Exception("Extraction worker crashed (file too large or malformed)")
+
+            if not ready:
+                self.timeouts += 1
+                self.failed += 1
+                worker.stop(kill=True)
+                raise TimeoutError(f"Extraction timed out after {self.timeout}s")
+
+            worker.jobs += 1
+            self._checkin(worker, retire)
+
+            if not ok:
+                self.failed += 1
+                raise Exception(value)
+
+            self.completed += 1
+            return value
+        finally:
+            with self._lock:
+                self.busy -= 1
+            self._slots.release()
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.stop()
+
+    def stats(self):
+        return {
+            'size': self.size,
+            'idle_workers': len(self._idle),
+            'busy_workers': self.busy,
+            'queue_depth': self.waiting,
+            'completed': self.completed,
+            'failed': self.failed,
+            'timeouts': self.timeouts,
+            'crashes': self.crashes,
+            'recycled': self.recycled,
+            'busy_rejections': self.busy_rejections
+        }
+
+
+def create_pool(target, **kwargs):
+    pool = ExtractionPool(target, **kwargs)
+    atexit.register(pool.close)
+    return pool
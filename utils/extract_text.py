@@ -1,28 +1,225 @@
 import os
-from pdfminer.high_level import extract_text as pdf_extract_text
-from docx import Document
+import threading
 import re
 
+from utils.cache import LRUCache, content_hash
+from utils.extract_pool import create_pool
+from utils.metrics import EXTRACTION_FAILURES, FILES_TOTAL, INPUT_BYTES, span
+
+# Extracted text is cached by the SHA-256 of the uploaded bytes, so a resume
+# that is uploaded again (e.g. against another job description) skips pdfminer.
+EXTRACTION_CACHE_SIZE = int(os.environ.get("EXTRACTION_CACHE_SIZE", 256))
+EXTRACTION_CACHE_DIR = os.environ.get("EXTRACTION_CACHE_DIR")
+EXTRACTION_CACHE_MAX_BYTES = int(os.environ.get("EXTRACTION_CACHE_MAX_MB", 512)) * 1024 * 1024
+
+
+class ExtractionCache:
+    """In-memory LRU tier with an optional size-bounded on-disk tier"""
+
+    def __init__(self, maxsize, directory=None, max_bytes=0):
+        self.memory = LRUCache(maxsize)
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.disk_hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._disk_bytes = sum(size for _, _, size in self._disk_entries())
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.txt")
+
+    def _disk_entries(self):
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith('.txt'):
+                    path = os.path.join(root, name)
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    yield path, st.st_mtime, st.st_size
+
+    def get(self, key, source_size=0):
+        text = self.memory.get(key)
+
+        if text is None and self.directory:
+            path = self._path(key)
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    text = f.read()
+                os.utime(path)  # keep recently used entries on disk longest
+            except OSError:
+                text = None
+            if text is not None:
+                self.disk_hits += 1
+                self.memory.put(key, text)
+
+        if text is None:
+            self.misses += 1
+        else:
+            self.bytes_saved += source_size
+        return text
+
+    def put(self, key, text):
+        self.memory.put(key, text)
+
+        if not self.directory:
+            return
+
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._disk_bytes += os.path.getsize(path)
+            if self._disk_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        # Drop the least recently used files until the tier is back to 90% of its budget
+        entries = sorted(self._disk_entries(), key=lambda entry: entry[1])
+        total = sum(size for _, _, size in entries)
+        target = self.max_bytes * 0.9
+
+        for path, _, size in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+        self._disk_bytes = total
+
+    def stats(self):
+        stats = self.memory.stats()
+        lookups = stats['hits'] + self.disk_hits + self.misses
+        stats.update({
+            'memory_hits': stats.pop('hits'),
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_rate': round((lookups - self.misses) / lookups, 4) if lookups else 0.0,
+            'bytes_saved': self.bytes_saved,
+            'disk_bytes': self._disk_bytes,
+            'disk_enabled': bool(self.directory)
+        })
+        return stats
+
+
+extraction_cache = ExtractionCache(EXTRACTION_CACHE_SIZE, EXTRACTION_CACHE_DIR, EXTRACTION_CACHE_MAX_BYTES)
+
+# PDF and DOCX parsing runs in a separate process pool so a malformed or huge
+# file cannot pin a web worker. EXTRACTION_POOL_SIZE=0 extracts in-process.
+EXTRACTION_POOL_CONFIG = {
+    'size': int(os.environ.get("EXTRACTION_POOL_SIZE", 2)),
+    'timeout': float(os.environ.get("EXTRACTION_TIMEOUT", 30)),
+    'max_memory_mb': int(os.environ.get("EXTRACTION_MAX_MEMORY_MB", 1024)),
+    'max_jobs_per_worker': int(os.environ.get("EXTRACTION_MAX_JOBS_PER_WORKER", 100)),
+    'queue_timeout': float(os.environ.get("EXTRACTION_QUEUE_TIMEOUT", 60)),
+}
+POOLED_EXTENSIONS = {'.pdf', '.docx'}
+
+_extraction_pool = None
+_extraction_pool_lock = threading.Lock()
+
+
+def configure_extraction_pool(**options):
+    """Override pool settings before first use (size=0 disables the pool)"""
+    EXTRACTION_POOL_CONFIG.update(options)
+
+
+def get_extraction_pool():
+    """Return the per-process extraction pool, or None when it is disabled"""
+    global _extraction_pool
+    if EXTRACTION_POOL_CONFIG['size'] <= 0:
+        return None
+
+    if _extraction_pool is None:
+        with _extraction_pool_lock:
+            if _extraction_pool is None:
+                _extraction_pool = create_pool(_extract_by_extension, **EXTRACTION_POOL_CONFIG)
+    return _extraction_pool
+
+
+def extraction_pool_stats():
+    if _extraction_pool is None:
+        return {'size': EXTRACTION_POOL_CONFIG['size'], 'started': False}
+    return dict(_extraction_pool.stats(), started=True)
+
+
 def extract_text_from_file(filepath):
-    """Extract text from PDF, DOCX, or TXT files"""
+    """Extract text from PDF, DOCX, or TXT files (cached by content hash)"""
+    file_extension = os.path.splitext(filepath)[1].lower()
     try:
-        file_extension = os.path.splitext(filepath)[1].lower()
-        
-        if file_extension == '.pdf':
-            return extract_text_from_pdf(filepath)
-        elif file_extension == '.docx':
-            return extract_text_from_docx(filepath)
-        elif file_extension == '.txt':
-            return extract_text_from_txt(filepath)
-        else:
-            raise ValueError(f"Unsupported file type: {file_extension}")
-    
+        with open(filepath, 'rb') as f:
+            data = f.read()
+        FILES_TOTAL.inc(file_extension)
+        INPUT_BYTES.observe(len(data), file_extension)
+        key = content_hash(data) + file_extension.replace('.', '_')
+
+        text = extraction_cache.get(key, source_size=len(data))
+        if text is not None:
+            return text
+
+        with span(f"extract{file_extension}"):
+            pool = get_extraction_pool() if file_extension in POOLED_EXTENSIONS else None
+            if pool is not None:
+                text = pool.run(filepath, file_extension)
+            else:
+                text = _extract_by_extension(filepath, file_extension)
+        extraction_cache.put(key, text)
+        return text
+
     except Exception as e:
+        EXTRACTION_FAILURES.inc(file_extension)
         raise Exception(f"Error extracting text from file: {str(e)}")
 
 
+def extract_texts(filepaths):
+    """Extract many files, keeping every extraction pool worker busy.
+
+    Returns [(text, None) or (None, error message)] in input order.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    def extract(filepath):
+        try:
+            return extract_text_from_file(filepath), None
+        except Exception as e:
+            return None, str(e)
+
+    # One thread per pool worker: each waits on its worker while the others run
+    threads = min(EXTRACTION_POOL_CONFIG['size'], len(filepaths))
+    if threads <= 1:
+        return [extract(filepath) for filepath in filepaths]
+    with ThreadPoolExecutor(max_workers=threads, thread_name_prefix='batch-extract') as executor:
+        return list(executor.map(extract, filepaths))
+
+
+def _extract_by_extension(filepath, file_extension):
+    if file_extension == '.pdf':
+        return extract_text_from_pdf(filepath)
+    elif file_extension == '.docx':
+        return extract_text_from_docx(filepath)
+    elif file_extension == '.txt':
+        return extract_text_from_txt(filepath)
+    else:
+        raise ValueError(f"Unsupported file type: {file_extension}")
+
+
 def extract_text_from_pdf(filepath):
     """Extract text from PDF file"""
+    from pdfminer.high_level import extract_text as pdf_extract_text
+
     try:
         text = pdf_extract_text(filepath)
         return clean_text(text)
@@ -32,6 +229,8 @@ def extract_text_from_pdf(filepath):
 
 def extract_text_from_docx(filepath):
     """Extract text from DOCX file"""
+    from docx import Document
+
     try:
         doc = Document(filepath)
         text = "\n".join(paragraph.text for paragraph in doc.paragraphs)
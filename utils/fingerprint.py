@@ -0,0 +1,189 @@
+import hashlib
+import re
+import threading
+import time
+
+from utils.changes import pending_changes
+
+# Near-duplicate detection for uploaded resumes.
+#
+# Each resume gets a 64-bit SimHash of its cleaned text (word 3-shingles,
+# digits ignored so a new phone number or date does not move it). Two
+# fingerprints within SIMHASH_MAX_DISTANCE bits of each other are treated as
+# the same resume. Lookups go through an LSH table: the fingerprint is split
+# into SIMHASH_MAX_DISTANCE + 1 bands, and by the pigeonhole principle any
+# fingerprint that close shares at least one band exactly.
+SIMHASH_BITS = 64
+SIMHASH_MAX_DISTANCE = 3
+SHINGLE_SIZE = 3
+# Shorter texts give unstable fingerprints and are not deduplicated
+MIN_SHINGLES = 8
+SYNC_BATCH = 5000
+
+WORD_RE = re.compile(r'[^\W\d_]+')
+MASK = (1 << SIMHASH_BITS) - 1
+
+
+def shingles(text):
+    words = WORD_RE.findall((text or "").lower())
+    if len(words) < SHINGLE_SIZE:
+        return []
+    return [" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)]
+
+
+def simhash(text):
+    """64-bit SimHash of clean_text() output, or None if the text is too short"""
+    features = shingles(text)
+    if len(features) < MIN_SHINGLES:
+        return None
+
+    import numpy as np
+
+    digests = b"".join(hashlib.blake2b(f.encode('utf-8'), digest_size=8).digest() for f in features)
+    # One row of 64 bits per shingle; a bit is set if most shingles set it
+    bits = np.unpackbits(np.frombuffer(digests, dtype=np.uint8).reshape(-1, 8), axis=1, bitorder='little')
+    votes = bits.sum(axis=0, dtype=np.int64) * 2 - len(features)
+    return int.from_bytes(np.packbits(votes > 0, bitorder='little').tobytes(), 'little')
+
+
+def hamming(a, b):
+    return bin(a ^ b).count('1')
+
+
+def to_signed(fingerprint):
+    """Fingerprint as stored in the BIGINT column"""
+    if fingerprint is None:
+        return None
+    return fingerprint - (1 << SIMHASH_BITS) if fingerprint >= 1 << (SIMHASH_BITS - 1) else fingerprint
+
+
+def from_signed(value):
+    if value is None:
+        return None
+    return int(value) & MASK
+
+
+class DuplicateIndex:
+    """In-memory LSH table of stored fingerprints, kept in step with resume_analysis.
+
+    sync() pulls rows with id > the last one seen (a primary key range scan),
+    at most once every sync_interval seconds; rows inserted by this process
+    are added directly.
+    """
+
+    def __init__(self, max_distance=SIMHASH_MAX_DISTANCE, sync_interval=2.0):
+        self.max_distance = max_distance
+        self.band_count = max_distance + 1
+        self.band_bits = SIMHASH_BITS // self.band_count
+        self.sync_interval = sync_interval
+        self.bands = [{} for _ in range(self.band_count)]
+        self.fingerprints = {}  # id -> (fingerprint, cluster id)
+        self.max_id = 0
+        self.changes_seen = 0
+        self.last_sync = 0.0
+        self.lookups = 0
+        self.hits = 0
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+
+    def _band_keys(self, fingerprint):
+        band_mask = (1 << self.band_bits) - 1
+        return [(fingerprint >> (i * self.band_bits)) & band_mask for i in range(self.band_count)]
+
+    def add(self, resume_id, fingerprint, cluster=None):
+        if fingerprint is None:
+            return
+        with self._lock:
+            if resume_id in self.fingerprints:
+                return
+            self.fingerprints[resume_id] = (fingerprint, cluster or resume_id)
+            for band, key in zip(self.bands, self._band_keys(fingerprint)):
+                band.setdefault(key, []).append(resume_id)
+
+    def remove(self, resume_id):
+        with self._lock:
+            entry = self.fingerprints.pop(resume_id, None)
+            if entry is None:
+                return
+            for band, key in zip(self.bands, self._band_keys(entry[0])):
+                ids = band.get(key)
+                if ids and resume_id in ids:
+                    ids.remove(resume_id)
+                    if not ids:
+                        del band[key]
+
+    def _reset(self):
+        with self._lock:
+            self.bands = [{} for _ in range(self.band_count)]
+            self.fingerprints = {}
+            self.max_id = 0
+
+    def find(self, fingerprint):
+        """Stored rows within max_distance bits: [(id, distance, cluster id)], closest first"""
+        if fingerprint is None:
+            return []
+        with self._lock:
+            self.lookups += 1
+            candidates = set()
+            for band, key in zip(self.bands, self._band_keys(fingerprint)):
+                candidates.update(band.get(key, ()))
+
+            matches = []
+            for resume_id in candidates:
+                stored, cluster = self.fingerprints[resume_id]
+                distance = hamming(fingerprint, stored)
+                if distance <= self.max_distance:
+                    matches.append((resume_id, distance, cluster))
+
+            if matches:
+                self.hits += 1
+            return sorted(matches, key=lambda m: (m[1], m[0]))
+
+    def sync(self, fetch, force=False, changes=None):
+        """Add rows stored since the last sync; fetch(after_id, limit, ids=None) -> [(id, simhash, duplicate_of)].
+
+        With changes (see utils.changes), rows edited since the last sync are
+        fetched by id and replace their old fingerprints; a change to every row
+        (e.g. `flask fingerprint-history`) reloads the index from the first id.
+        """
+        if not force and time.monotonic() - self.last_sync < self.sync_interval:
+            return 0
+        if not self._sync_lock.acquire(blocking=False):
+            return 0  # another thread is already syncing
+        try:
+            if changes is not None:
+                # Read before the new rows, so an edit made meanwhile is seen next time
+                self.changes_seen, changed, rescored = pending_changes(changes, self.changes_seen)
+                if rescored:
+                    self._reset()
+                changed = sorted(resume_id for resume_id in changed if resume_id <= self.max_id)
+                if changed:
+                    for resume_id in changed:
+                        self.remove(resume_id)
+                    for resume_id, value, cluster in fetch(0, len(changed), ids=changed):
+                        self.add(resume_id, from_signed(value), cluster)
+
+            added = 0
+            while True:
+                rows = fetch(self.max_id, SYNC_BATCH)
+                for resume_id, value, cluster in rows:
+                    self.add(resume_id, from_signed(value), cluster)
+                    added += value is not None
+                if rows:
+                    self.max_id = max(self.max_id, rows[-1][0])
+                if len(rows) < SYNC_BATCH:
+                    break
+            self.last_sync = time.monotonic()
+            return added
+        finally:
+            self._sync_lock.release()
+
+    def stats(self):
+        return {
+            'fingerprints': len(self.fingerprints),
+            'max_id': self.max_id,
+            'changes_seen': self.changes_seen,
+            'max_distance': self.max_distance,
+            'lookups': self.lookups,
+            'hits': self.hits
+        }
@@ -0,0 +1,253 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+# Job states
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+log = logging.getLogger(__name__)
+
+
+class JobQueue:
+    """Durable job queue stored in a local SQLite file.
+
+    Several web worker processes can share one file. A running job holds a
+    lease; if its worker dies (restart, crash) the lease expires and another
+    worker claims the job again, so queued work is never lost.
+    """
+
+    def __init__(self, path, lease_seconds=600, max_attempts=3):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._local = threading.local()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._connect() as db:
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    lease_expires REAL,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            db.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at)")
+
+    def _connect(self, write=True):
+        db = getattr(self._local, 'db', None)
+        # SQLite connections must not cross a fork (gunicorn --preload)
+        if db is None or self._local.pid != os.getpid():
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+            self._local.pid = os.getpid()
+        return _Transaction(db, "BEGIN IMMEDIATE" if write else "BEGIN")
+
+    def submit(self, payload):
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as db:
+            db.execute(
+                "INSERT INTO jobs (id, status, payload, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (job_id, QUEUED, json.dumps(payload), now, now)
+            )
+        return job_id
+
+    def claim(self):
+        """Atomically take the oldest runnable job, or return None"""
+        now = time.time()
+        with self._connect() as db:
+            row = db.execute("""
+                SELECT id, payload, attempts FROM jobs
+                WHERE status = ? OR (status = ? AND lease_expires < ?)
+                ORDER BY created_at
+                LIMIT 1
+            """, (QUEUED, RUNNING, now)).fetchone()
+            if row is None:
+                return None
+
+            job_id, payload, attempts = row
+            if attempts >= self.max_attempts:
+                db.execute(
+                    "UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE id = ?",
+                    (FAILED, 'Job abandoned after repeated worker failures', now, job_id)
+                )
+                return None
+
+            db.execute(
+                "UPDATE jobs SET status = ?, attempts = attempts + 1, lease_expires = ?, updated_at = ? WHERE id = ?",
+                (RUNNING, now + self.lease_seconds, now, job_id)
+            )
+        return job_id, json.loads(payload)
+
+    def complete(self, job_id, result):
+        self._finish(job_id, DONE, result=json.dumps(result))
+
+    def fail(self, job_id, error):
+        self._finish(job_id, FAILED, error=error)
+
+    def _finish(self, job_id, status, result=None, error=None):
+        with self._connect() as db:
+            db.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, lease_expires = NULL, updated_at = ? WHERE id = ?",
+                (status, result, error, time.time(), job_id)
+            )
+
+    def get(self, job_id):
+        with self._connect(write=False) as db:
+            row = db.execute(
+                "SELECT status, payload, result, error, created_at, updated_at FROM jobs WHERE id = ?",
+                (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+
+        status, payload, result, error, created_at, updated_at = row
+        return {
+            'id': job_id,
+            'status': status,
+            'payload': json.loads(payload),
+            'result': json.loads(result) if result else None,
+            'error': error,
+            'created_at': created_at,
+            'updated_at': updated_at
+        }
+
+    def purge(self, older_than_seconds):
+        """Delete finished jobs older than the retention window"""
+        with self._connect() as db:
+            db.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND updated_at < ?",
+                (DONE, FAILED, time.time() - older_than_seconds)
+            )
+
+    def stats(self):
+        with self._connect(write=False) as db:
+            counts = dict(db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+        return {state: counts.get(state, 0) for state in (QUEUED, RUNNING, DONE, FAILED)}
+
+
+class _Transaction:
+    # sqlite3 in autocommit mode + explicit transactions; writes take the lock
+    # up front (BEGIN IMMEDIATE) so claim() is atomic across processes
+    def __init__(self, db, begin):
+        self.db = db
+        self.begin = begin
+
+    def __enter__(self):
+        self.db.execute(self.begin)
+        return self.db
+
+    def __exit__(self, exc_type, exc, tb):
+        self.db.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
+
+
+class JobWorkers:
+    """Background threads that run handler(payload) for queued jobs.
+
+    A thread never exits on an error: recording a job's outcome is retried,
+    and if it still fails the job's lease expires and it runs again.
+    """
+
+    FINISH_ATTEMPTS = 5
+
+    def __init__(self, queue, handler, size=2, poll_interval=1.0, retention_seconds=86400):
+        self.queue = queue
+        self.handler = handler
+        self.size = size
+        self.poll_interval = poll_interval
+        self.retention_seconds = retention_seconds
+        self._wakeup = threading.Event()
+        self._threads = []
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def ensure_started(self):
+        # Threads do not survive fork, so each worker process starts its own
+        if self._pid == os.getpid():
+            return
+
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._threads = []
+            for i in range(self.size):
+                thread = threading.Thread(target=self._run, name=f"analysis-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def notify(self):
+        self._wakeup.set()
+
+    def _run(self):
+        last_purge = 0.0
+        while True:
+            try:
+                last_purge = self._step(last_purge)
+            except Exception:
+                log.exception("Job worker error")
+                time.sleep(self.poll_interval)
+
+    def _step(self, last_purge):
+        """Claim and run one job, or wait for one; returns the last purge time"""
+        try:
+            job = self.queue.claim()
+        except sqlite3.Error:
+            log.exception("Could not claim a job")
+            job = None
+
+        if job is None:
+            if time.time() - last_purge > 3600:
+                last_purge = time.time()
+                try:
+                    self.queue.purge(self.retention_seconds)
+                except sqlite3.Error:
+                    log.exception("Could not purge finished jobs")
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+            return last_purge
+
+        job_id, payload = job
+        try:
+            result = self.handler(payload)
+        except Exception as e:
+            log.exception("Job %s failed", job_id)
+            self._finish(job_id, self.queue.fail, str(e))
+        else:
+            if not self._finish(job_id, self.queue.complete, result):
+                # e.g. a result that cannot be stored; do not leave the job to run again
+                self._finish(job_id, self.queue.fail, "Could not store the job result")
+        return last_purge
+
+    def _finish(self, job_id, finish, value):
+        """Record a job's outcome, retrying with back-off; False if it could not be recorded"""
+        for attempt in range(1, self.FINISH_ATTEMPTS + 1):
+            try:
+                finish(job_id, value)
+                return True
+            except Exception:
+                log.exception("Could not record the outcome of job %s (attempt %d of %d)",
+                              job_id, attempt, self.FINISH_ATTEMPTS)
+                if attempt < self.FINISH_ATTEMPTS:
+                    time.sleep(min(30, 0.5 * 2 ** attempt))
+        # The lease expires and another worker claims the job again
+        return False
@@ -0,0 +1,243 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+# Metrics are kept per process, and every sample carries a worker="<pid>"
+# label so series from different gunicorn workers never overwrite each other;
+# aggregate over it in queries, e.g.
+#   sum by (le, stage) (rate(resume_stage_duration_seconds_bucket[5m]))
+# With METRICS_DIR set to a directory shared by the workers, each one writes a
+# snapshot there (at most every METRICS_SNAPSHOT_SECONDS) and /metrics, served
+# by any worker, reports them all. Without it, a scrape sees only the worker
+# that answers it.
+METRICS_DIR = os.environ.get("METRICS_DIR")
+METRICS_SNAPSHOT_SECONDS = float(os.environ.get("METRICS_SNAPSHOT_SECONDS", 1))
+REGISTRY = []
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(worker, names, values, extra=None):
+    pairs = [f'worker="{worker}"']
+    pairs.extend(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}"
+
+
+INF = 'le="+Inf"'
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def sample(self):
+        with self._lock:
+            return [[list(labels), value] for labels, value in sorted(self._values.items())]
+
+    def render(self, samples):
+        """samples: [(worker, sample())]"""
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for worker, values in samples:
+            for labels, value in values:
+                lines.append(f"{self.name}{_labels(worker, self.labelnames, labels)} {_number(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._values = {}  # labels -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def observe(self, value, *labels):
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[i] += 1
+            entry[-2] += value
+            entry[-1] += 1
+
+    def sample(self):
+        with self._lock:
+            return [[list(labels), list(entry)] for labels, entry in sorted(self._values.items())]
+
+    def render(self, samples):
+        """samples: [(worker, sample())]"""
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for worker, values in samples:
+            for labels, entry in values:
+                for bound, count in zip(self.buckets, entry):
+                    le = f'le="{_number(bound)}"'
+                    lines.append(f"{self.name}_bucket{_labels(worker, self.labelnames, labels, le)} {count}")
+                lines.append(f"{self.name}_bucket{_labels(worker, self.labelnames, labels, INF)} {entry[-1]}")
+                lines.append(f"{self.name}_sum{_labels(worker, self.labelnames, labels)} {_number(entry[-2])}")
+                lines.append(f"{self.name}_count{_labels(worker, self.labelnames, labels)} {entry[-1]}")
+        return lines
+
+
+class Gauge:
+    """Value read from a callback at scrape time (None = not reported)"""
+
+    def __init__(self, name, help, callback):
+        self.name = name
+        self.help = help
+        self.callback = callback
+        REGISTRY.append(self)
+
+    def sample(self):
+        return self.callback()
+
+    def render(self, samples):
+        """samples: [(worker, sample())]"""
+        lines = [f"{self.name}{_labels(worker, (), ())} {_number(value)}"
+                 for worker, value in samples if value is not None]
+        if not lines:
+            return []
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"] + lines
+
+
+def _snapshot_path(pid):
+    return os.path.join(METRICS_DIR, f"metrics-{pid}.json")
+
+
+_last_snapshot = {'at': 0.0}
+
+
+def save_snapshot(force=False):
+    """Write this worker's metrics to METRICS_DIR (throttled; no-op when unset)"""
+    if not METRICS_DIR:
+        return
+    now = time.monotonic()
+    if not force and now - _last_snapshot['at'] < METRICS_SNAPSHOT_SECONDS:
+        return
+    _last_snapshot['at'] = now
+    path = _snapshot_path(os.getpid())
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump({metric.name: metric.sample() for metric in REGISTRY}, f)
+    os.replace(tmp, path)
+
+
+def remove_snapshot(pid):
+    """Drop the snapshot of a worker that exited"""
+    if METRICS_DIR:
+        try:
+            os.remove(_snapshot_path(pid))
+        except OSError:
+            pass
+
+
+def _worker_snapshots():
+    """{pid: {metric name: sample}} of every worker, this one read live"""
+    workers = {}
+    if METRICS_DIR and os.path.isdir(METRICS_DIR):
+        for filename in os.listdir(METRICS_DIR):
+            if not (filename.startswith('metrics-') and filename.endswith('.json')):
+                continue
+            try:
+                with open(os.path.join(METRICS_DIR, filename), encoding='utf-8') as f:
+                    workers[int(filename[8:-5])] = json.load(f)
+            except (OSError, ValueError):
+                continue  # being replaced, or not a snapshot
+    workers[os.getpid()] = {metric.name: metric.sample() for metric in REGISTRY}
+    return workers
+
+
+def render_metrics():
+    """All registered metrics of every worker in the Prometheus text exposition format"""
+    workers = sorted(_worker_snapshots().items())
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render([(pid, snapshot[metric.name]) for pid, snapshot in workers
+                                    if snapshot.get(metric.name) is not None]))
+    return "\n".join(lines) + "\n"
+
+
+# ✅ Pipeline metrics
+STAGE_SECONDS = Histogram('resume_stage_duration_seconds', 'Time spent in each pipeline stage', ['stage'])
+REQUEST_SECONDS = Histogram('http_request_duration_seconds', 'Request latency', ['endpoint', 'method', 'status'])
+FILES_TOTAL = Counter('resume_files_total', 'Resume files extracted, by extension', ['extension'])
+EXTRACTION_FAILURES = Counter('resume_extraction_failures_total', 'Failed extractions, by extension', ['extension'])
+INPUT_BYTES = Histogram('resume_input_bytes', 'Size of uploaded resume files', ['extension'], buckets=SIZE_BUCKETS)
+TEXT_CHARS = Histogram('resume_text_chars', 'Characters of extracted resume text', buckets=SIZE_BUCKETS)
+DB_SECONDS = Histogram('db_operation_duration_seconds', 'Time spent on database work', ['operation'])
+
+
+# ✅ Spans
+_trace = threading.local()
+
+
+def start_trace():
+    """Collect the spans of the current request/job on this thread"""
+    _trace.spans = []
+
+
+def end_trace():
+    spans = getattr(_trace, 'spans', None)
+    _trace.spans = None
+    return spans or []
+
+
+@contextmanager
+def span(stage, extra=None):
+    """Time a block into the stage histogram and the current trace.
+
+    extra=(histogram, labels) records the same duration in a second histogram.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.observe(elapsed, stage)
+        if extra is not None:
+            histogram, labels = extra
+            histogram.observe(elapsed, *labels)
+        spans = getattr(_trace, 'spans', None)
+        if spans is not None:
+            spans.append((stage, elapsed))
+
+
+def db_span(operation):
+    return span(f"db.{operation}", (DB_SECONDS, (operation,)))
+
+
+def timed(stage):
+    """Decorator form of span()"""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,142 @@
+import json
+import os
+import shutil
+import signal
+import zipfile
+
+try:
+    import resource
+except ImportError:  # Windows: no per-process memory limits
+    resource = None
+
+SUPPORTED_EXTENSIONS = {'.pdf', '.docx', '.txt'}
+
+# Per worker process, set by init_worker()
+_worker = {}
+
+
+# ✅ Inputs
+def list_inputs(source):
+    """Sorted (key, size) of the resumes in a directory tree or a .zip archive.
+
+    key is the path relative to the directory, or the member name in the
+    archive; it identifies the resume in the output and on restart.
+    """
+    inputs = []
+    if os.path.isdir(source):
+        for root, dirnames, filenames in os.walk(source):
+            dirnames.sort()
+            for name in sorted(filenames):
+                if os.path.splitext(name)[1].lower() in SUPPORTED_EXTENSIONS:
+                    path = os.path.join(root, name)
+                    inputs.append((os.path.relpath(path, source), os.path.getsize(path)))
+    else:
+        with zipfile.ZipFile(source) as zf:
+            for member in zf.infolist():
+                name = os.path.basename(member.filename)
+                if not member.is_dir() and name and os.path.splitext(name)[1].lower() in SUPPORTED_EXTENSIONS:
+                    inputs.append((member.filename, member.file_size))
+        inputs.sort()
+    return inputs
+
+
+# ✅ Worker side
+def init_worker(source, job_descriptions, scratch, timeout=60, max_memory_mb=1024):
+    """Pool initializer: extract in this process and analyze each job description once"""
+    from utils.ats_score import analyze_job_description
+    from utils.extract_text import configure_extraction_pool
+
+    # The batch pool already isolates files from the parent; a nested pool per worker would double the processes
+    configure_extraction_pool(size=0)
+    if resource is not None and max_memory_mb:
+        limit = max_memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+    _worker.update(
+        source=source,
+        archive=None if os.path.isdir(source) else zipfile.ZipFile(source),
+        scratch=scratch,
+        jobs=[(name, analyze_job_description(text)) for name, text in job_descriptions],
+        timeout=timeout
+    )
+
+
+def _on_timeout(signum, frame):
+    raise TimeoutError("Analysis timed out")
+
+
+def analyze_input(key):
+    """Pool task: one output record for the resume at key (errors are recorded, not raised)"""
+    from utils.ats_score import analyze_document, analyze_skills_match, calculate_ats_score
+    from utils.extract_text import extract_text_from_file
+    from utils.optimizer import generate_suggestions
+
+    record = {'file': key}
+    path = None
+    alarm = hasattr(signal, 'SIGALRM') and _worker['timeout'] > 0
+    if alarm:
+        signal.signal(signal.SIGALRM, _on_timeout)
+        signal.setitimer(signal.ITIMER_REAL, _worker['timeout'])
+    try:
+        if _worker['archive'] is not None:
+            # Same extension as the member, so extraction picks the right parser
+            path = os.path.join(_worker['scratch'], f"{os.getpid()}{os.path.splitext(key)[1].lower()}")
+            with _worker['archive'].open(key) as src, open(path, 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+            resume_text = extract_text_from_file(path)
+        else:
+            resume_text = extract_text_from_file(os.path.join(_worker['source'], key))
+
+        if not resume_text or not resume_text.strip():
+            record['error'] = 'Could not extract text'
+            return record
+
+        resume_doc = analyze_document(resume_text)
+        record['chars'] = len(resume_text)
+        record['results'] = []
+        for name, job_doc in _worker['jobs']:
+            skills_analysis = analyze_skills_match(resume_doc, job_doc)
+            record['results'].append({
+                'job_description': name,
+                'ats_score': calculate_ats_score(resume_doc, job_doc),
+                'skill_match_percentage': skills_analysis.get('match_percentage', 0),
+                'matched_skills': skills_analysis.get('matched_skills', []),
+                'missing_skills': skills_analysis.get('missing_skills', []),
+                'suggestions': generate_suggestions(resume_doc, job_doc, skills_analysis)
+            })
+        return record
+    except MemoryError:
+        record['error'] = 'File needs more memory than the worker limit allows'
+        return record
+    except Exception as e:
+        record['error'] = str(e)
+        return record
+    finally:
+        if alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+        if path is not None and os.path.exists(path):
+            os.remove(path)
+
+
+# ✅ Output
+def open_results(path):
+    """Append handle for the JSONL output and the keys it already holds.
+
+    A line cut short by an interrupted run is dropped, so the output stays
+    valid JSONL and that resume is analyzed again.
+    """
+    done = set()
+    valid_bytes = 0
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    done.add(json.loads(line)['file'])
+                except (ValueError, KeyError, TypeError):
+                    break
+                valid_bytes += len(line)
+        with open(path, 'r+b') as f:
+            f.truncate(valid_bytes)
+    return open(path, 'a', encoding='utf-8'), done
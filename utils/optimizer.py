@@ -1,11 +1,22 @@
-import tempfile
+import io
+import json
 import os
-from docx import Document
 import re
 
+from utils.ats_score import analyze_document, analyze_job_description
+from utils.cache import LRUCache, content_hash
+from utils.metrics import span, timed
+
+# Generated .docx files, keyed by hash of (resume text, suggestions)
+OPTIMIZED_RESUME_CACHE_SIZE = int(os.environ.get("OPTIMIZED_RESUME_CACHE_SIZE", 64))
+optimized_resume_cache = LRUCache(OPTIMIZED_RESUME_CACHE_SIZE)
+
+@timed('suggestions')
 def generate_suggestions(resume_text, job_description, skills_analysis):
     """Generate improvement suggestions for the resume"""
     suggestions = []
+    resume = analyze_document(resume_text)
+    job = analyze_job_description(job_description)
     
     # ✅ Missing skills
     if skills_analysis['missing_skills']:
@@ -18,9 +29,7 @@ def generate_suggestions(resume_text, job_description, skills_analysis):
         })
     
     # ✅ Keyword suggestions
-    job_keywords = extract_important_keywords(job_description)
-    resume_keywords = extract_important_keywords(resume_text)
-    missing_keywords = list(set(job_keywords) - set(resume_keywords))
+    missing_keywords = list(job.important_keywords - resume.important_keywords)
 
     if missing_keywords:
         suggestions.append({
@@ -31,10 +40,10 @@ def generate_suggestions(resume_text, job_description, skills_analysis):
         })
     
     # ✅ Format suggestions
-    suggestions.extend(analyze_format_issues(resume_text))
+    suggestions.extend(analyze_format_issues(resume))
 
     # ✅ Content suggestions
-    suggestions.extend(analyze_content_issues(resume_text, job_description))
+    suggestions.extend(analyze_content_issues(resume, job))
 
     return suggestions
 
@@ -42,29 +51,16 @@ def generate_suggestions(resume_text, job_description, skills_analysis):
 # ✅ Improved keyword extractor
 def extract_important_keywords(text):
     """Extract keywords from resume and JD"""
-    words = re.findall(r'\b[A-Za-z]{3,}\b|\b[A-Z0-9]{2,}\b', text)
-
-    stopwords = {
-        'this','that','with','have','from','your','been','will','they','their','there',
-        'into','about','such','very','more','than','then','them','over','also','only'
-    }
-
-    keywords = []
-    for w in words:
-        w = w.lower()
-        if len(w) > 3 and w not in stopwords:
-            keywords.append(w)
-
-    return list(set(keywords))
+    return list(analyze_document(text).important_keywords)
 
 
 # ✅ Improved format analysis
 def analyze_format_issues(resume_text):
     suggestions = []
-    text_lower = resume_text.lower()
+    resume = analyze_document(resume_text)
 
     # ✅ Email check
-    if not re.search(r'[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}', resume_text):
+    if not resume.has_email:
         suggestions.append({
             'type': 'format',
             'title': 'Add Email Address',
@@ -73,7 +69,7 @@ def analyze_format_issues(resume_text):
         })
 
     # ✅ India + Global phone formats
-    if not re.search(r'(\+?\d{1,3}[- ]?)?\d{10}', resume_text):
+    if not resume.has_phone:
         suggestions.append({
             'type': 'format',
             'title': 'Add Phone Number',
@@ -84,7 +80,7 @@ def analyze_format_issues(resume_text):
     # ✅ Required sections
     required_sections = ['experience', 'education', 'skills']
     for section in required_sections:
-        if section not in text_lower:
+        if section not in resume.sections:
             suggestions.append({
                 'type': 'format',
                 'title': f'Missing {section.title()} Section',
@@ -93,7 +89,7 @@ def analyze_format_issues(resume_text):
             })
 
     # ✅ Length check
-    wc = len(resume_text.split())
+    wc = resume.word_count
     if wc < 200:
         suggestions.append({
             'type': 'format',
@@ -115,10 +111,11 @@ def analyze_format_issues(resume_text):
 # ✅ Improved content analysis
 def analyze_content_issues(resume_text, job_description):
     suggestions = []
-    text_lower = resume_text.lower()
+    resume = analyze_document(resume_text)
+    text_lower = resume.lower
 
     # ✅ Achievements check
-    if not re.search(r'\d+%|\d+\s+(years?|months?)|\d{2,}', resume_text):
+    if not re.search(r'\d+%|\d+\s+(years?|months?)|\d{2,}', resume.text):
         suggestions.append({
             'type': 'content',
             'title': 'Add Quantifiable Achievements',
@@ -142,7 +139,7 @@ def analyze_content_issues(resume_text, job_description):
         })
 
     # ✅ Tech terminology check
-    if any(term in job_description.lower() for term in ['developer', 'software', 'engineer']):
+    if any(term in analyze_document(job_description).lower for term in ['developer', 'software', 'engineer']):
         tech_terms = ['api', 'database', 'algorithm', 'debug', 'framework', 'testing']
         found = [t for t in tech_terms if t in text_lower]
 
@@ -159,34 +156,43 @@ def analyze_content_issues(resume_text, job_description):
 
 # ✅ SAFE DOCX GENERATOR (FINAL)
 def create_optimized_resume(resume_text, suggestions):
-    try:
-        doc = Document()
+    """Build the optimized resume .docx in memory and return its bytes"""
+    key = content_hash(json.dumps([resume_text, suggestions], sort_keys=True))
+    data = optimized_resume_cache.get(key)
+    if data is not None:
+        return data
+
+    from docx import Document
 
-        doc.add_heading("Optimized Resume", 0)
-        doc.add_heading("Resume Content", level=1)
+    try:
+        with span('optimized_resume'):
+            doc = Document()
 
-        # Remove unsupported characters
-        safe_text = resume_text.encode("ascii", "ignore").decode()
+            doc.add_heading("Optimized Resume", 0)
+            doc.add_heading("Resume Content", level=1)
 
-        for paragraph in safe_text.split("\n"):
-            if paragraph.strip():
-                doc.add_paragraph(paragraph.strip())
+            # Remove unsupported characters
+            safe_text = resume_text.encode("ascii", "ignore").decode()
 
-        doc.add_page_break()
-        doc.add_heading("Optimization Suggestions", level=1)
+            for paragraph in safe_text.split("\n"):
+                if paragraph.strip():
+                    doc.add_paragraph(paragraph.strip())
 
-        for i, sug in enumerate(suggestions, 1):
-            doc.add_heading(f"{i}. {sug['title']}", level=2)
-            doc.add_paragraph(f"Priority: {sug['priority'].upper()}")
-            doc.add_paragraph(sug["description"])
-            doc.add_paragraph("")
+            doc.add_page_break()
+            doc.add_heading("Optimization Suggestions", level=1)
 
-        # Save temp file
-        tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".docx")
-        doc.save(tmp.name)
-        tmp.close()
+            for i, sug in enumerate(suggestions, 1):
+                doc.add_heading(f"{i}. {sug['title']}", level=2)
+                doc.add_paragraph(f"Priority: {sug['priority'].upper()}")
+                doc.add_paragraph(sug["description"])
+                doc.add_paragraph("")
 
-        return tmp.name
+            buffer = io.BytesIO()
+            doc.save(buffer)
+            data = buffer.getvalue()
 
     except Exception as e:
         raise Exception(f"Error creating optimized resume: {str(e)}")
+
+    optimized_resume_cache.put(key, data)
+    return data
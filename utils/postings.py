@@ -0,0 +1,171 @@
+import threading
+import time
+
+from utils.ats_score import (
+    AnalyzedDocument, analyze_document, calculate_format_score, get_skill_matcher, normalize_job_description
+)
+from utils.batch import presence_matrix
+from utils.vectorizer import document_terms, get_vectorizer
+
+
+class PostingCatalog:
+    """Open job postings with their scoring features precomputed.
+
+    The reverse of rank_resumes(): each posting's keywords, skills and TF-IDF
+    vector are rows of sparse matrices built once, so one resume is scored
+    against every posting with three sparse matrix-vector products.
+    """
+
+    def __init__(self, postings, signature=None):
+        # postings: [(id, title, description)]
+        import numpy as np
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        start = time.perf_counter()
+        self.signature = signature
+        self.ids = [posting_id for posting_id, _, _ in postings]
+        self.titles = [title for _, title, _ in postings]
+
+        # Built directly, not through analyze_job_description, so a full catalog
+        # does not flush the per-request JD cache
+        docs = [AnalyzedDocument(normalize_job_description(description)) for _, _, description in postings]
+
+        keywords = {}
+        for doc in docs:
+            for word in doc.keywords:
+                keywords.setdefault(word, len(keywords))
+        self.keyword_vocab = keywords
+        self.keywords = presence_matrix(docs, 'keywords', keywords)
+        self.keyword_counts = np.array([len(doc.keywords) for doc in docs], dtype=np.float32)
+
+        self.skill_names = list(get_skill_matcher().skills)
+        self.skill_vocab = {skill: i for i, skill in enumerate(self.skill_names)}
+        self.skills = presence_matrix(docs, 'skills', self.skill_vocab)
+        self.skill_counts = np.asarray(self.skills.sum(axis=1), dtype=np.float32).ravel()
+
+        # Corpus model if there is one, else a model fitted on the catalog itself
+        self.vectorizer_source = get_vectorizer()
+        self.vectorizer = self.vectorizer_source
+        self.tfidf = None
+        if docs:
+            try:
+                if self.vectorizer is None:
+                    self.vectorizer = TfidfVectorizer(analyzer=document_terms, dtype=np.float32).fit(docs)
+                self.tfidf = self.vectorizer.transform(docs).tocsr()
+            except ValueError:
+                pass  # every posting was empty after stop-word removal
+
+        self.build_seconds = round(time.perf_counter() - start, 3)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def match(self, resume_text, k=10):
+        """Top-k postings for one resume, scored like calculate_ats_score"""
+        import numpy as np
+
+        if not self.ids:
+            return []
+
+        resume = analyze_document(resume_text)
+
+        # ✅ Keyword match (40%)
+        resume_keywords = presence_matrix([resume], 'keywords', self.keyword_vocab)
+        keyword_hits = np.asarray((self.keywords @ resume_keywords.T).todense()).ravel()
+        keyword_scores = np.minimum(100, np.divide(keyword_hits * 100, self.keyword_counts,
+                                                   out=np.zeros(len(self.ids)), where=self.keyword_counts > 0))
+
+        # ✅ Skills match (30%)
+        resume_skills = presence_matrix([resume], 'skills', self.skill_vocab)
+        skill_hits = np.asarray((self.skills @ resume_skills.T).todense()).ravel()
+        skill_percent = np.divide(skill_hits * 100, self.skill_counts,
+                                  out=np.zeros(len(self.ids)), where=self.skill_counts > 0)
+        skill_scores = np.where(self.skill_counts > 0, np.minimum(100, skill_percent), 50.0)
+
+        # ✅ Text similarity (20%)
+        if self.tfidf is not None:
+            query = self.vectorizer.transform([resume])
+            similarity = np.asarray((self.tfidf @ query.T).todense()).ravel() * 100
+        else:
+            similarity = np.zeros(len(self.ids))
+
+        # ✅ Format score (10%): depends on the resume only
+        format_score = calculate_format_score(resume)
+
+        totals = keyword_scores * 0.4 + skill_scores * 0.3 + similarity * 0.2 + format_score * 0.1
+        ats_scores = np.clip(totals.astype(int), 0, 100)
+
+        # Best first by (score, skill match); only the top k are sorted
+        order = ats_scores * 1000.0 + skill_percent
+        k = min(k, len(self.ids))
+        top = np.argpartition(-order, k - 1)[:k]
+        top = top[np.argsort(-order[top], kind='stable')]
+
+        indptr, indices = self.skills.indptr, self.skills.indices
+        results = []
+        for rank, i in enumerate(top, 1):
+            posting_skills = [self.skill_names[j] for j in indices[indptr[i]:indptr[i + 1]]]
+            results.append({
+                'rank': rank,
+                'posting_id': self.ids[i],
+                'title': self.titles[i],
+                'ats_score': int(ats_scores[i]),
+                'skill_match_percentage': round(float(skill_percent[i]), 1),
+                'keyword_match': round(float(keyword_scores[i]), 1),
+                'text_similarity': round(float(similarity[i]), 1),
+                'matched_skills': [skill for skill in posting_skills if skill in resume.skills],
+                'missing_skills': [skill for skill in posting_skills if skill not in resume.skills],
+            })
+        return results
+
+    def stats(self):
+        return {
+            'postings': len(self.ids),
+            'keywords': len(self.keyword_vocab),
+            'build_seconds': self.build_seconds
+        }
+
+
+class CatalogCache:
+    """Per-process catalog, rebuilt when the open postings (or the TF-IDF model) change.
+
+    The change check is one cheap aggregate query, run at most every
+    check_interval seconds. While one thread rebuilds, others keep scoring
+    against the previous catalog.
+    """
+
+    def __init__(self, check_interval=30.0):
+        self.check_interval = check_interval
+        self.catalog = None
+        self.last_check = 0.0
+        self.rebuilds = 0
+        self._lock = threading.Lock()
+
+    def get(self, load_signature, load_postings):
+        catalog = self.catalog
+        stale = catalog is None or time.monotonic() - self.last_check >= self.check_interval
+        if not stale:
+            return catalog
+
+        if not self._lock.acquire(blocking=catalog is None):
+            return catalog
+        try:
+            if self.catalog is not None and time.monotonic() - self.last_check < self.check_interval:
+                return self.catalog
+            signature = load_signature()
+            if (self.catalog is None or self.catalog.signature != signature
+                    or self.catalog.vectorizer_source is not get_vectorizer()):
+                self.catalog = PostingCatalog(load_postings(), signature)
+                self.rebuilds += 1
+            self.last_check = time.monotonic()
+            return self.catalog
+        finally:
+            self._lock.release()
+
+    def invalidate(self):
+        self.last_check = 0.0
+
+    def stats(self):
+        stats = self.catalog.stats() if self.catalog is not None else {'postings': None}
+        stats['rebuilds'] = self.rebuilds
+        return stats
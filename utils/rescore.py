@@ -0,0 +1,74 @@
+import json
+import os
+
+from utils.ats_score import analyze_document, analyze_job_description, analyze_skills_match, calculate_ats_score
+from utils.optimizer import generate_suggestions
+from utils.skill_masks import encode_skills, skill_layout
+from utils.text_store import stored_resume_text
+
+# Columns recomputed when scoring weights or the skill taxonomy change
+RESCORE_UPDATE_SQL = """
+    UPDATE resume_analysis
+    SET ats_score=%s, skill_match_percentage=%s, matched_skills=%s, missing_skills=%s, suggestions=%s,
+        matched_skill_mask=%s, missing_skill_mask=%s, skill_taxonomy=%s
+    WHERE id=%s
+"""
+
+
+def score_fields(resume_text, job_description):
+    """Scored columns for one stored analysis, in RESCORE_UPDATE_SQL order (without the id)"""
+    resume_doc = analyze_document(resume_text or '')
+    job_doc = analyze_job_description(job_description or '')
+
+    ats_score = calculate_ats_score(resume_doc, job_doc)
+    skills_analysis = analyze_skills_match(resume_doc, job_doc)
+    suggestions = generate_suggestions(resume_doc, job_doc, skills_analysis)
+
+    matched = skills_analysis.get('matched_skills', [])
+    missing = skills_analysis.get('missing_skills', [])
+    return (
+        ats_score,
+        skills_analysis.get('match_percentage', 0),
+        json.dumps(matched),
+        json.dumps(missing),
+        json.dumps(suggestions),
+        encode_skills(matched),
+        encode_skills(missing),
+        skill_layout()[2]
+    )
+
+
+def rescore_row(row):
+    """Pool task: (id, compressed text, inline text, JD) -> (id, fields or None, error or None)"""
+    resume_id, compressed, inline, job_description = row
+    try:
+        return resume_id, score_fields(stored_resume_text(compressed, inline), job_description), None
+    except Exception as e:
+        return resume_id, None, str(e)
+
+
+class Checkpoint:
+    """Progress of a long batch job in a small JSON file, replaced atomically"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def load(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def save(self, **state):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,425 @@
+import json
+import logging
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: single writer assumed
+    fcntl = None
+
+from utils.ats_score import analyze_job_description, get_skill_matcher
+from utils.changes import pending_changes
+from utils.vectorizer import document_terms
+
+# Persistent candidate index built from resume_analysis.
+#
+# Rows are added in append-only segments. Each segment stores two term-major
+# ("inverted") sparse matrices as raw .npy arrays that are memory-mapped on
+# load: hashed TF-IDF terms x resumes and skills x resumes. A query only
+# touches the posting rows of its own terms and skills, so search cost depends
+# on the query, not on how many resumes are stored. A resume whose text is
+# edited is indexed again in a new segment; the manifest lists its old
+# position as deleted until a merge drops it.
+SEARCH_INDEX_DIR = os.environ.get("SEARCH_INDEX_DIR", "index")
+SEARCH_INDEX_FEATURES = 2 ** 18
+SEARCH_INDEX_BATCH = 2000
+# Merge the newest segment into the previous one while that one is less than
+# MERGE_FACTOR times larger (keeps O(log n) segments)
+MERGE_FACTOR = 4
+SKILL_WEIGHT = 0.3
+QUERY_MAX_DF = 0.5
+
+log = logging.getLogger(__name__)
+
+
+def _hashing_vectorizer():
+    import numpy as np
+    from sklearn.feature_extraction.text import HashingVectorizer
+
+    return HashingVectorizer(
+        analyzer=document_terms,
+        n_features=SEARCH_INDEX_FEATURES,
+        alternate_sign=False,
+        norm=None,
+        dtype=np.float32
+    )
+
+
+class Segment:
+    """One immutable batch of indexed resumes"""
+
+    ARRAYS = ('terms_data', 'terms_indices', 'terms_indptr', 'skills_indices', 'skills_indptr', 'ids')
+
+    def __init__(self, directory, name, deleted=()):
+        import numpy as np
+        from scipy import sparse
+
+        self.name = name
+        arrays = {key: np.load(os.path.join(directory, f"{name}.{key}.npy"), mmap_mode='r') for key in self.ARRAYS}
+        with open(os.path.join(directory, f"{name}.skills.json"), encoding='utf-8') as f:
+            self.skill_names = json.load(f)
+        self.skill_columns = {skill: i for i, skill in enumerate(self.skill_names)}
+
+        self.ids = arrays['ids']
+        # Positions of rows indexed again in a newer segment
+        self.dead = np.isin(self.ids, list(deleted)) if deleted else None
+        rows = len(self.ids)
+        self.terms = sparse.csr_matrix(
+            (arrays['terms_data'], arrays['terms_indices'], arrays['terms_indptr']),
+            shape=(SEARCH_INDEX_FEATURES, rows)
+        )
+        skills_indices = arrays['skills_indices']
+        self.skills = sparse.csr_matrix(
+            (np.ones(len(skills_indices), dtype=np.float32), skills_indices, arrays['skills_indptr']),
+            shape=(len(self.skill_names), rows)
+        )
+
+    @staticmethod
+    def write(directory, name, ids, terms, skills, skill_names):
+        """terms: features x rows, skills: skills x rows (both CSR)"""
+        import numpy as np
+
+        # indices and indptr share one dtype so scipy can wrap the memory maps without copying
+        terms_index = np.int64 if terms.nnz > np.iinfo(np.int32).max else np.int32
+        arrays = {
+            'terms_data': terms.data.astype(np.float32),
+            'terms_indices': terms.indices.astype(terms_index),
+            'terms_indptr': terms.indptr.astype(terms_index),
+            'skills_indices': skills.indices.astype(np.int32),
+            'skills_indptr': skills.indptr.astype(np.int32),
+            'ids': np.asarray(ids, dtype=np.int64),
+        }
+        for key, array in arrays.items():
+            np.save(os.path.join(directory, f"{name}.{key}.npy"), array)
+        with open(os.path.join(directory, f"{name}.skills.json"), 'w', encoding='utf-8') as f:
+            json.dump(skill_names, f)
+
+    @staticmethod
+    def remove(directory, name):
+        for key in Segment.ARRAYS + ('skills',):
+            suffix = 'json' if key == 'skills' else 'npy'
+            try:
+                os.remove(os.path.join(directory, f"{name}.{key}.{suffix}"))
+            except OSError:
+                pass
+
+    def skills_as(self, skill_names):
+        """Skills matrix re-indexed to another skill order (used when merging)"""
+        import numpy as np
+        from scipy import sparse
+
+        columns = {skill: i for i, skill in enumerate(skill_names)}
+        mapping = np.array([columns[skill] for skill in self.skill_names], dtype=np.int32)
+        coo = self.skills.tocoo()
+        return sparse.csr_matrix(
+            (coo.data, (mapping[coo.row], coo.col)),
+            shape=(len(skill_names), self.skills.shape[1])
+        )
+
+    def live(self):
+        """Positions of the rows not deleted"""
+        import numpy as np
+
+        if self.dead is None:
+            return np.arange(len(self.ids))
+        return np.flatnonzero(~self.dead)
+
+
+class CandidateIndex:
+    """Incrementally built search index over stored resumes.
+
+    sync(fetch) pulls rows newer than the last indexed id (one writer at a time,
+    across processes, via a lock file); searches reload the manifest when
+    another process has changed it.
+    """
+
+    def __init__(self, directory=SEARCH_INDEX_DIR):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._manifest_mtime = None
+        self._segments = []
+        self._df = None
+        self.manifest = self._empty_manifest()
+        self.last_sync = None
+
+    @staticmethod
+    def _empty_manifest():
+        return {'features': SEARCH_INDEX_FEATURES, 'segments': [], 'max_id': 0, 'documents': 0, 'next_segment': 1}
+
+    @property
+    def _manifest_path(self):
+        return os.path.join(self.directory, 'manifest.json')
+
+    def _read_manifest(self):
+        try:
+            with open(self._manifest_path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return self._empty_manifest()
+
+    def _write_manifest(self, manifest, df):
+        import numpy as np
+
+        np.save(os.path.join(self.directory, f"df-{manifest['next_segment']}.npy"), df)
+        manifest['df'] = f"df-{manifest['next_segment']}.npy"
+        tmp = f"{self._manifest_path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+        os.replace(tmp, self._manifest_path)
+
+    def reload(self):
+        """Load the latest manifest if it changed since the last call"""
+        import numpy as np
+
+        try:
+            mtime = os.path.getmtime(self._manifest_path)
+        except OSError:
+            return
+        if mtime == self._manifest_mtime:
+            return
+
+        with self._lock:
+            manifest = self._read_manifest()
+            segments = [Segment(self.directory, entry['name'], entry.get('deleted'))
+                        for entry in manifest['segments']]
+            df = np.load(os.path.join(self.directory, manifest['df'])) if manifest.get('df') else None
+            self.manifest, self._segments, self._df = manifest, segments, df
+            self._manifest_mtime = mtime
+
+    # ✅ Writing
+    def sync(self, fetch, blocking=True, changes=None):
+        """Index rows returned by fetch(after_id, limit, ids=None) -> [(id, resume_text)].
+
+        With changes (see utils.changes), rows edited since the last sync are
+        fetched by id and indexed again. Returns the number of rows added, or
+        None when another process holds the writer lock and blocking is False.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, '.lock'), 'w') as lock_file:
+            if fcntl is not None:
+                flags = fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB
+                try:
+                    fcntl.flock(lock_file, flags)
+                except OSError:
+                    return None
+
+            added = 0
+            manifest = self._read_manifest()
+            df = self._load_df(manifest)
+            changes_seen = manifest.get('changes_seen', 0)
+            if changes is not None:
+                # Re-scoring every row leaves the text, and so this index, as it was
+                manifest['changes_seen'], changed, _ = pending_changes(changes, changes_seen)
+                changed = sorted(resume_id for resume_id in changed if resume_id <= manifest['max_id'])
+                if changed:
+                    self._delete(manifest, df, changed)
+                    rows = fetch(0, len(changed), ids=changed)
+                    if rows:
+                        self._add_segment(manifest, df, rows)
+                        added += len(rows)
+
+            while True:
+                rows = fetch(manifest['max_id'], SEARCH_INDEX_BATCH)
+                if not rows:
+                    break
+                self._add_segment(manifest, df, rows)
+                added += len(rows)
+
+            if added:
+                self._compact(manifest)
+            if added or manifest.get('changes_seen', 0) != changes_seen:
+                self._write_manifest(manifest, df)
+                self._remove_stale_files(manifest)
+            self.last_sync = time.time()
+
+        self.reload()
+        return added
+
+    def _load_df(self, manifest):
+        import numpy as np
+
+        if manifest.get('df'):
+            return np.load(os.path.join(self.directory, manifest['df'])).astype(np.int32)
+        return np.zeros(SEARCH_INDEX_FEATURES, dtype=np.int32)
+
+    def _delete(self, manifest, df, ids):
+        """Mark the indexed rows with these ids as deleted"""
+        import numpy as np
+
+        for entry in manifest['segments']:
+            segment = Segment(self.directory, entry['name'], entry.get('deleted'))
+            found = np.isin(segment.ids, ids)
+            if segment.dead is not None:
+                found &= ~segment.dead
+            positions = np.flatnonzero(found)
+            if not len(positions):
+                continue
+            entry['deleted'] = sorted(set(entry.get('deleted', [])) | {int(i) for i in segment.ids[positions]})
+            manifest['documents'] -= len(positions)
+            df -= np.diff(segment.terms[:, positions].tocsr().indptr).astype(np.int32)
+
+    def _add_segment(self, manifest, df, rows):
+        import numpy as np
+        from scipy import sparse
+        from sklearn.preprocessing import normalize
+
+        ids = [row_id for row_id, _ in rows]
+        texts = [text or '' for _, text in rows]
+
+        counts = _hashing_vectorizer().transform(texts)
+        df += np.diff(counts.tocsc().indptr).astype(np.int32)
+
+        # Sublinear tf, length-normalized; IDF is applied on the query side
+        counts.data = 1 + np.log(counts.data)
+        terms = normalize(counts).T.tocsr()
+
+        matcher = get_skill_matcher()
+        skill_names = list(matcher.skills)
+        columns = {skill: i for i, skill in enumerate(skill_names)}
+        indptr, indices = [0], []
+        for text in texts:
+            indices.extend(sorted(columns[skill] for skill in matcher.find(text) if skill in columns))
+            indptr.append(len(indices))
+        skills = sparse.csr_matrix(
+            (np.ones(len(indices), dtype=np.float32), indices, indptr),
+            shape=(len(texts), len(skill_names))
+        ).T.tocsr()
+
+        name = f"seg-{manifest['next_segment']:06d}"
+        manifest['next_segment'] += 1
+        Segment.write(self.directory, name, ids, terms, skills, skill_names)
+        manifest['segments'].append({'name': name, 'rows': len(ids)})
+        manifest['max_id'] = max(manifest['max_id'], max(ids))
+        manifest['documents'] += len(ids)
+
+    def _compact(self, manifest):
+        import numpy as np
+        from scipy import sparse
+
+        segments = manifest['segments']
+        while len(segments) > 1 and segments[-2]['rows'] < MERGE_FACTOR * segments[-1]['rows']:
+            newer, older = segments.pop(), segments.pop()
+            a = Segment(self.directory, older['name'], older.get('deleted'))
+            b = Segment(self.directory, newer['name'], newer.get('deleted'))
+            skill_names = b.skill_names + [s for s in a.skill_names if s not in b.skill_columns]
+            # Deleted rows are dropped here
+            a_live, b_live = a.live(), b.live()
+
+            name = f"seg-{manifest['next_segment']:06d}"
+            manifest['next_segment'] += 1
+            Segment.write(
+                self.directory, name,
+                np.concatenate([a.ids[a_live], b.ids[b_live]]),
+                sparse.hstack([a.terms[:, a_live], b.terms[:, b_live]], format='csr'),
+                sparse.hstack([a.skills_as(skill_names)[:, a_live], b.skills_as(skill_names)[:, b_live]],
+                              format='csr'),
+                skill_names
+            )
+            segments.append({'name': name, 'rows': len(a_live) + len(b_live)})
+
+    def _remove_stale_files(self, manifest):
+        # Readers that still map an old segment keep working: unlinked files stay readable
+        live = {entry['name'] for entry in manifest['segments']}
+        for filename in os.listdir(self.directory):
+            if filename.startswith('seg-') and filename.split('.')[0] not in live:
+                Segment.remove(self.directory, filename.split('.')[0])
+            elif filename.startswith('df-') and filename != manifest['df']:
+                os.remove(os.path.join(self.directory, filename))
+
+    def rebuild(self, fetch, changes=None):
+        """Drop the index and build it again from scratch"""
+        if os.path.isdir(self.directory):
+            for filename in os.listdir(self.directory):
+                if filename != '.lock':
+                    os.remove(os.path.join(self.directory, filename))
+        self._manifest_mtime = None
+        return self.sync(fetch, changes=changes)
+
+    # ✅ Searching
+    def search(self, job_description, k=20, skill_weight=SKILL_WEIGHT):
+        """Top-k stored resumes for a job description: [(id, score, similarity, skill_overlap)]"""
+        import numpy as np
+        from sklearn.preprocessing import normalize
+
+        self.reload()
+        segments, df, documents = self._segments, self._df, self.manifest['documents']
+        if not segments:
+            return []
+
+        job = analyze_job_description(job_description)
+        query = _hashing_vectorizer().transform([job])
+        # Terms found in most resumes barely change the ranking but have the
+        # longest posting lists; leave them out of the query
+        query.data[df[query.indices] > QUERY_MAX_DF * documents] = 0
+        query.eliminate_zeros()
+        idf = np.log((documents + 1) / (df[query.indices] + 1)) + 1
+        query.data = (1 + np.log(query.data)) * idf * idf
+        query = normalize(query)
+        job_skills = sorted(job.skills)
+
+        candidates = []
+        for segment in segments:
+            similarity = np.asarray((query @ segment.terms).todense()).ravel()
+
+            columns = [segment.skill_columns[s] for s in job_skills if s in segment.skill_columns]
+            if columns:
+                overlap = np.asarray(segment.skills[columns].sum(axis=0)).ravel() / len(job_skills)
+            else:
+                overlap = np.zeros(len(segment.ids), dtype=np.float32)
+
+            scores = (1 - skill_weight) * similarity + skill_weight * overlap
+            if segment.dead is not None:
+                scores[segment.dead] = -np.inf
+            top = min(k, len(scores))
+            best = np.argpartition(-scores, top - 1)[:top]
+            candidates.extend(
+                (int(segment.ids[i]), float(scores[i]), float(similarity[i]), float(overlap[i]))
+                for i in best if np.isfinite(scores[i])
+            )
+
+        candidates.sort(key=lambda c: c[1], reverse=True)
+        return candidates[:k]
+
+    def stats(self):
+        return {
+            'documents': self.manifest['documents'],
+            'segments': len(self.manifest['segments']),
+            'max_id': self.manifest['max_id'],
+            'changes_seen': self.manifest.get('changes_seen', 0),
+            'last_sync': self.last_sync
+        }
+
+
+class IndexUpdater:
+    """Background thread that syncs the index shortly after new rows arrive"""
+
+    def __init__(self, index, fetch, delay=5.0, changes=None):
+        self.index = index
+        self.fetch = fetch
+        self.changes = changes
+        self.delay = delay
+        self._wakeup = threading.Event()
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def notify(self):
+        # Threads do not survive fork, so each worker process starts its own
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._pid = os.getpid()
+                    threading.Thread(target=self._run, name="search-index-updater", daemon=True).start()
+        self._wakeup.set()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait()
+            time.sleep(self.delay)  # batch rows inserted meanwhile
+            self._wakeup.clear()
+            try:
+                # Another worker already syncing will pick these rows up as well
+                self.index.sync(self.fetch, blocking=False, changes=self.changes)
+            except Exception:
+                log.exception("Could not update the search index")
@@ -0,0 +1,288 @@
+import datetime
+import threading
+import time
+
+from utils.ats_score import get_skill_matcher
+from utils.cache import content_hash
+from utils.changes import pending_changes
+
+# Matched and missing skills are also stored as bitmasks: bit i is the i-th
+# skill of the active matcher (the TECHNICAL_SKILLS order, or the taxonomy in
+# SKILL_TAXONOMY_PATH), packed little-endian into BLOB columns. Each row
+# records which taxonomy its bits refer to, so analytics skip rows written
+# under another skill list until `flask skill-masks` re-encodes them.
+SYNC_BATCH = 5000
+# Width of the BLOB mask columns; a taxonomy needing wider masks cannot be stored
+MAX_MASK_BYTES = 65535
+
+_layout = {'matcher': None}
+
+
+def skill_layout():
+    """(skill names, {skill: bit}, taxonomy id) of the active skill matcher"""
+    matcher = get_skill_matcher()
+    if _layout['matcher'] is not matcher:
+        skills = list(matcher.skills)
+        _layout.update(
+            matcher=matcher,
+            skills=skills,
+            bits={skill: i for i, skill in enumerate(skills)},
+            taxonomy=content_hash("\n".join(skills))[:16]
+        )
+    return _layout['skills'], _layout['bits'], _layout['taxonomy']
+
+
+def encode_skills(skills):
+    """Bitmask bytes for a list of canonical skill names (unknown names are ignored)"""
+    names, bits, _ = skill_layout()
+    width = (len(names) + 7) // 8
+    if width > MAX_MASK_BYTES:
+        raise ValueError(f"Skill taxonomy of {len(names)} skills needs {width}-byte masks "
+                         f"(the mask columns hold {MAX_MASK_BYTES})")
+    value = 0
+    for skill in skills:
+        bit = bits.get(skill)
+        if bit is not None:
+            value |= 1 << bit
+    return value.to_bytes(width, 'little')
+
+
+def decode_skills(mask):
+    names, _, _ = skill_layout()
+    value = int.from_bytes(mask or b'', 'little')
+    return [skill for i, skill in enumerate(names) if value >> i & 1]
+
+
+class SkillAnalytics:
+    """Skill masks of stored analyses held as NumPy arrays, appended to by id.
+
+    summary() answers "which skills are most often missing" for a date range
+    with a few vectorized passes instead of parsing JSON row by row.
+    """
+
+    def __init__(self, sync_interval=10.0):
+        self.sync_interval = sync_interval
+        self.taxonomy = None
+        self.max_id = 0
+        self.changes_seen = 0
+        self.last_sync = 0.0
+        self._chunks = []
+        self._arrays = None
+        self._summaries = {}
+        self._version = 0
+        self._lock = threading.Lock()
+
+    def _reset(self, taxonomy):
+        self.taxonomy = taxonomy
+        self.max_id = 0
+        self._chunks = []
+        self._changed()
+
+    def _changed(self):
+        # Called with the lock held, whenever the rows change
+        self._arrays = None
+        self._summaries = {}
+        self._version += 1
+
+    def sync(self, fetch, force=False, changes=None):
+        """Load new rows; fetch(after_id, taxonomy, limit, ids=None) -> [(id, created_at, matched_mask, missing_mask)].
+
+        With changes (see utils.changes), rows edited since the last sync are
+        fetched again by id, and a re-score of every row reloads everything.
+        """
+        names, _, taxonomy = skill_layout()
+        width = (len(names) + 7) // 8
+
+        with self._lock:
+            if taxonomy != self.taxonomy:
+                self._reset(taxonomy)
+            elif not force and time.monotonic() - self.last_sync < self.sync_interval:
+                return 0
+
+            if changes is not None:
+                # Read before the new rows, so an edit made meanwhile is seen next time
+                self.changes_seen, changed, rescored = pending_changes(changes, self.changes_seen)
+                if rescored:
+                    self._reset(taxonomy)
+                changed = sorted(resume_id for resume_id in changed if resume_id <= self.max_id)
+                if changed:
+                    self._replace_rows(changed, fetch(0, taxonomy, len(changed), ids=changed), width)
+
+            added = 0
+            while True:
+                rows = fetch(self.max_id, taxonomy, SYNC_BATCH)
+                if rows:
+                    self._chunks.append(_chunk(rows, width))
+                    self._changed()
+                    self.max_id = rows[-1][0]
+                    added += len(rows)
+                if len(rows) < SYNC_BATCH:
+                    break
+            self.last_sync = time.monotonic()
+            return added
+
+    def _replace_rows(self, ids, rows, width):
+        """Drop the rows with these ids and insert their current versions, keeping id order"""
+        import numpy as np
+
+        days, matched, missing, row_ids = self._consolidated(width)
+        keep = ~np.isin(row_ids, ids)
+        parts = [(days[keep], matched[keep], missing[keep], row_ids[keep])]
+        if rows:
+            parts.append(_chunk(rows, width))
+        days, matched, missing, row_ids = (np.concatenate(arrays) for arrays in zip(*parts))
+        order = np.argsort(row_ids, kind='stable')
+        self._chunks = [(days[order], matched[order], missing[order], row_ids[order])]
+        self._changed()
+
+    def _consolidated(self, width):
+        # One chunk holding every row (lock held)
+        import numpy as np
+
+        if not self._chunks:
+            return (np.array([], dtype='datetime64[D]'), np.zeros((0, width), dtype=np.uint8),
+                    np.zeros((0, width), dtype=np.uint8), np.array([], dtype=np.int64))
+        if len(self._chunks) > 1:
+            self._chunks = [tuple(np.concatenate(parts) for parts in zip(*self._chunks))]
+        return self._chunks[0]
+
+    def arrays(self):
+        """(days, matched, missing) with one row per analysis"""
+        with self._lock:
+            if self._arrays is None:
+                self._arrays = self._consolidated((len(skill_layout()[0]) + 7) // 8)[:3]
+            return self._arrays
+
+    def summary(self, since=None, top=10):
+        """Per-skill frequency and gap, and the skills most often missing together.
+
+        Results are cached until the next sync adds or reloads rows.
+        """
+        with self._lock:
+            key = (self._version, str(since) if since else None, top)
+            cached = self._summaries.get(key)
+        if cached is not None:
+            return cached
+
+        result = self._summary(since, top)
+        with self._lock:
+            if key[0] == self._version:
+                self._summaries[key] = result
+        return result
+
+    def _summary(self, since, top):
+        import numpy as np
+        from scipy import sparse
+
+        start = time.perf_counter()
+        names = skill_layout()[0]
+        days, matched, missing = self.arrays()
+        if since is not None:
+            selected = days >= np.datetime64(since, 'D')
+            matched, missing = matched[selected], missing[selected]
+
+        # Many analyses share the same masks (one job description, many applicants),
+        # so count each distinct mask once and weight it by how often it occurs
+        matched, matched_weights = _distinct(matched)
+        missing, missing_weights = _distinct(missing)
+
+        # Set bits as (row, skill) pairs: a few per row, whatever the taxonomy size
+        matched_rows, matched_skills = _set_bits(matched)
+        missing_rows, missing_skills = _set_bits(missing)
+        matched_counts = np.bincount(matched_skills, weights=matched_weights[matched_rows],
+                                     minlength=len(names)).astype(np.int64)
+        missing_counts = np.bincount(missing_skills, weights=missing_weights[missing_rows],
+                                     minlength=len(names)).astype(np.int64)
+        demand = matched_counts + missing_counts  # job descriptions asking for the skill
+        gap = np.divide(missing_counts, demand, out=np.zeros(len(names)), where=demand > 0)
+
+        skills = [
+            {
+                'skill': names[i],
+                'demanded': int(demand[i]),
+                'matched': int(matched_counts[i]),
+                'missing': int(missing_counts[i]),
+                'gap_percentage': round(float(gap[i]) * 100, 1)
+            }
+            for i in np.argsort(-missing_counts, kind='stable')[:top] if missing_counts[i]
+        ]
+
+        # Skill x skill counts of analyses missing both, as a sparse product:
+        # its size follows the pairs that occur, not the taxonomy size
+        weighted = sparse.csr_matrix((missing_weights[missing_rows], (missing_rows, missing_skills)),
+                                     shape=(len(missing), len(names)))
+        present = sparse.csr_matrix((np.ones(len(missing_rows)), (missing_rows, missing_skills)),
+                                    shape=(len(missing), len(names)))
+        together = sparse.triu(weighted.T @ present, k=1).tocoo()
+        pairs = [
+            {'skills': [names[together.row[i]], names[together.col[i]]], 'missing': int(together.data[i])}
+            for i in np.lexsort((together.col, together.row, -together.data))[:top] if together.data[i] > 0
+        ]
+
+        return {
+            'analyses': int(matched_weights.sum()),
+            'since': str(since) if since else None,
+            'missing_skills': skills,
+            'missing_together': pairs,
+            'took_ms': round((time.perf_counter() - start) * 1000, 2)
+        }
+
+    def stats(self):
+        return {
+            'rows': sum(len(chunk[0]) for chunk in self._chunks),
+            'max_id': self.max_id,
+            'changes_seen': self.changes_seen,
+            'taxonomy': self.taxonomy,
+            'cached_summaries': len(self._summaries)
+        }
+
+
+def _distinct(masks):
+    """Distinct rows of a packed mask array and how often each occurs (up to 64 skills)"""
+    import numpy as np
+
+    if masks.shape[1] <= 8:
+        # Sorting one uint64 per row is much faster than np.unique(axis=0)
+        padded = np.zeros((masks.shape[0], 8), dtype=np.uint8)
+        padded[:, :masks.shape[1]] = masks
+        keys, counts = np.unique(padded.view('<u8').ravel(), return_counts=True)
+        masks = keys.astype('<u8').view(np.uint8).reshape(-1, 8)
+    else:
+        # Wide masks: sorting whole rows costs more than the counting it saves
+        counts = np.ones(len(masks))
+    return masks, counts.astype(np.float64)
+
+
+def _set_bits(masks):
+    """(row, bit) index arrays of the set bits in a packed little-endian mask array"""
+    import numpy as np
+
+    rows, byte_columns = np.nonzero(masks)
+    bits = np.unpackbits(masks[rows, byte_columns][:, None], axis=1, bitorder='little')
+    entry, bit = np.nonzero(bits)
+    return rows[entry], byte_columns[entry] * 8 + bit
+
+
+def _chunk(rows, width):
+    """(days, matched, missing, ids) arrays for fetched rows"""
+    import numpy as np
+
+    return (
+        np.array([_day(row[1]) for row in rows], dtype='datetime64[D]'),
+        np.frombuffer(b"".join(_pad(row[2], width) for row in rows), dtype=np.uint8).reshape(-1, width),
+        np.frombuffer(b"".join(_pad(row[3], width) for row in rows), dtype=np.uint8).reshape(-1, width),
+        np.array([row[0] for row in rows], dtype=np.int64)
+    )
+
+
+def _pad(mask, width):
+    mask = bytes(mask or b'')
+    return mask[:width].ljust(width, b'\0')
+
+
+def _day(value):
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, str):
+        return value[:10]
+    return value
@@ -0,0 +1,147 @@
+import json
+import os
+import pickle
+import re
+from collections import deque
+
+# Tokens keep the punctuation that is part of skill names ("c++", "c#",
+# "node.js") but split on everything else, so matches always fall on word
+# boundaries: "go" never matches inside "good", "java" never inside "javascript".
+TOKEN_RE = re.compile(r"[^\W_][\w+#]*(?:\.[^\W_][\w+#]*)*")
+
+
+def tokenize(text):
+    """Split text into lowercase skill tokens"""
+    return TOKEN_RE.findall(text.lower())
+
+
+class SkillMatcher:
+    """Aho-Corasick automaton over word tokens.
+
+    Every skill name and alias is inserted as a token sequence ("power bi" ->
+    ["power", "bi"]); a single left-to-right pass over the tokens of a text
+    reports every canonical skill found, whatever the size of the taxonomy.
+    """
+
+    def __init__(self, taxonomy):
+        # taxonomy: {category: [skill | {"name": skill, "aliases": [...]}, ...]}
+        self.skills = []
+        self.categories = {}
+
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [()]
+
+        for category, entries in taxonomy.items():
+            for entry in entries:
+                if isinstance(entry, str):
+                    name, aliases = entry, []
+                else:
+                    name, aliases = entry['name'], entry.get('aliases', [])
+
+                name = name.lower()
+                if name not in self.categories:
+                    self.skills.append(name)
+                    self.categories[name] = category
+
+                for pattern in [name] + list(aliases):
+                    self._insert(tokenize(pattern), name)
+
+        self._build_failure_links()
+
+    def _insert(self, tokens, skill):
+        if not tokens:
+            return
+
+        state = 0
+        for token in tokens:
+            next_state = self._goto[state].get(token)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][token] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+            state = next_state
+
+        if skill not in self._output[state]:
+            self._output[state] = self._output[state] + (skill,)
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+
+        while queue:
+            state = queue.popleft()
+            for token, child in self._goto[state].items():
+                queue.append(child)
+
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(token, 0)
+                self._fail[child] = target if target != child else 0
+
+                if self._output[self._fail[child]]:
+                    merged = self._output[child] + tuple(
+                        s for s in self._output[self._fail[child]] if s not in self._output[child]
+                    )
+                    self._output[child] = merged
+
+    def find(self, text):
+        """Return the set of canonical skills mentioned in text"""
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+
+        found = set()
+        state = 0
+
+        for token in tokenize(text):
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            if output[state]:
+                found.update(output[state])
+
+        return found
+
+    def save(self, path):
+        """Serialize the compiled automaton"""
+        with open(path, 'wb') as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path):
+        """Load a compiled automaton written by save()"""
+        with open(path, 'rb') as f:
+            matcher = pickle.load(f)
+
+        if not isinstance(matcher, cls):
+            raise ValueError(f"Not a compiled skill matcher: {path}")
+        return matcher
+
+
+def load_taxonomy(path):
+    """Load a JSON taxonomy of {category: [skill | {name, aliases}]}"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_skill_matcher(path):
+    """Load a matcher from a compiled .pkl file or a .json taxonomy"""
+    if os.path.splitext(path)[1].lower() == '.json':
+        return SkillMatcher(load_taxonomy(path))
+    return SkillMatcher.load(path)
+
+
+if __name__ == '__main__':
+    # Compile a taxonomy once so workers only need to unpickle it:
+    #   python -m utils.skill_matcher skills.json skills.pkl
+    import sys
+
+    if len(sys.argv) != 3:
+        sys.exit("usage: python -m utils.skill_matcher <taxonomy.json> <output.pkl>")
+
+    compiled = SkillMatcher(load_taxonomy(sys.argv[1]))
+    compiled.save(sys.argv[2])
+    print(f"Compiled {len(compiled.skills)} skills into {sys.argv[2]}")
@@ -0,0 +1,104 @@
+import os
+
+# "inline": each /analyze updates the rollup in its own transaction.
+# "compactor": rollups are rebuilt periodically by `flask refresh-stats`.
+STATS_ROLLUP_MODE = os.environ.get("STATS_ROLLUP_MODE", "inline")
+
+HISTOGRAM_BUCKETS = 11  # ATS score 0-9, 10-19, ..., 90-99, 100
+
+
+def score_bucket(ats_score):
+    return max(0, min(HISTOGRAM_BUCKETS - 1, int(ats_score) // 10))
+
+
+def record_analysis(cursor, ats_score, skill_match_percentage, created_at=None):
+    """Add one analysis to its day's rollup rows (same transaction as the insert)"""
+    if STATS_ROLLUP_MODE != 'inline':
+        return
+
+    cursor.execute("""
+        INSERT INTO analysis_daily_stats (day, resumes_count, ats_score_sum, skill_match_sum)
+        VALUES (DATE(COALESCE(%s, NOW())), 1, %s, %s)
+        ON DUPLICATE KEY UPDATE
+            resumes_count = resumes_count + 1,
+            ats_score_sum = ats_score_sum + VALUES(ats_score_sum),
+            skill_match_sum = skill_match_sum + VALUES(skill_match_sum)
+    """, (created_at, ats_score, skill_match_percentage))
+
+    cursor.execute("""
+        INSERT INTO analysis_score_histogram (day, bucket, resumes_count)
+        VALUES (DATE(COALESCE(%s, NOW())), %s, 1)
+        ON DUPLICATE KEY UPDATE resumes_count = resumes_count + 1
+    """, (created_at, score_bucket(ats_score)))
+
+
+def rescore_analysis(cursor, old_scores, new_scores, created_at):
+    """Move one re-scored analysis within its day's rollup rows; scores are (ats_score, skill_match_percentage)"""
+    if STATS_ROLLUP_MODE != 'inline':
+        return
+
+    cursor.execute("""
+        UPDATE analysis_daily_stats
+        SET ats_score_sum = ats_score_sum + %s, skill_match_sum = skill_match_sum + %s
+        WHERE day = DATE(%s)
+    """, (new_scores[0] - (old_scores[0] or 0), new_scores[1] - (old_scores[1] or 0), created_at))
+
+    old_bucket, new_bucket = score_bucket(old_scores[0] or 0), score_bucket(new_scores[0])
+    if old_bucket != new_bucket:
+        cursor.execute("""
+            UPDATE analysis_score_histogram SET resumes_count = resumes_count - 1
+            WHERE day = DATE(%s) AND bucket = %s
+        """, (created_at, old_bucket))
+        cursor.execute("""
+            INSERT INTO analysis_score_histogram (day, bucket, resumes_count)
+            VALUES (DATE(%s), %s, 1)
+            ON DUPLICATE KEY UPDATE resumes_count = resumes_count + 1
+        """, (created_at, new_bucket))
+
+
+def refresh_daily_stats(cursor, since=None):
+    """Recompute rollup rows from resume_analysis for days >= since (all days if None)"""
+    day_filter = "WHERE created_at >= %s" if since else ""
+    rollup_filter = "WHERE day >= %s" if since else ""
+    params = (since,) if since else ()
+
+    cursor.execute(f"DELETE FROM analysis_daily_stats {rollup_filter}", params)
+    cursor.execute(f"DELETE FROM analysis_score_histogram {rollup_filter}", params)
+
+    cursor.execute(f"""
+        INSERT INTO analysis_daily_stats (day, resumes_count, ats_score_sum, skill_match_sum)
+        SELECT DATE(created_at), COUNT(*), COALESCE(SUM(ats_score), 0), COALESCE(SUM(skill_match_percentage), 0)
+        FROM resume_analysis
+        {day_filter}
+        GROUP BY DATE(created_at)
+    """, params)
+
+    cursor.execute(f"""
+        INSERT INTO analysis_score_histogram (day, bucket, resumes_count)
+        SELECT DATE(created_at), LEAST(GREATEST(FLOOR(COALESCE(ats_score, 0) / 10), 0), {HISTOGRAM_BUCKETS - 1}), COUNT(*)
+        FROM resume_analysis
+        {day_filter}
+        GROUP BY 1, 2
+    """, params)
+
+
+def load_dashboard_totals(cursor):
+    """Overall totals and score histogram from the rollup tables (one row per day, not per resume)"""
+    cursor.execute("""
+        SELECT COALESCE(SUM(resumes_count), 0), COALESCE(SUM(ats_score_sum), 0), COALESCE(SUM(skill_match_sum), 0)
+        FROM analysis_daily_stats
+    """)
+    count, ats_sum, skill_sum = cursor.fetchone()
+
+    cursor.execute("SELECT bucket, SUM(resumes_count) FROM analysis_score_histogram GROUP BY bucket")
+    histogram = [0] * HISTOGRAM_BUCKETS
+    for bucket, bucket_count in cursor.fetchall():
+        histogram[int(bucket)] = int(bucket_count)
+
+    count = int(count)
+    return {
+        'total_resumes': count,
+        'avg_ats_score': float(ats_sum) / count if count else 0,
+        'avg_skill_match': float(skill_sum) / count if count else 0,
+        'score_histogram': histogram
+    }
@@ -0,0 +1,57 @@
+import zlib
+
+from utils.ats_score import normalize_job_description
+from utils.cache import content_hash
+
+# Large text lives outside resume_analysis so scans of that table stay small:
+#   job_descriptions - one row per distinct job description, keyed by the
+#                      SHA-256 of its normalized text (rows reference jd_hash)
+#   resume_texts     - zlib-compressed resume text, one row per analysis
+# Rows written before the split keep their inline columns until
+# `flask migrate-text-storage` moves them; readers accept both.
+COMPRESSION_LEVEL = 6
+
+# Join and select fragments for queries that need the text back
+TEXT_JOINS = """
+    LEFT JOIN job_descriptions jd ON jd.jd_hash = resume_analysis.jd_hash
+    LEFT JOIN resume_texts rt ON rt.resume_id = resume_analysis.id
+"""
+JOB_DESCRIPTION_SQL = "COALESCE(jd.job_description, resume_analysis.job_description)"
+RESUME_TEXT_SQL = "rt.text_zlib, resume_analysis.resume_text"
+
+
+def job_description_hash(text):
+    # Whitespace-only variants of a JD score identically, so they share a row
+    return content_hash(normalize_job_description(text))
+
+
+def compress_text(text):
+    return zlib.compress((text or '').encode('utf-8'), COMPRESSION_LEVEL)
+
+
+def decompress_text(data):
+    return zlib.decompress(data).decode('utf-8')
+
+
+def stored_resume_text(compressed, inline=None):
+    """Resume text from the side table, falling back to a not yet migrated inline copy"""
+    if compressed is not None:
+        return decompress_text(compressed)
+    return inline
+
+
+def store_job_description(cursor, text):
+    """Insert the JD if it is new; returns its hash"""
+    jd_hash = job_description_hash(text)
+    cursor.execute("""
+        INSERT INTO job_descriptions (jd_hash, job_description) VALUES (%s, %s)
+        ON DUPLICATE KEY UPDATE jd_hash = jd_hash
+    """, (jd_hash, text))
+    return jd_hash
+
+
+def store_resume_text(cursor, resume_id, text):
+    cursor.execute(
+        "REPLACE INTO resume_texts (resume_id, text_zlib, text_length) VALUES (%s, %s, %s)",
+        (resume_id, compress_text(text), len(text or ''))
+    )
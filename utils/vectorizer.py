@@ -0,0 +1,146 @@
+import logging
+import os
+import re
+import threading
+import time
+
+# TFIDF_MODE selects how text similarity is vectorized:
+#   auto     - use the fitted corpus model if TFIDF_MODEL_PATH exists, else pairwise
+#   fitted   - always use the fitted corpus model; while it is missing or cannot
+#              be loaded, log an error and score pairwise
+#   hashing  - stateless HashingVectorizer, identical on every worker, no model file
+#   pairwise - legacy behaviour: fit a throwaway vectorizer on the two documents
+TFIDF_MODE = os.environ.get("TFIDF_MODE", "auto")
+TFIDF_MODEL_PATH = os.environ.get("TFIDF_MODEL_PATH", os.path.join("models", "tfidf.joblib"))
+# How often (seconds) a worker checks whether the model file was refreshed
+TFIDF_RELOAD_SECONDS = int(os.environ.get("TFIDF_RELOAD_SECONDS", 300))
+HASHING_FEATURES = 2 ** 20
+
+WORD_RE = re.compile(r'\w+')
+
+log = logging.getLogger(__name__)
+_lock = threading.Lock()
+_state = {'vectorizer': None, 'mtime': None, 'checked': 0.0}
+_stop_words = None
+
+
+def english_stop_words():
+    # scikit-learn is heavy to import, so it is loaded on first use
+    global _stop_words
+    if _stop_words is None:
+        from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+        _stop_words = ENGLISH_STOP_WORDS
+    return _stop_words
+
+
+def document_terms(doc):
+    """Analyzer shared by every vectorizer: lowercase 2+ char words, no stop words.
+
+    Accepts an AnalyzedDocument (its tokens are reused) or a raw string.
+    """
+    terms = getattr(doc, 'terms', None)
+    if terms is None:
+        terms = [run.lower() for run in WORD_RE.findall(doc or "") if len(run) >= 2]
+    stop_words = _stop_words or english_stop_words()
+    return [term for term in terms if term not in stop_words]
+
+
+def corpus_vectorizer(max_features=50000, min_df=2):
+    """Unfitted TF-IDF model with the settings of the corpus model"""
+    import numpy as np
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    return TfidfVectorizer(
+        analyzer=document_terms,
+        max_features=max_features,
+        min_df=min_df,
+        sublinear_tf=True,
+        dtype=np.float32
+    )
+
+
+def fit_corpus_vectorizer(texts, max_features=50000, min_df=2):
+    """Fit a TF-IDF model on a corpus of resumes and job descriptions"""
+    vectorizer = corpus_vectorizer(max_features, min_df)
+    vectorizer.fit(texts)
+    return vectorizer
+
+
+def save_vectorizer(vectorizer, path=TFIDF_MODEL_PATH):
+    """Write the model atomically so running workers never read a partial file"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    import joblib
+
+    tmp_path = f"{path}.tmp"
+    joblib.dump(vectorizer, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def load_vectorizer(path=TFIDF_MODEL_PATH):
+    import joblib
+
+    # mmap_mode maps the IDF array read-only, so forked workers share its pages
+    return joblib.load(path, mmap_mode='r')
+
+
+def _hashing_vectorizer():
+    import numpy as np
+    from sklearn.feature_extraction.text import HashingVectorizer
+
+    return HashingVectorizer(
+        analyzer=document_terms,
+        n_features=HASHING_FEATURES,
+        alternate_sign=False,
+        norm='l2',
+        dtype=np.float32
+    )
+
+
+def get_vectorizer():
+    """Return the per-process vectorizer, or None to score pairwise"""
+    if TFIDF_MODE == 'pairwise':
+        return None
+
+    if TFIDF_MODE == 'hashing':
+        if _state['vectorizer'] is None:
+            _state['vectorizer'] = _hashing_vectorizer()
+        return _state['vectorizer']
+
+    now = time.monotonic()
+    if not _state['checked'] or now - _state['checked'] >= TFIDF_RELOAD_SECONDS:
+        with _lock:
+            _state['checked'] = now
+            try:
+                mtime = os.path.getmtime(TFIDF_MODEL_PATH)
+            except OSError:
+                mtime = None
+
+            if mtime is None:
+                _state['vectorizer'] = None
+            elif mtime != _state['mtime']:
+                try:
+                    _state['vectorizer'] = load_vectorizer(TFIDF_MODEL_PATH)
+                except Exception:
+                    # Truncated or incompatible file: keep the model already loaded, if any
+                    log.exception("Could not load the TF-IDF model %s", TFIDF_MODEL_PATH)
+            _state['mtime'] = mtime
+
+            if _state['vectorizer'] is None and TFIDF_MODE == 'fitted':
+                log.error("TFIDF_MODE=fitted but no TF-IDF model could be loaded from %s; "
+                          "scoring text similarity pairwise until it can", TFIDF_MODEL_PATH)
+    return _state['vectorizer']
+
+
+def document_vector(doc, vectorizer=None):
+    """L2-normalized row vector for an AnalyzedDocument, transformed once per document"""
+    vectorizer = vectorizer or get_vectorizer()
+    cached = getattr(doc, 'vector', None)
+    if cached is not None and cached[0] is vectorizer:
+        return cached[1]
+
+    vector = vectorizer.transform([doc])
+    doc.vector = (vectorizer, vector)
+    return vector
@@ -0,0 +1,87 @@
+import os
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from utils.ats_score import analyze_skills_match, calculate_ats_score, get_skill_matcher
+from utils.metrics import Gauge
+from utils.vectorizer import english_stop_words, get_vectorizer
+
+SAMPLE_RESUME = """Jane Doe jane@example.com +1 555 0100
+Summary: Python developer. Skills: Python, SQL, Docker, AWS.
+Experience: Built APIs and data pipelines. Education: B.Sc."""
+SAMPLE_JOB = "Backend engineer with Python, SQL, Docker and AWS experience."
+
+_process = {'pid': os.getpid(), 'started': time.monotonic(), 'first_request': None}
+
+
+def warmup():
+    """Import heavy libraries and build shared state once; returns seconds per step.
+
+    Run it in the gunicorn master (preload_app) so forked workers share the
+    loaded modules, skill matcher and vectorizer copy-on-write.
+    """
+    timings = {}
+
+    def step(name, fn):
+        start = time.perf_counter()
+        fn()
+        timings[name] = round(time.perf_counter() - start, 4)
+
+    def import_libraries():
+        import pdfminer.high_level  # noqa: F401
+        import docx  # noqa: F401
+        import sklearn.feature_extraction.text  # noqa: F401
+        import sklearn.metrics.pairwise  # noqa: F401
+
+    step('imports', import_libraries)
+    step('stop_words', english_stop_words)
+    step('skill_matcher', get_skill_matcher)
+    step('vectorizer', get_vectorizer)
+    # One throwaway analysis touches every remaining lazy path
+    step('sample_analysis', lambda: (calculate_ats_score(SAMPLE_RESUME, SAMPLE_JOB),
+                                     analyze_skills_match(SAMPLE_RESUME, SAMPLE_JOB)))
+    return timings
+
+
+def rss_mb():
+    """Resident set size of this process in MB"""
+    try:
+        with open('/proc/self/statm') as f:
+            return round(int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024), 1)
+    except (OSError, ValueError):
+        if resource is None:
+            return None
+        return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)  # peak, in KB on Linux
+
+
+def mark_worker_start():
+    """Call right after fork so time-to-first-request is measured per worker"""
+    _process.update(pid=os.getpid(), started=time.monotonic(), first_request=None)
+
+
+def record_first_request():
+    """Seconds from worker start to its first request, returned only once"""
+    if _process['pid'] != os.getpid():
+        mark_worker_start()  # forked without the gunicorn hook
+    if _process['first_request'] is not None:
+        return None
+    _process['first_request'] = round(time.monotonic() - _process['started'], 4)
+    return _process['first_request']
+
+
+Gauge('process_resident_memory_megabytes', 'Resident memory of this worker', rss_mb)
+Gauge('worker_time_to_first_request_seconds', 'Seconds from worker start to its first request',
+      lambda: _process['first_request'])
+
+
+def process_stats():
+    return {
+        'pid': os.getpid(),
+        'rss_mb': rss_mb(),
+        'uptime_seconds': round(time.monotonic() - _process['started'], 1),
+        'time_to_first_request': _process['first_request']
+    }
@@ -0,0 +1,263 @@
+import atexit
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+try:
+    import fcntl
+except ImportError:  # Windows: spill files of dead processes are not recovered
+    fcntl = None
+
+log = logging.getLogger(__name__)
+
+
+class SpillFile:
+    """Append-only JSONL file holding records that may not be in the database yet.
+
+    Records stay in the file after they are written; it is emptied once
+    nothing is pending, and compacted when written records outnumber pending
+    ones, so each batch costs an append rather than a rewrite. Each process
+    writes its own file and keeps it locked; on start-up any unlocked file
+    left behind by a dead process is replayed and removed.
+    """
+
+    def __init__(self, directory, name, fsync=False):
+        self.directory = directory
+        self.name = name
+        self.fsync = fsync
+        os.makedirs(directory, exist_ok=True)
+
+        self.path = os.path.join(directory, f"{name}-{os.getpid()}.jsonl")
+        self._file = open(self.path, 'a+', encoding='utf-8')
+        if fcntl is not None:
+            fcntl.flock(self._file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        self._lock = threading.Lock()
+        self.lines = 0
+
+    def append(self, key, record):
+        line = json.dumps({'key': key, 'record': record}, default=str)
+        with self._lock:
+            self.lines += 1
+            self._file.write(line + "\n")
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+
+    def rewrite(self, pending):
+        """Replace the contents with the records still pending"""
+        with self._lock:
+            self._file.seek(0)
+            self._file.truncate()
+            self.lines = len(pending)
+            for key, record in pending:
+                self._file.write(json.dumps({'key': key, 'record': record}, default=str) + "\n")
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+
+    def read(self):
+        with self._lock:
+            self._file.seek(0)
+            return _parse(self._file)
+
+    def recover_orphans(self):
+        """Yield records from spill files whose owning process is gone"""
+        for path in glob.glob(os.path.join(self.directory, f"{self.name}-*.jsonl")):
+            if path == self.path:
+                continue
+            try:
+                with open(path, 'r+', encoding='utf-8') as f:
+                    if fcntl is not None:
+                        try:
+                            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                        except OSError:
+                            continue  # owner still alive
+                    records = _parse(f)
+                    os.remove(path)
+            except OSError:
+                continue
+            yield from records
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+def _parse(f):
+    records = []
+    for line in f:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            continue  # torn write from a crash
+        records.append((entry['key'], entry['record']))
+    return records
+
+
+class WriteBehindQueue:
+    """Buffers records and writes them in batches from a background thread.
+
+    flush(records, keys) must write the whole batch in one transaction and
+    return one result per record (e.g. row ids). submit() returns a Future for
+    that result. Every record is appended to the spill file first, so a crash
+    or a database outage loses nothing: failed batches are retried with
+    back-off and orphaned spill files are replayed by the next process. A
+    replayed record may already be stored (the spill file is compacted only
+    now and then), so flush must skip keys it has written before, e.g. with
+    a unique key column. Only errors that is_transient() rejects (bad data)
+    count towards MAX_ATTEMPTS, after which the record is moved to a
+    dead-letter file.
+    """
+
+    MAX_ATTEMPTS = 5
+
+    def __init__(self, name, flush, spill_dir, batch_size=100, flush_interval=1.0,
+                 max_pending=10000, fsync=False, is_transient=None):
+        self.name = name
+        self._flush = flush
+        self._is_transient = is_transient or (lambda exc: True)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+
+        self.spill = SpillFile(spill_dir, name, fsync=fsync)
+        self._pending = []  # [key, record, future, attempts]
+        self._cond = threading.Condition()
+        self._seq = 0
+        self._closed = False
+        self._force = False
+
+        self.submitted = 0
+        self.written = 0
+        self.batches = 0
+        self.failures = 0
+        self.rejected = 0
+
+        for key, record in self.spill.read() + list(self.spill.recover_orphans()):
+            self._enqueue(record, key=key, spill=False)
+        if self._pending:
+            self.spill.rewrite([(key, record) for key, record, _, _ in self._pending])
+
+        self._thread = threading.Thread(target=self._run, name=f"write-behind-{name}", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _enqueue(self, record, key=None, spill=True):
+        future = Future()
+        with self._cond:
+            while len(self._pending) >= self.max_pending and not self._closed:
+                self._cond.wait(0.5)  # back-pressure while the database catches up
+
+            self._seq += 1
+            key = key or f"{os.getpid()}-{time.time_ns()}-{self._seq}"
+            if spill:
+                self.spill.append(key, record)
+            self._pending.append([key, record, future, 0])
+            self.submitted += 1
+            if len(self._pending) >= self.batch_size:
+                self._cond.notify_all()
+        return future
+
+    def submit(self, record):
+        if self._closed:
+            raise Exception(f"Write-behind queue '{self.name}' is closed")
+        return self._enqueue(record)
+
+    def _run(self):
+        backoff = 0
+        while True:
+            with self._cond:
+                if backoff:
+                    self._cond.wait_for(lambda: self._closed, timeout=backoff)
+                deadline = time.monotonic() + self.flush_interval
+                while (len(self._pending) < self.batch_size and not self._closed and not self._force
+                       and time.monotonic() < deadline):
+                    self._cond.wait(max(0.0, deadline - time.monotonic()))
+                if self._closed and not self._pending:
+                    return
+                self._force = False
+                # Retried records go one at a time so a bad row cannot block a whole batch
+                size = 1 if self._pending and self._pending[0][3] else self.batch_size
+                batch = self._pending[:size]
+
+            if not batch:
+                continue
+
+            try:
+                results = self._flush([record for _, record, _, _ in batch], [key for key, _, _, _ in batch])
+            except Exception as e:
+                log.exception("Write-behind queue '%s' could not write %d records", self.name, len(batch))
+                self.failures += 1
+                backoff = min(30, max(1, backoff * 2))
+                with self._cond:
+                    if not self._is_transient(e):
+                        for entry in batch:
+                            entry[3] += 1
+                    dead = [entry for entry in batch if entry[3] >= self.MAX_ATTEMPTS]
+                    if dead and not self._closed:
+                        self._reject(dead)
+                    elif self._closed:
+                        return  # keep everything in the spill file for the next process
+                continue
+
+            backoff = 0
+            with self._cond:
+                del self._pending[:len(batch)]
+                if not self._pending or self.spill.lines > 2 * len(self._pending) + self.batch_size:
+                    # Written records are only dropped from the spill file now and then
+                    self.spill.rewrite([(key, record) for key, record, _, _ in self._pending])
+                self.written += len(batch)
+                self.batches += 1
+                self._cond.notify_all()
+
+            for (_, _, future, _), result in zip(batch, results):
+                future.set_result(result)
+
+    def _reject(self, dead):
+        # Move records that keep failing to a dead-letter file for manual replay
+        path = os.path.join(self.spill.directory, f"{self.name}.rejected.jsonl")
+        with open(path, 'a', encoding='utf-8') as f:
+            for key, record, future, _ in dead:
+                f.write(json.dumps({'key': key, 'record': record}, default=str) + "\n")
+                future.set_exception(Exception(f"Record rejected after {self.MAX_ATTEMPTS} attempts"))
+        dead_ids = {id(entry) for entry in dead}
+        self._pending = [entry for entry in self._pending if id(entry) not in dead_ids]
+        self.spill.rewrite([(key, record) for key, record, _, _ in self._pending])
+        self.rejected += len(dead)
+
+    def flush_now(self):
+        with self._cond:
+            self._force = True
+            self._cond.notify_all()
+
+    def close(self, timeout=10):
+        """Flush what is buffered and stop the writer thread"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+        self.spill.close()
+        if not self._pending:
+            try:
+                os.remove(self.spill.path)
+            except OSError:
+                pass
+
+    def stats(self):
+        return {
+            'pending': len(self._pending),
+            'submitted': self.submitted,
+            'written': self.written,
+            'batches': self.batches,
+            'failures': self.failures,
+            'rejected': self.rejected
+        }